@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Terminal Hero - Command Safety Validator Tests
+Regression cases for commands the executor must refuse or allow
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from src.core.command_safety import CommandValidator
+
+validator = CommandValidator()
+
+BLOCKED = [
+    "rm -rf /",
+    "rm -rf ~",
+    "rm -rf .",
+    "rm -rf ./",
+    "rm -rf ../",
+    "rm -rf ../..",
+    "rm -rf ./*",
+    "rm --no-preserve-root -r /tmp/x",
+    "sudo rm -rf /",
+    # Wrapper flags that take no value must not hide the program
+    "sudo -s rm -rf /",
+    "sudo -i rm -rf /",
+    "sudo -k rm -rf /",
+    "sudo -E rm -rf /",
+    "env -i rm -rf /",
+    "env -i PATH=/bin rm -rf /",
+    # Wrapper options that do take a value
+    "sudo -u root rm -rf /",
+    "sudo -u root -g wheel rm -rf /",
+    "nice -n 10 rm -rf ~",
+    "timeout -s KILL 5 rm -rf /",
+    "env -S 'rm -rf /'",
+    # Anything below a system tree, not just the top-level directory
+    "sudo rm -rf /usr/lib",
+    "sudo rm -rf /var/lib/dpkg",
+    "rm -rf /etc/ssl/",
+    "sudo chmod -R 777 /usr/local/bin",
+    # Variables are expanded before the check, quoted or not
+    "rm -rf $HOME/*",
+    "rm -rf ${HOME}/*",
+    'rm -rf "${HOME}"/*',
+    'rm -rf "$HOME"',
+    # An unset variable expands to nothing, as in the shell
+    "rm -rf $TERMINAL_HERO_UNSET_VARIABLE/*",
+    "chmod -R 777 /",
+    "sudo chown -R nobody /etc",
+    "dd if=/dev/zero of=/dev/sda",
+    "mkfs.ext4 /dev/sdb1",
+    "shred /dev/sda",
+    "echo x > /dev/sda",
+    "bash -c 'rm -rf /'",
+    "eval rm -rf /",
+    ":(){ :|:& };:",
+]
+
+ALLOWED = [
+    "rm -rf build",
+    "rm -rf ./build",
+    "rm -rf node_modules/",
+    "rm -rf ../sibling/dist",
+    "rm -rf $HOME/project/build",
+    "rm -rf /tmp/build-cache",
+    "rm -rf /opt/myapp/cache",
+    "shred -u secret.txt",
+    "chmod +x deploy.sh",
+    "sudo -u postgres createdb app",
+    "env -i PATH=/usr/bin python3 --version",
+    "dd if=/dev/zero of=disk.img bs=1M count=10",
+    "echo done 2>&1",
+    "pip install requests",
+]
+
+
+@pytest.mark.parametrize("command", BLOCKED)
+def test_blocks_destructive_commands(command):
+    assert not validator.validate(command).safe, command
+
+
+@pytest.mark.parametrize("command", ALLOWED)
+def test_allows_ordinary_commands(command):
+    verdict = validator.validate(command)
+    assert verdict.safe, f"{command}: {verdict.violations}"
+
+
+def test_pipe_to_shell_only_warns():
+    verdict = validator.validate("curl -fsSL https://example.com/install.sh | sh")
+    assert verdict.safe
+    assert verdict.warnings
+
+
+def test_check_reports_first_unsafe_command():
+    ok, reason = validator.check(["echo hi", "sudo -s rm -rf /"])
+    assert not ok
+    assert "sudo -s rm -rf /" in reason
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Terminal Hero - Command Limits Tests
+Process groups the executor starts commands in
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import select
+import time
+
+import pytest
+
+from src.core.limits import kill_group, popen_group
+
+posix_only = pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX")
+
+
+@posix_only
+def test_child_gets_its_own_process_group():
+    process = popen_group(["sleep", "30"])
+    try:
+        assert os.getpgid(process.pid) == process.pid
+    finally:
+        kill_group(process, grace=0.5)
+    assert process.returncode is not None
+
+
+@posix_only
+def test_child_keeps_controlling_terminal():
+    # Run popen_group from a process that has a terminal, as the CLI does
+    pty = pytest.importorskip("pty")
+    pid, master = pty.fork()
+    if pid == 0:
+        try:
+            child = popen_group([sys.executable, "-c", "open('/dev/tty', 'w').close()"])
+            os._exit(child.wait())
+        except BaseException:
+            os._exit(99)
+
+    deadline = time.monotonic() + 30
+    while True:
+        if select.select([master], [], [], 0.05)[0]:
+            try:
+                os.read(master, 1024)  # Keep the terminal drained
+            except OSError:
+                pass
+        done, status = os.waitpid(pid, os.WNOHANG)
+        if done:
+            break
+        assert time.monotonic() < deadline, "child did not exit"
+        time.sleep(0.05)
+    os.close(master)
+    assert os.waitstatus_to_exitcode(status) == 0
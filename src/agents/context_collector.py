@@ -10,12 +10,14 @@ from typing import Optional, Dict
 from .base import BaseAgent
 from ..graph.state import AgentState
 from ..core.system_detector import SystemDetector
+from ..core.project_scanner import ProjectScanner
 
 class ContextCollectorAgent(BaseAgent):
     """Collects comprehensive system and project context"""
     
     def __init__(self):
         super().__init__("ContextCollector", "System Detective")
+        self.scanner = ProjectScanner()
     
     def process(self, state: AgentState) -> AgentState:
         """Collect system and project context"""
@@ -43,38 +45,37 @@ class ContextCollectorAgent(BaseAgent):
         return state
     
     def _detect_project_context(self) -> Dict:
-        """Detect project type and relevant files"""
+        """Detect project type and relevant files from the project index"""
         context = {
             "project_type": None,
             "config_files": [],
             "dependencies": []
         }
         
-        cwd = Path.cwd()
+        index_context = self.scanner.get_context(Path.cwd())
+        nearest = [Path(p) for p in index_context["nearest_manifests"]]
+        workspace = [Path(p) for p in index_context["workspace_manifests"]]
         
-        # Check for common project files
-        project_indicators = {
-            "package.json": "node",
-            "requirements.txt": "python",
-            "Pipfile": "python",
-            "pyproject.toml": "python",
-            "Cargo.toml": "rust",
-            "go.mod": "go",
-            "pom.xml": "java",
-            "Gemfile": "ruby"
-        }
+        context["project_root"] = index_context["project_root"]
+        context["workspace_files"] = [str(p) for p in workspace]
+        context["packages"] = index_context["packages"]
+        context["project_type"] = (
+            ProjectScanner.project_type([p.name for p in nearest])
+            or ProjectScanner.project_type([p.name for p in workspace])
+        )
         
-        for filename, proj_type in project_indicators.items():
-            file_path = cwd / filename
-            if file_path.exists():
-                context["project_type"] = proj_type
-                context["config_files"].append(str(file_path))
-                
-                # Try to read dependencies
-                if filename == "package.json":
-                    context["dependencies"] = self._read_package_json(file_path)
-                elif filename == "requirements.txt":
-                    context["dependencies"] = self._read_requirements_txt(file_path)
+        # Nearest manifests first, then the workspace-level ones
+        for file_path in nearest + workspace:
+            context["config_files"].append(str(file_path))
+            
+            # Try to read dependencies
+            if file_path.name == "package.json":
+                deps = self._read_package_json(file_path)
+            elif file_path.name == "requirements.txt":
+                deps = self._read_requirements_txt(file_path)
+            else:
+                continue
+            context["dependencies"].extend(d for d in deps if d not in context["dependencies"])
         
         return context
     
@@ -6,16 +6,49 @@
 from .base import BaseAgent
 from ..graph.state import AgentState
 from ..graph.state import DocumentationResult
-from duckduckgo_search import DDGS
-from typing import List
+from ..storage.search_cache import SearchCache
+from ..core.local_docs import LocalDocIndex, tokenize, K1 as BM25_K1, B as BM25_B
+from ..core.search_backends import SearchBackend, create_backend
+from ..core.fingerprint import normalize_error
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import List, Optional, Set
+import threading
 import json
+import os
+import re
+import sqlite3
+import numpy as np
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = ("utm_", "ref", "fbclid", "gclid", "source")
 
 class DocumentationSearchAgent(BaseAgent):
     """Searches documentation and Stack Overflow for solutions"""
     
-    def __init__(self):
+    # All queries together must finish within this many seconds
+    SEARCH_DEADLINE = 6.0
+    MAX_QUERIES = 3
+    
+    # Snippets sharing at least this fraction of word shingles are duplicates
+    SNIPPET_SIMILARITY = 0.8
+    
+    # Ranking blends similarity to the error with the source prior; results
+    # sharing no term with the error are dropped
+    SIMILARITY_WEIGHT = 0.6
+    
+    def __init__(self, backend: Optional[SearchBackend] = None):
         super().__init__("DocSearch", "Researcher")
-        self.ddgs = DDGS()
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+        try:
+            self.cache = SearchCache.from_env()
+        except sqlite3.Error:
+            self.cache = None  # Unusable cache file: search live every time
+        
+        # Offline mode answers from the local doc index only
+        self.offline = os.getenv("TERMINAL_HERO_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.local_docs = LocalDocIndex()
     
     def process(self, state: AgentState) -> AgentState:
         """Search for relevant documentation and solutions"""
@@ -30,21 +63,25 @@ class DocumentationSearchAgent(BaseAgent):
             # Generate search queries
             queries = self._generate_search_queries(error_analysis, state)
             
-            # Search and aggregate results
-            all_results = []
-            for query in queries[:3]:  # Limit to 3 queries
-                results = self._search_web(query)
-                all_results.extend(results)
+            # Local docs first: they answer in milliseconds
+            all_results = self._search_local(error_analysis, state)
+            
+            # Search the web concurrently and aggregate results
+            timed_out = 0
+            if not self.offline:
+                web_results, timed_out = self._search_all(queries[:self.MAX_QUERIES])
+                all_results.extend(web_results)
             
             # Rank and filter results
-            ranked_results = self._rank_results(all_results, error_analysis)
+            ranked_results = self._rank_results(
+                self._dedupe_results(all_results), error_analysis, state.get("raw_error", "")
+            )
             state["documentation_results"] = ranked_results[:5]  # Top 5
             
-            self.log_activity(
-                state,
-                "complete",
-                f"Found {len(state['documentation_results'])} relevant resources"
-            )
+            message = f"Found {len(state['documentation_results'])} relevant resources"
+            if timed_out:
+                message += f" ({timed_out} slow searches skipped)"
+            self.log_activity(state, "complete", message)
             
         except Exception as e:
             self.log_activity(state, "error", f"Search failed: {str(e)}")
@@ -74,12 +111,72 @@ class DocumentationSearchAgent(BaseAgent):
         
         return queries
     
+    def _search_local(self, error_analysis, state) -> List[DocumentationResult]:
+        """Search man pages, --help output, package metadata and project docs"""
+        project_root = (state.get("project_context") or {}).get("project_root")
+        if self.offline and self.local_docs.project_stale(project_root):
+            # Nothing else to answer from: the project's docs now, the rest in the background
+            self.local_docs.update(project_root, system=False)
+        self.local_docs.update_async(project_root)
+        
+        query = " ".join(
+            [error_analysis.error_type.replace("_", " "), error_analysis.root_cause]
+            + error_analysis.affected_components
+        )
+        return [
+            DocumentationResult(
+                source="local",
+                url=r["url"],
+                title=r["title"],
+                snippet=r["snippet"],
+                relevance_score=r["score"]
+            )
+            for r in self.local_docs.search(query, limit=3)
+        ]
+    
+    @property
+    def backend(self) -> SearchBackend:
+        """Web search backend, created on first use from the environment"""
+        with self._backend_lock:
+            if self._backend is None:
+                self._backend = create_backend()
+            return self._backend
+    
+    def _search_all(self, queries: List[str]) -> tuple:
+        """
+        Run queries in parallel under one deadline.
+        Returns results in query order and the number of queries that missed the deadline.
+        """
+        if not queries:
+            return [], 0
+        
+        pool = ThreadPoolExecutor(max_workers=len(queries))
+        futures = [pool.submit(self._search_web, query) for query in queries]
+        done, not_done = wait(futures, timeout=self.SEARCH_DEADLINE)
+        # Slow searches finish in the background; their results are dropped
+        pool.shutdown(wait=False, cancel_futures=True)
+        
+        results = []
+        for future in futures:
+            if future in done:
+                results.extend(future.result())
+        return results, len(not_done)
+    
     def _search_web(self, query: str) -> List[DocumentationResult]:
-        """Perform web search using DuckDuckGo"""
+        """Perform web search through the backend, answering repeat queries from the cache"""
+        backend = self.backend
+        key = SearchCache.normalize_query(query, backend.name, max_results=3)
         try:
-            results = self.ddgs.text(query, max_results=3)
+            cached = self.cache.get(key) if self.cache else None
+        except sqlite3.Error:
+            cached = None  # Locked or corrupt cache: fall through to a live search
+        if cached is not None:
+            return [DocumentationResult(**r) for r in cached]
+        
+        try:
+            results = backend.search(query, max_results=3)
             
-            return [
+            docs = [
                 DocumentationResult(
                     source="web",
                     url=r["href"],
@@ -90,14 +187,76 @@ class DocumentationSearchAgent(BaseAgent):
                 for r in results
             ]
         except Exception as e:
-            return []
+            return []  # Failed searches are not cached
+        
+        # Empty answers are cached too, with a shorter TTL
+        try:
+            if self.cache:
+                self.cache.put(key, [doc.model_dump() for doc in docs])
+        except sqlite3.Error:
+            pass
+        return docs
+    
+    @staticmethod
+    def _canonical_url(url: str) -> str:
+        """URL with scheme, host prefixes, tracking parameters and fragments normalized away"""
+        parts = urlsplit(url.strip())
+        host = parts.netloc.lower()
+        for prefix in ("www.", "m."):
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+        path = parts.path.rstrip("/") or "/"
+        
+        # Stack Overflow question slugs are optional
+        match = re.match(r"^(/questions/\d+)(?:/|$)", path)
+        if match and host.endswith("stackoverflow.com"):
+            path = match.group(1)
+        
+        query = urlencode(sorted(
+            (key, value) for key, value in parse_qsl(parts.query)
+            if not key.lower().startswith(TRACKING_PARAMS)
+        ))
+        return urlunsplit(("https", host, path, query, ""))
     
-    def _rank_results(self, results: List[DocumentationResult], error_analysis) -> List[DocumentationResult]:
-        """Rank results by relevance using LLM"""
+    @staticmethod
+    def _shingles(text: str) -> Set[str]:
+        """Word 3-grams of a snippet"""
+        words = re.findall(r"\w+", text.lower())
+        if len(words) < 3:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+    
+    def _dedupe_results(self, results: List[DocumentationResult]) -> List[DocumentationResult]:
+        """Drop repeated URLs and near-identical snippets, keeping the first occurrence"""
+        seen_urls = set()
+        kept = []
+        kept_shingles = []
+        for result in results:
+            url = self._canonical_url(result.url)
+            if url in seen_urls:
+                continue
+            shingles = self._shingles(result.snippet)
+            if any(
+                len(shingles & other) / max(len(shingles | other), 1) >= self.SNIPPET_SIMILARITY
+                for other in kept_shingles
+            ):
+                continue
+            seen_urls.add(url)
+            kept.append(result)
+            kept_shingles.append(shingles)
+        return kept
+    
+    def _rank_results(
+        self,
+        results: List[DocumentationResult],
+        error_analysis,
+        error_text: str = ""
+    ) -> List[DocumentationResult]:
+        """Rank results by BM25 similarity to the error, blended with a source prior"""
         if not results:
             return []
         
-        # For now, simple ranking by source priority
+        # Source priority
         priority = {
             "stackoverflow.com": 1.0,
             "github.com": 0.9,
@@ -106,12 +265,61 @@ class DocumentationSearchAgent(BaseAgent):
             "doc.rust-lang.org": 1.0
         }
         
+        priors = []
         for result in results:
+            if result.source == "local":
+                # Scale the index's own BM25 score below the best-known web sources
+                priors.append(0.5 + 0.4 * result.relevance_score)
+                continue
             base_score = 0.5
             for domain, score in priority.items():
                 if domain in result.url:
                     base_score = score
                     break
-            result.relevance_score = base_score
+            priors.append(base_score)
+        
+        query = " ".join(
+            [error_analysis.error_type.replace("_", " "), error_analysis.root_cause]
+            + error_analysis.affected_components
+            # The error itself, minus placeholders for paths, versions, etc.
+            + [re.sub(r"<[A-Z]+>", " ", normalize_error(error_text)[0]) if error_text else ""]
+        )
+        bm25 = self._similarity(query, [f"{r.title} {r.snippet}" for r in results])
+        top = bm25.max()
+        similarity = bm25 / top if top > 0 else bm25
+        scores = self.SIMILARITY_WEIGHT * similarity + (1 - self.SIMILARITY_WEIGHT) * np.array(priors)
+        
+        for result, score in zip(results, scores):
+            result.relevance_score = float(score)
+        
+        # Filtered on the raw score: scaling by the batch's best would drop
+        # partial matches whenever one result matches strongly
+        relevant = [r for r, raw in zip(results, bm25) if raw > 0]
+        return sorted(relevant, key=lambda x: x.relevance_score, reverse=True)
+    
+    @staticmethod
+    def _similarity(query: str, documents: List[str]) -> np.ndarray:
+        """Raw BM25 score of every document against the query in one pass"""
+        vocabulary = {term: i for i, term in enumerate(dict.fromkeys(tokenize(query)))}
+        if not vocabulary:
+            return np.zeros(len(documents))
+        
+        # Sparse (doc, term) occurrences -> dense docs x query-terms counts
+        doc_ids, term_ids, lengths = [], [], []
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for token in tokens:
+                term_id = vocabulary.get(token)
+                if term_id is not None:
+                    doc_ids.append(doc_id)
+                    term_ids.append(term_id)
+        tf = np.zeros((len(documents), len(vocabulary)))
+        np.add.at(tf, (np.array(doc_ids, dtype=np.int64), np.array(term_ids, dtype=np.int64)), 1)
         
-        return sorted(results, key=lambda x: x.relevance_score, reverse=True)
+        lengths = np.array(lengths, dtype=float)
+        n_docs = len(documents)
+        df = (tf > 0).sum(axis=0)
+        idf = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        norm = 1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0)
+        return (idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm[:, None])).sum(axis=1)
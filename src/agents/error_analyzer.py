@@ -7,13 +7,40 @@ from .base import BaseAgent
 from ..graph.state import AgentState
 from ..graph.state import ErrorAnalysis
 from ..core.error_patterns import ErrorPatterns
+from ..core.package_index import PackageIndex
+from ..core.fingerprint import fingerprint_error
+from ..core.stack_trace import parse_stack_trace
+from ..core.error_classifier import ErrorClassifier, Prediction
+from ..storage.memory import MemorySystem
+from typing import Dict, List, Optional
 import json
 
+# Keys every LLM analysis must return
+ANALYSIS_SCHEMA = """{
+  "error_type": "string",
+  "error_category": "permission|not_found|dependency|config|network|unknown",
+  "severity": "low|medium|high|critical",
+  "root_cause": "string",
+  "affected_components": ["list"],
+  "causality_chain": ["list of steps from root cause to visible error"],
+  "confidence": 0.95
+}"""
+
 class ErrorAnalyzerAgent(BaseAgent):
     """Analyzes errors and builds causality chains"""
     
+    # Local predictions at or above this confidence skip the LLM
+    CLASSIFIER_THRESHOLD = 0.9
+    
+    # Per-error cap on text sent in a batched request
+    BATCH_ITEM_CHARS = 2000
+    
     def __init__(self):
         super().__init__("ErrorAnalyzer", "Diagnostician")
+        self.package_index = PackageIndex()
+        self.memory = MemorySystem()
+        self.classifier = ErrorClassifier()
+        self.classifier.train_async(self.memory)
     
     def process(self, state: AgentState) -> AgentState:
         """Analyze error and determine root cause"""
@@ -23,11 +50,35 @@ class ErrorAnalyzerAgent(BaseAgent):
             error_text = state["raw_error"]
             system_info = state.get("system_info")
             
-            # Quick pattern matching
-            pattern_match = ErrorPatterns.match_error(error_text)
+            # Stable identity of this error for caches and history lookups
+            state["error_fingerprint"] = fingerprint_error(error_text)
+            
+            # Quick pattern matching (the monitor may already have scanned)
+            matches = state.get("pattern_matches") or ErrorPatterns.scan(error_text)
+            state["pattern_matches"] = matches
+            pattern_match = None
+            if matches:
+                pattern_match = (matches[0].name, ErrorPatterns.rules()[matches[0].name])
             
-            # Deep analysis with LLM
-            analysis = self._deep_analysis(error_text, system_info, pattern_match)
+            # Structured stack trace, if the output contains one
+            trace = parse_stack_trace(error_text)
+            state["stack_trace"] = trace
+            
+            # Missing modules are answered from the local package index
+            resolution = self.package_index.resolve_error(error_text)
+            state["dependency_resolution"] = resolution
+            
+            if state.get("error_analysis") is not None:
+                # Already analyzed as part of a monitor batch
+                analysis = state["error_analysis"]
+            else:
+                analysis = self._local_analysis(error_text, resolution, trace)
+                if analysis is None:
+                    # Deep analysis with LLM
+                    analysis = self._deep_analysis(error_text, system_info, pattern_match, trace)
+            
+            # Pick up newly recorded solutions for the next error
+            self.classifier.train_async(self.memory)
             
             state["error_analysis"] = analysis
             
@@ -43,10 +94,151 @@ class ErrorAnalyzerAgent(BaseAgent):
         
         return state
     
-    def _deep_analysis(self, error_text: str, system_info, pattern_match) -> ErrorAnalysis:
+    def _local_analysis(self, error_text: str, resolution: Optional[dict], trace=None) -> Optional[ErrorAnalysis]:
+        """Answer from the package index or a confident classifier, without the LLM"""
+        # A guessed distribution name or a project module is left to the LLM
+        if resolution and (resolution["installed"] or resolution.get("known")) and not resolution.get("local"):
+            return self._dependency_analysis(resolution)
+        
+        # Errors seen often enough before are classified locally
+        prediction = self.classifier.predict(error_text)
+        if prediction and prediction.confidence >= self.CLASSIFIER_THRESHOLD:
+            return self._classifier_analysis(prediction, error_text, trace)
+        return None
+    
+    def analyze_batch(self, errors: List[str], system_info=None) -> List[ErrorAnalysis]:
+        """Analyze several errors with at most one LLM request; results follow input order"""
+        analyses: List[Optional[ErrorAnalysis]] = []
+        pending: Dict[int, tuple] = {}
+        
+        for index, error_text in enumerate(errors):
+            matches = ErrorPatterns.scan(error_text)
+            pattern_match = (matches[0].name, ErrorPatterns.rules()[matches[0].name]) if matches else None
+            trace = parse_stack_trace(error_text)
+            resolution = self.package_index.resolve_error(error_text)
+            
+            analysis = self._local_analysis(error_text, resolution, trace)
+            analyses.append(analysis)
+            if analysis is None:
+                pending[index] = (error_text, pattern_match, trace)
+        
+        if len(pending) == 1:
+            index, (error_text, pattern_match, trace) = next(iter(pending.items()))
+            analyses[index] = self._deep_analysis(error_text, system_info, pattern_match, trace)
+        elif pending:
+            answered = self._batch_deep_analysis(pending, system_info)
+            for index, (error_text, pattern_match, trace) in pending.items():
+                analyses[index] = answered.get(index) or self._fallback_analysis(error_text, pattern_match, trace)
+        
+        self.classifier.train_async(self.memory)
+        return analyses
+    
+    def _batch_deep_analysis(self, pending: Dict[int, tuple], system_info) -> Dict[int, ErrorAnalysis]:
+        """One LLM request for several errors, keyed by their index"""
+        system_prompt = f"""You are an expert system diagnostician. You will receive several numbered terminal errors.
+Analyze each one independently: error type and category, root cause, causality chain,
+affected components and severity.
+
+Respond with a JSON array holding one object per error. Each object has an "id" key with the
+error's number plus these exact keys:
+{ANALYSIS_SCHEMA}"""
+        
+        blocks = []
+        for index, (error_text, pattern_match, trace) in pending.items():
+            body = self._error_prompt(error_text, pattern_match, trace)
+            if len(body) > self.BATCH_ITEM_CHARS:
+                body = body[:self.BATCH_ITEM_CHARS] + "\n... (truncated)"
+            blocks.append(f"### Error {index}\n{body}")
+        
+        errors_text = "\n\n".join(blocks)
+        user_prompt = f"""Errors to analyze:
+
+{errors_text}
+{self._system_context(system_info)}
+
+Provide one analysis per error as a JSON array."""
+        
+        response = self.call_llm(system_prompt, user_prompt, temperature=0.3)
+        
+        answered: Dict[int, ErrorAnalysis] = {}
+        try:
+            items = self._parse_json(response)
+        except:
+            return answered
+        if not isinstance(items, list):
+            return answered
+        
+        for item in items:
+            try:
+                index = int(item.pop("id"))
+                if index not in pending or index in answered:
+                    continue
+                trace = pending[index][2]
+                if trace and not item.get("causality_chain"):
+                    item["causality_chain"] = trace.causality_chain()
+                answered[index] = ErrorAnalysis(**item)
+            except:
+                continue  # Malformed entries fall back individually
+        return answered
+    
+    def _dependency_analysis(self, resolution: dict) -> ErrorAnalysis:
+        """Build an analysis for a missing module from local package metadata"""
+        module = resolution["module"]
+        package = resolution["package"]
+        
+        if resolution["installed"] and "." in module and resolution["ecosystem"] == "python":
+            root_cause = f"{package} {resolution['version']} is installed but has no submodule '{module}'"
+            chain = [
+                f"{package} {resolution['version']} is installed",
+                f"'{module}' does not exist in this version",
+            ]
+        elif resolution["installed"]:
+            root_cause = (
+                f"{package} {resolution['version']} is installed but '{module}' could not be "
+                f"imported; the command is likely running under a different environment"
+            )
+            chain = [
+                f"{package} is installed in the active environment",
+                "The failing command resolves modules from another interpreter or project",
+                f"'{module}' cannot be found",
+            ]
+        else:
+            root_cause = f"{resolution['ecosystem'].title()} package '{package}' is not installed"
+            chain = [
+                f"{package} is not installed in the active environment",
+                f"Importing '{module}' fails",
+            ]
+        
+        return ErrorAnalysis(
+            error_type="module_not_found",
+            error_category="dependency",
+            severity="high",
+            root_cause=root_cause,
+            affected_components=[package],
+            causality_chain=chain,
+            confidence=0.9 if not resolution["installed"] else 0.7,
+            source="index"
+        )
+    
+    def _classifier_analysis(self, prediction: Prediction, error_text: str, trace=None) -> ErrorAnalysis:
+        """Build an analysis from the local classifier's prediction"""
+        return ErrorAnalysis(
+            error_type=prediction.error_type,
+            error_category=prediction.error_category,
+            severity=prediction.severity,
+            root_cause=(
+                trace.root.headline() if trace
+                else f"Matches {prediction.samples} past {prediction.error_type} errors"
+            ),
+            causality_chain=trace.causality_chain() if trace else [error_text[:100]],
+            confidence=prediction.confidence,
+            source="classifier"
+        )
+    
+    def _deep_analysis(self, error_text: str, system_info, pattern_match, trace=None) -> ErrorAnalysis:
         """Perform deep error analysis using LLM"""
         
-        system_prompt = """You are an expert system diagnostician. Analyze terminal errors and provide:
+        system_prompt = f"""You are an expert system diagnostician. Analyze terminal errors and provide:
 1. Error type and category
 2. Root cause (not just symptoms)
 3. Causality chain (how one issue led to another)
@@ -54,29 +246,11 @@ class ErrorAnalyzerAgent(BaseAgent):
 5. Severity level
 
 Respond in JSON format with these exact keys:
-{
-  "error_type": "string",
-  "error_category": "permission|not_found|dependency|config|network|unknown",
-  "severity": "low|medium|high|critical",
-  "root_cause": "string",
-  "affected_components": ["list"],
-  "causality_chain": ["list of steps from root cause to visible error"],
-  "confidence": 0.95
-}"""
-        
-        system_context = ""
-        if system_info:
-            system_context = f"\n\nSystem Context:\n- OS: {system_info.os_type}\n- Package Managers: {', '.join(system_info.package_managers)}"
-        
-        pattern_context = ""
-        if pattern_match:
-            pattern_name, pattern_info = pattern_match
-            pattern_context = f"\n\nPattern Match: {pattern_name} ({pattern_info['category']})"
+{ANALYSIS_SCHEMA}"""
         
         user_prompt = f"""Error to analyze:
-{error_text}
-{system_context}
-{pattern_context}
+{self._error_prompt(error_text, pattern_match, trace)}
+{self._system_context(system_info)}
 
 Provide detailed analysis in JSON format."""
         
@@ -84,33 +258,75 @@ Provide detailed analysis in JSON format."""
         
         # Parse JSON response
         try:
-            # Extract JSON from response (handle markdown code blocks)
-            json_str = response
-            if "```json" in response:
-                json_str = response.split("```json")[1].split("```")[0].strip()
-            elif "```" in response:
-                json_str = response.split("```")[1].split("```")[0].strip()
-            
-            data = json.loads(json_str)
+            data = self._parse_json(response)
+            if trace and not data.get("causality_chain"):
+                data["causality_chain"] = trace.causality_chain()
             return ErrorAnalysis(**data)
         except:
-            # Fallback to pattern match or default
-            if pattern_match:
-                _, info = pattern_match
-                return ErrorAnalysis(
-                    error_type=pattern_match[0],
-                    error_category=info["category"],
-                    severity=info["severity"],
-                    root_cause="Pattern-based detection",
-                    causality_chain=[error_text[:100]],
-                    confidence=0.7
-                )
-            else:
-                return ErrorAnalysis(
-                    error_type="unknown",
-                    error_category="unknown",
-                    severity="medium",
-                    root_cause="Unable to determine",
-                    causality_chain=[error_text[:100]],
-                    confidence=0.5
-                )
\ No newline at end of file
+            return self._fallback_analysis(error_text, pattern_match, trace)
+    
+    @staticmethod
+    def _system_context(system_info) -> str:
+        """System details for prompts"""
+        if not system_info:
+            return ""
+        return f"\n\nSystem Context:\n- OS: {system_info.os_type}\n- Package Managers: {', '.join(system_info.package_managers)}"
+    
+    @staticmethod
+    def _error_prompt(error_text: str, pattern_match, trace=None) -> str:
+        """Prompt text for one error; a parsed trace replaces the raw frames"""
+        error_summary = trace.summary() if trace else error_text
+        
+        pattern_context = ""
+        if pattern_match:
+            pattern_name, pattern_info = pattern_match
+            pattern_context = f"\n\nPattern Match: {pattern_name} ({pattern_info['category']})"
+        
+        return error_summary + pattern_context
+    
+    @staticmethod
+    def _parse_json(response: str):
+        """Extract JSON from response (handle markdown code blocks)"""
+        json_str = response
+        if "```json" in response:
+            json_str = response.split("```json")[1].split("```")[0].strip()
+        elif "```" in response:
+            json_str = response.split("```")[1].split("```")[0].strip()
+        return json.loads(json_str)
+    
+    def _fallback_analysis(self, error_text: str, pattern_match, trace=None) -> ErrorAnalysis:
+        """Fallback to pattern match, parsed trace or default"""
+        chain = trace.causality_chain() if trace else [error_text[:100]]
+        if pattern_match:
+            _, info = pattern_match
+            return ErrorAnalysis(
+                error_type=pattern_match[0],
+                error_category=info["category"],
+                severity=info["severity"],
+                root_cause=trace.root.headline() if trace else "Pattern-based detection",
+                causality_chain=chain,
+                confidence=0.7,
+                source="fallback"
+            )
+        elif trace:
+            frame = trace.root.user_frame
+            return ErrorAnalysis(
+                error_type=trace.root.exception_type,
+                error_category="unknown",
+                severity="medium",
+                root_cause=trace.root.headline(),
+                affected_components=[frame.file] if frame else [],
+                causality_chain=chain,
+                confidence=0.6,
+                source="fallback"
+            )
+        else:
+            return ErrorAnalysis(
+                error_type="unknown",
+                error_category="unknown",
+                severity="medium",
+                root_cause="Unable to determine",
+                causality_chain=chain,
+                confidence=0.5,
+                source="fallback"
+            )
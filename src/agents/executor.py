@@ -5,24 +5,54 @@
 
 from .base import BaseAgent
 from ..graph.state import AgentState
-from ..graph.state import ExecutionResult
+from ..graph.state import CommandResult, ExecutionResult
+from ..core.command_safety import CommandValidator
+from ..core.error_patterns import ErrorPatterns
+from ..core.command_dag import infer_dependencies, is_sequential, is_stateful, normalize_dependencies
+from ..core.idempotency import IdempotencyProbe
+from ..core.limits import ResourceLimits, command_timeout, kill_group, popen_group
+from ..core.shell_session import LINE_QUEUE_SIZE, ShellSession, child_env, pump_lines
+from ..core.stream_scanner import StreamScanner
+from ..storage.output_buffer import DEFAULT_SPILL_DIR, OutputBuffer
+import queue
 import subprocess
-from typing import List, Tuple
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
 class ExecutorAgent(BaseAgent):
     """Safely executes commands with validation and rollback"""
     
-    def __init__(self):
+    # Output kept in memory for the result; the rest spills to disk
+    OUTPUT_TAIL_BYTES = 64 * 1024
+    
+    # Lines of each command's stderr kept for the error message
+    STDERR_TAIL_LINES = 200
+    
+    # Independent commands run at most this many at a time
+    MAX_PARALLEL = 4
+    
+    def __init__(
+        self,
+        use_session: bool = True,
+        limits: Optional[ResourceLimits] = None,
+        spill_dir: Optional[str] = DEFAULT_SPILL_DIR,
+        skip_satisfied: bool = True,
+        cwd: Optional[str] = None,
+        env: Optional[Dict[str, Optional[str]]] = None
+    ):
         super().__init__("Executor", "Command Executor")
-        self.dangerous_patterns = [
-            r"rm -rf /",
-            r"rm -rf \*",
-            r"dd if=",
-            r"mkfs\.",
-            r"> /dev/sda",
-            r":(){ :|:& };:"  # Fork bomb
-        ]
+        self.use_session = use_session
+        self.limits = limits or ResourceLimits.from_env()
+        self.spill_dir = spill_dir
+        self.skip_satisfied = skip_satisfied
+        # Where commands run and environment overrides (sandboxed trial runs)
+        self.cwd = cwd
+        self.env = env
+        self.validator = CommandValidator()
     
     def process(self, state: AgentState) -> AgentState:
         """Execute selected strategy commands"""
@@ -64,25 +94,45 @@ class ExecutorAgent(BaseAgent):
     
     def _validate_commands(self, commands: List[str]) -> Tuple[bool, str]:
         """Validate commands for safety"""
-        import re
+        return self.validator.check(commands)
+    
+    def execute_commands(
+        self,
+        commands: List[str],
+        dry_run: bool = False,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        timeout: Optional[float] = None,
+        depends_on: Optional[List[List[int]]] = None,
+        command_timeouts: Optional[Dict[int, float]] = None
+    ) -> ExecutionResult:
+        """
+        Execute commands with safety checks, streaming their output.
         
-        for cmd in commands:
-            # Check for dangerous patterns
-            for pattern in self.dangerous_patterns:
-                if re.search(pattern, cmd):
-                    return False, f"Dangerous command detected: {cmd}"
-            
-            # Check for basic syntax
-            if cmd.strip().startswith("#"):
-                continue  # Comment
-            
-            if not cmd.strip():
-                continue  # Empty
+        `on_output(stream, line)` is called for every line as it arrives, with
+        stream "command" (the command about to run), "stdout" or "stderr".
+        Only the last OUTPUT_TAIL_BYTES of output are kept in memory; longer
+        output is spilled in full to a compressed file (ExecutionResult.output_file)
+        unless `spill_dir` is None.
         
-        return True, "Commands validated successfully"
-    
-    def execute_commands(self, commands: List[str], dry_run: bool = False) -> ExecutionResult:
-        """Execute commands with safety checks"""
+        `depends_on` lists, per command, the indices of earlier commands it
+        needs; without it dependencies are inferred. Independent commands run
+        up to MAX_PARALLEL at a time, each in its own shell. Strategies that
+        change shell state (cd, export, source) or have nothing to parallelize
+        share one bash session unless `use_session` is off.
+        
+        `timeout` is the per-command limit (default: TERMINAL_HERO_COMMAND_TIMEOUT
+        or 30 s) and `command_timeouts` overrides it by command index. A timed
+        out command is killed with its whole process group, and every command
+        runs under the executor's resource limits.
+        
+        With `skip_satisfied`, recognized idempotent commands (installs of
+        packages already present, mkdir -p of an existing directory, ...) are
+        probed just before they would run; a step whose postcondition holds
+        is not run, is reported with stream "satisfied" and gets status
+        "satisfied" in `command_results`. Strategies that change shell state
+        are never probed, since a probe cannot see the session's cwd or env;
+        neither are commands run in another directory (`cwd`).
+        """
         
         if dry_run:
             return ExecutionResult(
@@ -92,52 +142,320 @@ class ExecutorAgent(BaseAgent):
                 error=None
             )
         
+        safe, reason = self._validate_commands(commands)
+        if not safe:
+            return ExecutionResult(
+                success=False,
+                commands_executed=[],
+                output="",
+                error=f"Refused to execute: {reason}"
+            )
+        
+        steps = [i for i, cmd in enumerate(commands) if cmd.strip() and not cmd.strip().startswith("#")]
+        runnable = [commands[i] for i in steps]
+        default_timeout = timeout if timeout is not None else command_timeout()
+        timeouts = [(command_timeouts or {}).get(i, default_timeout) for i in steps]
+        if depends_on:
+            # Re-index declared dependencies onto the runnable commands
+            position = {index: n for n, index in enumerate(steps)}
+            graph = normalize_dependencies(
+                [[position[d] for d in depends_on[i] if d in position] if i < len(depends_on) else []
+                 for i in steps],
+                len(steps)
+            )
+        else:
+            graph = infer_dependencies(runnable)
+        
+        stateful = any(is_stateful(cmd) for cmd in runnable)
+        probe = IdempotencyProbe() if self.skip_satisfied and not stateful and not self.cwd else None
+        if self.MAX_PARALLEL > 1 and not is_sequential(graph) and not stateful:
+            return self._execute_graph(runnable, graph, on_output, timeouts, probe)
+        return self._execute_sequence(runnable, on_output, timeouts, probe)
+    
+    @staticmethod
+    def _check_satisfied(probe: Optional[IdempotencyProbe], cmd: str) -> Optional[CommandResult]:
+        """A "satisfied" result if the command's postcondition already holds"""
+        if probe is None:
+            return None
+        started = time.monotonic()
+        try:
+            reason = probe.satisfied(cmd)
+        except Exception:
+            return None  # A failed probe never skips a step
+        if reason is None:
+            return None
+        return CommandResult(
+            command=cmd,
+            status="satisfied",
+            duration=round(time.monotonic() - started, 3),
+            detail=reason
+        )
+    
+    def _execute_sequence(
+        self,
+        commands: List[str],
+        on_output: Optional[Callable[[str, str], None]],
+        timeouts: List[Optional[float]],
+        probe: Optional[IdempotencyProbe] = None
+    ) -> ExecutionResult:
+        """Run commands one after another, stopping at the first failure"""
         executed = []
-        output_lines = []
+        results: List[CommandResult] = []
+        output = self._output_buffer()
+        scanner = ErrorPatterns.stream_scanner()
+        stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
         
-        for cmd in commands:
-            if cmd.strip().startswith("#") or not cmd.strip():
-                continue
-            
-            try:
-                result = subprocess.run(
-                    cmd,
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                
-                executed.append(cmd)
-                output_lines.append(f"$ {cmd}")
-                output_lines.append(result.stdout)
+        def relay(stream: str, line: str):
+            output.append(line)
+            scanner.feed(line + "\n")
+            if stream == "stderr":
+                stderr_tail.append(line)
+            if on_output:
+                on_output(stream, line)
+        
+        def result(success: bool, error: Optional[str] = None) -> ExecutionResult:
+            results.extend(
+                CommandResult(command=cmd, status="skipped") for cmd in commands[len(results):]
+            )
+            return self._result(success, executed, output, error, results, scanner)
+        
+        # One bash for the whole strategy, so cd/export/source carry between steps
+        session = None
+        if self.use_session and ShellSession.available():
+            session = ShellSession(cwd=self.cwd, limits=self.limits, env=self.env)
+        try:
+            for cmd, timeout in zip(commands, timeouts):
+                satisfied = self._check_satisfied(probe, cmd)
+                if satisfied:
+                    results.append(satisfied)
+                    output.append(f"# satisfied: {cmd} ({satisfied.detail})")
+                    if on_output:
+                        on_output("satisfied", f"{cmd} ({satisfied.detail})")
+                    continue
                 
-                if result.returncode != 0:
-                    return ExecutionResult(
-                        success=False,
-                        commands_executed=executed,
-                        output="\n".join(output_lines),
-                        error=result.stderr
-                    )
+                started = time.monotonic()
+                try:
+                    executed.append(cmd)
+                    output.append(f"$ {cmd}")
+                    stderr_tail.clear()
+                    if on_output:
+                        on_output("command", cmd)
                     
-            except subprocess.TimeoutExpired:
-                return ExecutionResult(
-                    success=False,
-                    commands_executed=executed,
-                    output="\n".join(output_lines),
-                    error=f"Command timed out: {cmd}"
-                )
+                    if session:
+                        returncode = session.run(cmd, relay, timeout)
+                    else:
+                        returncode = self._stream_command(cmd, relay, timeout)
+                    
+                    results.append(self._command_result(cmd, returncode, started))
+                    if probe:
+                        probe.forget()  # The command may have changed what is installed
+                    if returncode is None:
+                        return result(False, f"Command timed out: {cmd}")
+                    if returncode != 0:
+                        return result(False, "\n".join(stderr_tail))
+                        
+                except Exception as e:
+                    results.append(CommandResult(
+                        command=cmd, status="failed", duration=time.monotonic() - started
+                    ))
+                    return result(False, str(e))
+        finally:
+            if session:
+                session.close()
+        
+        return result(True)
+    
+    def _execute_graph(
+        self,
+        commands: List[str],
+        graph: List[List[int]],
+        on_output: Optional[Callable[[str, str], None]],
+        timeouts: List[Optional[float]],
+        probe: Optional[IdempotencyProbe] = None
+    ) -> ExecutionResult:
+        """
+        Run commands as soon as their dependencies succeed, at most MAX_PARALLEL
+        at once. After a failure nothing new starts (fail-fast); commands
+        already running finish and the rest are reported as skipped. Satisfied
+        commands count as succeeded for their dependents.
+        """
+        lock = threading.Lock()
+        executed = []
+        results: Dict[int, CommandResult] = {}
+        errors: Dict[int, str] = {}
+        output = self._output_buffer()
+        scanner = ErrorPatterns.stream_scanner()
+        
+        def run(index: int) -> bool:
+            cmd = commands[index]
+            prefix = f"[{index + 1}] "
+            stderr_tail = deque(maxlen=self.STDERR_TAIL_LINES)
+            
+            satisfied = self._check_satisfied(probe, cmd)
+            if satisfied:
+                results[index] = satisfied
+                with lock:
+                    output.append(f"{prefix}# satisfied: {cmd} ({satisfied.detail})")
+                    if on_output:
+                        on_output("satisfied", f"{prefix}{cmd} ({satisfied.detail})")
+                return True
+            
+            def relay(stream: str, line: str):
+                with lock:
+                    output.append(prefix + line)
+                    scanner.feed(line + "\n")
+                    if stream == "stderr":
+                        stderr_tail.append(line)
+                    if on_output:
+                        on_output(stream, prefix + line)
+            
+            with lock:
+                executed.append(cmd)
+                output.append(f"{prefix}$ {cmd}")
+                if on_output:
+                    on_output("command", prefix + cmd)
+            
+            started = time.monotonic()
+            try:
+                returncode = self._stream_command(cmd, relay, timeouts[index])
             except Exception as e:
-                return ExecutionResult(
-                    success=False,
-                    commands_executed=executed,
-                    output="\n".join(output_lines),
-                    error=str(e)
-                )
+                returncode = -1
+                stderr_tail.append(str(e))
+            
+            results[index] = self._command_result(cmd, returncode, started)
+            if probe:
+                probe.forget()
+            if returncode is None:
+                errors[index] = f"Command timed out: {cmd}"
+            elif returncode != 0:
+                errors[index] = "\n".join(stderr_tail)
+            return returncode == 0
+        
+        pending = {i: set(deps) for i, deps in enumerate(graph)}
+        done = set()
+        failed = False
+        with ThreadPoolExecutor(max_workers=self.MAX_PARALLEL) as pool:
+            running = {}
+            while pending or running:
+                if not failed:
+                    ready = [i for i in sorted(pending) if pending[i] <= done]
+                    for i in ready[:self.MAX_PARALLEL - len(running)]:
+                        del pending[i]
+                        running[pool.submit(run, i)] = i
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    if future.result():
+                        done.add(index)
+                    else:
+                        failed = True
         
+        command_results = [
+            results.get(i) or CommandResult(command=cmd, status="skipped")
+            for i, cmd in enumerate(commands)
+        ]
+        error = "\n".join(errors[i] for i in sorted(errors)) if errors else None
+        return self._result(not errors, executed, output, error, command_results, scanner)
+    
+    def _output_buffer(self) -> OutputBuffer:
+        return OutputBuffer(max_bytes=self.OUTPUT_TAIL_BYTES, spill_dir=self.spill_dir)
+    
+    @staticmethod
+    def _result(
+        success: bool,
+        executed: List[str],
+        output: OutputBuffer,
+        error: Optional[str],
+        command_results: List[CommandResult],
+        scanner: Optional[StreamScanner] = None
+    ) -> ExecutionResult:
+        """Result holding the output tail, the full output file if it spilled, and patterns seen in it"""
+        output_file = output.close()
         return ExecutionResult(
-            success=True,
+            success=success,
             commands_executed=executed,
-            output="\n".join(output_lines),
-            error=None
+            output=output.text(),
+            error=error,
+            command_results=command_results,
+            output_file=output_file,
+            output_lines=output.lines,
+            error_patterns=[match.name for match in scanner.close()] if scanner else []
+        )
+    
+    @staticmethod
+    def _command_result(cmd: str, returncode: Optional[int], started: float) -> CommandResult:
+        if returncode is None:
+            status = "timed_out"
+        else:
+            status = "ok" if returncode == 0 else "failed"
+        return CommandResult(
+            command=cmd,
+            status=status,
+            exit_code=returncode,
+            duration=round(time.monotonic() - started, 3)
         )
+    
+    def _stream_command(
+        self,
+        cmd: str,
+        relay: Callable[[str, str], None],
+        timeout: Optional[float]
+    ) -> Optional[int]:
+        """Run one command in its own shell and process group, relaying lines as they arrive; None on timeout"""
+        process = popen_group(
+            cmd,
+            shell=True,
+            limits=self.limits,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            cwd=self.cwd,
+            env=child_env(self.env) if self.env else None
+        )
+        
+        # One reader per pipe so neither can fill up and block the command
+        lines = queue.Queue(LINE_QUEUE_SIZE)
+        abandoned = threading.Event()
+        for pipe, stream in ((process.stdout, "stdout"), (process.stderr, "stderr")):
+            threading.Thread(
+                target=pump_lines, args=(pipe, stream, lines, abandoned), daemon=True
+            ).start()
+        
+        try:
+            return self._relay_lines(process, lines, relay, timeout)
+        finally:
+            abandoned.set()
+    
+    @staticmethod
+    def _relay_lines(
+        process: subprocess.Popen,
+        lines: queue.Queue,
+        relay: Callable[[str, str], None],
+        timeout: Optional[float]
+    ) -> Optional[int]:
+        """Relay queued lines until both pipes close; the exit code, or None on timeout"""
+        deadline = time.monotonic() + timeout if timeout else None
+        open_streams = 2
+        while open_streams:
+            remaining = deadline - time.monotonic() if deadline else 0.1
+            if remaining <= 0:
+                kill_group(process)
+                return None
+            try:
+                stream, line = lines.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+            if line is None:
+                open_streams -= 1
+                continue
+            relay(stream, line)
+        
+        try:
+            return process.wait(timeout=max(0.0, deadline - time.monotonic()) if deadline else None)
+        except subprocess.TimeoutExpired:
+            kill_group(process)
+            return None
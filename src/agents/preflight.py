@@ -0,0 +1,57 @@
+# ============================================================================
+# FILE: src/agents/preflight.py
+# Agent that checks generated strategies against the local system
+# ============================================================================
+
+from .base import BaseAgent
+from ..graph.state import AgentState
+from ..core.preflight import PreflightChecker
+
+class PreflightAgent(BaseAgent):
+    """Annotates and down-ranks strategies that cannot run or would change nothing"""
+    
+    # Confidence multipliers for strategies pre-flight finds problems with
+    INFEASIBLE_PENALTY = 0.3
+    REDUNDANT_PENALTY = 0.5
+    
+    def __init__(self):
+        super().__init__("Preflight", "Feasibility Checker")
+        self.checker = PreflightChecker()
+    
+    def process(self, state: AgentState) -> AgentState:
+        """Check every strategy concurrently and reorder them by feasibility"""
+        strategies = state.get("solution_strategies", [])
+        if not strategies:
+            return state
+        
+        self.log_activity(state, "active", f"Checking {len(strategies)} strategies against this system...")
+        
+        try:
+            reports = self.checker.check_all(strategies)
+            
+            for strategy, report in zip(strategies, reports):
+                strategy.preflight_issues = report.issues()
+                if not report.feasible:
+                    strategy.confidence = round(strategy.confidence * self.INFEASIBLE_PENALTY, 2)
+                elif report.redundant:
+                    strategy.confidence = round(strategy.confidence * self.REDUNDANT_PENALTY, 2)
+            
+            # Runnable strategies first, then no-ops, then ones that cannot run; otherwise keep order
+            ranked = sorted(
+                zip(strategies, reports),
+                key=lambda item: (not item[1].feasible, item[1].redundant)
+            )
+            state["solution_strategies"] = [strategy for strategy, _ in ranked]
+            
+            flagged = sum(1 for r in reports if not r.feasible or r.redundant)
+            self.log_activity(
+                state,
+                "complete",
+                f"{len(strategies) - flagged} of {len(strategies)} strategies ready to run"
+            )
+            
+        except Exception as e:
+            # Pre-flight is advisory; the strategies are still offered unchecked
+            self.log_activity(state, "error", f"Pre-flight check failed: {str(e)}")
+        
+        return state
@@ -6,14 +6,23 @@
 from .base import BaseAgent
 from ..graph.state import AgentState
 from ..graph.state import SolutionStrategy
+from ..core.error_patterns import ErrorPatterns
+from ..core.fingerprint import fingerprint_error
+from ..core.strategy_rules import StrategyRules
+from ..storage.memory import MemorySystem
+import hashlib
 import json
-from typing import List
+from typing import List, Optional, Tuple
 
 class SolutionArchitectAgent(BaseAgent):
     """Generates multiple solution strategies with risk assessment"""
     
+    # Cached strategies tried at least once with a lower success rate are dropped
+    MIN_SUCCESS_RATE = 0.5
+    
     def __init__(self):
         super().__init__("SolutionArchitect", "Solution Designer")
+        self.memory = MemorySystem()
     
     def process(self, state: AgentState) -> AgentState:
         """Generate solution strategies"""
@@ -23,20 +32,41 @@ class SolutionArchitectAgent(BaseAgent):
             error_analysis = state.get("error_analysis")
             system_info = state.get("system_info")
             docs = state.get("documentation_results", [])
+            matches = state.get("pattern_matches", [])
             
             if not error_analysis:
                 state["solution_strategies"] = []
                 return state
             
-            # Generate multiple strategies
-            strategies = self._generate_strategies(error_analysis, system_info, docs)
-            state["solution_strategies"] = strategies
+            # Strategies already generated for this error on this kind of system
+            cache_key, fingerprint = self._cache_key(state)
+            strategies = self._cached_strategies(cache_key, fingerprint)
+            message = f"Reused {len(strategies)} cached solution strategies"
             
-            self.log_activity(
-                state,
-                "complete",
-                f"Generated {len(strategies)} solution strategies"
-            )
+            if not strategies:
+                # Well-understood errors get concrete fixes without an LLM round trip
+                strategies = StrategyRules(
+                    error_analysis,
+                    system_info,
+                    matches,
+                    state.get("dependency_resolution"),
+                    state.get("project_context")
+                ).build()
+                message = f"Built {len(strategies)} solution strategies from known fixes"
+            
+            if not strategies:
+                # Generate multiple strategies
+                strategies = self._generate_strategies(error_analysis, system_info, docs, matches)
+                if strategies:
+                    self.memory.cache_strategies(
+                        cache_key, fingerprint, [s.model_dump() for s in strategies]
+                    )
+                else:
+                    strategies = self._generate_fallback_strategy(error_analysis, system_info, matches)
+                message = f"Generated {len(strategies)} solution strategies"
+            
+            state["solution_strategies"] = strategies
+            self.log_activity(state, "complete", message)
             
         except Exception as e:
             self.log_activity(state, "error", f"Strategy generation failed: {str(e)}")
@@ -44,8 +74,41 @@ class SolutionArchitectAgent(BaseAgent):
         
         return state
     
-    def _generate_strategies(self, error_analysis, system_info, docs) -> List[SolutionStrategy]:
-        """Generate multiple solution approaches using LLM"""
+    @staticmethod
+    def _system_hash(system_info) -> str:
+        """Hash of the system traits strategies depend on (OS and package managers)"""
+        if not system_info:
+            return "unknown"
+        traits = f"{system_info.os_type}|{','.join(sorted(system_info.package_managers))}"
+        return hashlib.sha1(traits.encode()).hexdigest()[:12]
+    
+    def _cache_key(self, state: AgentState) -> Tuple[str, str]:
+        """Strategy cache key (error fingerprint + system hash) and the fingerprint"""
+        fingerprint = state.get("error_fingerprint") or fingerprint_error(state.get("raw_error", ""))
+        return fingerprint.key(self._system_hash(state.get("system_info"))), fingerprint.fingerprint
+    
+    def _cached_strategies(self, cache_key: str, fingerprint: str) -> List[SolutionStrategy]:
+        """Cached strategies that have not failed for this error, best recorded success rate first"""
+        ranked = []
+        for data in self.memory.get_cached_strategies(cache_key):
+            try:
+                strategy = SolutionStrategy(**data)
+            except:
+                continue
+            
+            # Outcomes for this error only; a fix that failed elsewhere may still fit here
+            stats = self.memory.get_solution_stats(str(strategy.commands), fingerprint)
+            if stats["attempts"]:
+                if stats["successes"] / stats["attempts"] < self.MIN_SUCCESS_RATE:
+                    continue  # Failed when tried; regenerate instead of offering it again
+                strategy.confidence = (stats["successes"] + 1) / (stats["attempts"] + 2)
+            ranked.append((stats["successes"], strategy))
+        
+        ranked.sort(key=lambda item: (item[1].confidence, item[0]), reverse=True)
+        return [strategy for _, strategy in ranked]
+    
+    def _generate_strategies(self, error_analysis, system_info, docs, matches=None) -> Optional[List[SolutionStrategy]]:
+        """Generate multiple solution approaches using LLM (None if it gave nothing usable)"""
         
         system_prompt = """You are a senior DevOps engineer. Given an error analysis, generate 3 different solution strategies:
 1. Quick Fix - Fast but may have limitations
@@ -104,39 +167,52 @@ Generate 3 solution strategies in JSON array format."""
             
             data = json.loads(json_str)
             strategies = [SolutionStrategy(**s) for s in data]
-            return strategies
+            return strategies or None
         except Exception as e:
-            # Fallback strategy
-            return self._generate_fallback_strategy(error_analysis, system_info)
+            return None
     
-    def _generate_fallback_strategy(self, error_analysis, system_info) -> List[SolutionStrategy]:
+    def _generate_fallback_strategy(self, error_analysis, system_info, matches=None) -> List[SolutionStrategy]:
         """Generate a basic fallback strategy"""
         
-        # Simple heuristics based on error category
-        if error_analysis.error_category == "not_found":
-            if system_info and "apt" in system_info.package_managers:
-                commands = ["sudo apt-get update", "sudo apt-get install <package>"]
-            elif system_info and "brew" in system_info.package_managers:
-                commands = ["brew install <package>"]
-            else:
-                commands = ["# Install the missing package using your package manager"]
-        elif error_analysis.error_category == "permission":
-            commands = ["sudo <your-command>"]
-        elif error_analysis.error_category == "dependency":
-            commands = ["# Install missing dependencies"]
-        else:
-            commands = ["# Manual investigation required"]
+        # Concrete fixes rendered from parameters captured by pattern packs
+        package_managers = system_info.package_managers if system_info else []
+        for match in matches or []:
+            fixes = ErrorPatterns.fixes_for(match, package_managers)
+            if fixes:
+                return [
+                    SolutionStrategy(
+                        name=f"Pattern Fix {i}" if len(fixes) > 1 else "Pattern Fix",
+                        description=f"Known fix for {match.name} ({', '.join(f'{k}={v}' for k, v in match.groups.items())})",
+                        commands=commands,
+                        risk_level="low" if match.category == "dependency" else "medium",
+                        estimated_time="1 minute",
+                        confidence=min(0.85, match.score * 0.85),
+                        prerequisites=[],
+                        side_effects=[],
+                        rollback_commands=[]
+                    )
+                    for i, commands in enumerate(fixes, 1)
+                ]
+        
+        # Nothing concrete is known: gather the facts needed to fix it by hand
+        commands = ["uname -a", "echo \"$PATH\""]
+        if error_analysis.error_category == "permission":
+            commands.append("id")
+        elif error_analysis.error_category in ("not_found", "dependency"):
+            commands.extend(f"{pm} --version" for pm in package_managers)
+        elif error_analysis.error_category == "network":
+            commands.append("getent hosts pypi.org github.com")
         
         return [
             SolutionStrategy(
-                name="Basic Fix",
-                description=f"Address the {error_analysis.error_category} issue",
+                name="Collect Diagnostics",
+                description=f"No automatic fix is known for this {error_analysis.error_category} issue; show the environment details needed to investigate it",
                 commands=commands,
-                risk_level="medium",
-                estimated_time="5 minutes",
-                confidence=0.6,
+                risk_level="low",
+                estimated_time="1 minute",
+                confidence=0.3,
                 prerequisites=[],
-                side_effects=["May require system-level changes"],
+                side_effects=[],
                 rollback_commands=[]
             )
         ]
\ No newline at end of file
@@ -0,0 +1,156 @@
+# ============================================================================
+# FILE: src/agents/trial.py
+# Tries strategies in throwaway sandboxes before the real run
+# ============================================================================
+
+from .executor import ExecutorAgent
+from ..graph.state import SolutionStrategy, TrialResult
+from ..core.project_scanner import ProjectScanner
+from ..core.sandbox import DEFAULT_TRIAL_DIR, Sandbox, SandboxError, local_violation, strategy_violation
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+class TrialRunner:
+    """
+    Runs file-local strategies side by side in sandboxes and re-checks the
+    failing command. Not a workflow node: trials execute commands, so they
+    run only when the user asks for them (diagnose --trial).
+    """
+
+    # Sandboxes tried at once (each may run up to ExecutorAgent.MAX_PARALLEL commands)
+    MAX_PARALLEL = 3
+
+    # Name of the run that re-checks the command in an untouched sandbox
+    BASELINE = "(no changes)"
+
+    # Lines of the re-checked command's output kept per trial
+    OUTPUT_TAIL_LINES = 20
+
+    def __init__(self, base_dir: Optional[str] = DEFAULT_TRIAL_DIR):
+        self.base_dir = base_dir
+
+    def run_trials(
+        self,
+        strategies: List[SolutionStrategy],
+        failing_command: str,
+        project_root: Optional[str] = None,
+        cwd: Optional[str] = None,
+        on_progress: Optional[Callable[[str, str], None]] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[TrialResult, List[TrialResult]]:
+        """
+        Try each file-local strategy in its own sandbox, MAX_PARALLEL at a
+        time, then re-run `failing_command` there. Nothing runs in the real
+        project. Returns the baseline (the command re-run in an untouched
+        sandbox, which should still fail) and one result per strategy, in
+        order. Strategies that may reach outside the project (system
+        packages, sudo, interpreter-wide installs, absolute paths, ...) are
+        reported as not eligible.
+
+        `on_progress(strategy name, message)` is called from worker threads
+        as trials advance; `timeout` limits each run of the failing command.
+        """
+        cwd = Path(cwd or os.getcwd()).resolve()
+        root = Path(project_root).resolve() if project_root else ProjectScanner.find_root(cwd)
+        relative = os.path.relpath(cwd, root) if cwd == root or root in cwd.parents else "."
+
+        blocked = local_violation(failing_command, relative)
+        if blocked:
+            reason = f"The failing command cannot be sandboxed: {blocked}"
+            return (
+                TrialResult(strategy=self.BASELINE, eligible=False, reason=reason),
+                [TrialResult(strategy=s.name, eligible=False, reason=reason) for s in strategies]
+            )
+
+        results: List[Optional[TrialResult]] = []
+        jobs = []
+        for index, strategy in enumerate(strategies):
+            violation = strategy_violation(strategy.commands, relative)
+            if violation:
+                results.append(TrialResult(strategy=strategy.name, eligible=False, reason=violation))
+            else:
+                results.append(None)
+                jobs.append(index)
+
+        def trial(strategy: Optional[SolutionStrategy]) -> TrialResult:
+            return self._trial(strategy, failing_command, root, cwd, on_progress, timeout)
+
+        with ThreadPoolExecutor(max_workers=self.MAX_PARALLEL) as pool:
+            baseline = pool.submit(trial, None)
+            futures = {index: pool.submit(trial, strategies[index]) for index in jobs}
+            for index, future in futures.items():
+                results[index] = future.result()
+            return baseline.result(), results
+
+    def _trial(
+        self,
+        strategy: Optional[SolutionStrategy],
+        failing_command: str,
+        root: Path,
+        cwd: Path,
+        on_progress: Optional[Callable[[str, str], None]],
+        timeout: Optional[float]
+    ) -> TrialResult:
+        """One sandbox: build it, run the strategy (if any), re-run the failing command"""
+        name = strategy.name if strategy else self.BASELINE
+        result = TrialResult(strategy=name, eligible=True)
+
+        def progress(message: str):
+            if on_progress:
+                on_progress(name, message)
+
+        started = time.monotonic()
+        sandbox = Sandbox(str(root), self.base_dir)
+        try:
+            sandbox.create()
+        except (OSError, SandboxError) as e:
+            result.reason = f"Could not build sandbox: {e}"
+            progress(result.reason)
+            return result
+
+        try:
+            result.setup_time = round(time.monotonic() - started, 3)
+            executor = ExecutorAgent(
+                cwd=str(sandbox.cwd_for(str(cwd))),
+                env=sandbox.environ(),
+                spill_dir=None,
+                skip_satisfied=False
+            )
+
+            if strategy:
+                progress(f"sandbox ready in {result.setup_time:.1f}s, running {len(strategy.commands)} command(s)")
+                started = time.monotonic()
+                run = executor.execute_commands(
+                    strategy.commands,
+                    timeout=strategy.timeout,
+                    depends_on=strategy.depends_on,
+                    command_timeouts=strategy.command_timeouts
+                )
+                result.strategy_time = round(time.monotonic() - started, 3)
+                if not run.success:
+                    last_line = (run.error or "").strip().splitlines()[-1:] or ["no error output"]
+                    result.reason = f"Strategy failed: {last_line[0]}"
+                    progress(result.reason)
+                    return result
+
+            progress(f"re-running: {failing_command}")
+            started = time.monotonic()
+            check = executor.execute_commands([failing_command], timeout=timeout)
+            result.recheck_time = round(time.monotonic() - started, 3)
+            if check.command_results:
+                result.recheck_exit_code = check.command_results[0].exit_code
+            result.recheck_output = "\n".join(check.output.splitlines()[-self.OUTPUT_TAIL_LINES:])
+            result.fixed = check.success
+            if not check.success:
+                timed_out = check.command_results and check.command_results[0].status == "timed_out"
+                result.reason = "Command timed out" if timed_out else (
+                    check.error if not check.command_results else "Command still fails"
+                )
+            progress("fixed" if result.fixed else result.reason)
+        finally:
+            sandbox.close()
+
+        return result
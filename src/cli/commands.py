@@ -10,7 +10,10 @@ from .ui import TerminalHeroUI, console
 from ..graph.workflow import TerminalHeroWorkflow
 from ..storage.memory import MemorySystem
 from ..storage.history import CommandHistory
+from ..storage.search_cache import SearchCache
 from ..agents.executor import ExecutorAgent
+from ..agents.trial import TrialRunner
+from ..core.sandbox import strategy_violation
 from ..monitor.terminal_monitor import TerminalMonitor
 import sys
 import os
@@ -31,7 +34,11 @@ history = CommandHistory()
 
 @app.command()
 def diagnose(
-    error: Optional[str] = typer.Argument(None, help="Error message or description")
+    error: Optional[str] = typer.Argument(None, help="Error message or description"),
+    trial: Optional[str] = typer.Option(
+        None, "--trial",
+        help="Failing command to re-run after trying file-local strategies in sandboxes"
+    )
 ):
     """Diagnose and fix a terminal error"""
     
@@ -73,6 +80,9 @@ def diagnose(
             strategies = result["solution_strategies"]
             ui.print_solution_strategies(strategies)
             
+            if trial:
+                _run_trials(result, strategies, trial)
+            
             # Prompt for selection
             while True:
                 choice = ui.prompt_strategy_selection(strategies)
@@ -100,33 +110,46 @@ def diagnose(
             # Confirm execution
             if ui.prompt_execution_confirmation():
                 executor = ExecutorAgent()
-                exec_result = executor.execute_commands(selected.commands)
+                console.print()
+                exec_result = executor.execute_commands(
+                    selected.commands,
+                    on_output=ui.print_output_line,
+                    timeout=selected.timeout,
+                    depends_on=selected.depends_on,
+                    command_timeouts=selected.command_timeouts
+                )
+                console.print()
                 
                 if exec_result.success:
                     ui.print_success("Commands executed successfully!")
-                    console.print("\n[bold]Output:[/bold]")
-                    console.print(exec_result.output)
+                    if exec_result.satisfied:
+                        ui.print_info(
+                            f"{len(exec_result.satisfied)} step(s) were already satisfied and skipped"
+                        )
                     
                     # Record in history
                     history.add_execution(
                         commands=selected.commands,
                         rollback_commands=selected.rollback_commands,
-                        description=selected.name
+                        description=selected.name,
+                        output_file=exec_result.output_file,
+                        output_lines=exec_result.output_lines
                     )
                     
                     # Record in memory
-                    if result.get("error_analysis"):
-                        memory.record_solution_attempt(
-                            error_type=result["error_analysis"].error_type,
-                            error_category=result["error_analysis"].error_category,
-                            raw_error=error[:500],
-                            solution=str(selected.commands),
-                            success=True
-                        )
+                    _record_attempt(result, error, selected, True)
                 else:
                     ui.print_error("Execution failed!")
+                    _record_attempt(result, error, selected, False)
                     if exec_result.error:
                         console.print(f"\n[red]Error:[/red] {exec_result.error}")
+                    if exec_result.error_patterns:
+                        ui.print_info(f"Recognized in the output: {', '.join(exec_result.error_patterns)}")
+                
+                if exec_result.output_file:
+                    ui.print_info(
+                        f"Full output ({exec_result.output_lines} lines) saved to {exec_result.output_file}"
+                    )
             else:
                 console.print("[yellow]Execution cancelled.[/yellow]")
         else:
@@ -136,6 +159,45 @@ def diagnose(
         ui.print_error(f"Workflow failed: {str(e)}")
         raise typer.Exit(1)
 
+def _run_trials(result, strategies, failing_command: str):
+    """Try file-local strategies in sandboxes and show which fixed the command"""
+    project_root = (result.get("project_context") or {}).get("project_root")
+    local = [s for s in strategies if strategy_violation(s.commands) is None]
+    if not local:
+        ui.print_info("No strategy stays within the project, so none can be tried in a sandbox.")
+        return
+    if not ui.prompt_trial_confirmation(len(local)):
+        return
+    
+    console.print()
+    baseline, trials = TrialRunner().run_trials(
+        strategies,
+        failing_command,
+        project_root=project_root,
+        on_progress=ui.print_trial_progress
+    )
+    console.print()
+    ui.print_trial_results(baseline, trials)
+    
+    fixed = [t.strategy for t in trials if t.fixed]
+    if fixed and not baseline.fixed:
+        ui.print_success(f"Fixed in a sandbox: {', '.join(fixed)}")
+
+def _record_attempt(result, error: str, strategy, success: bool):
+    """Record a strategy outcome so cached strategies are ranked (or dropped) by it"""
+    if not result.get("error_analysis"):
+        return
+    fingerprint = result.get("error_fingerprint")
+    memory.record_solution_attempt(
+        error_type=result["error_analysis"].error_type,
+        error_category=result["error_analysis"].error_category,
+        raw_error=error[:500],
+        solution=str(strategy.commands),
+        success=success,
+        fingerprint=fingerprint.fingerprint if fingerprint else None,
+        label_source=result["error_analysis"].source
+    )
+
 @app.command()
 def doctor():
     """Run a health check on your system"""
@@ -157,6 +219,13 @@ def doctor():
     table.add_row("Node.js", info.node_version or "Not found")
     table.add_row("Package Managers", ", ".join(info.package_managers))
     
+    cache_stats = SearchCache().stats()
+    lookups = cache_stats["hits"] + cache_stats["negative_hits"] + cache_stats["misses"]
+    table.add_row(
+        "Doc Search Cache",
+        f"{cache_stats['entries']} entries, {cache_stats['hit_rate']:.0%} hit rate over {lookups} lookups"
+    )
+    
     console.print(table)
     console.print()
     
@@ -185,22 +254,38 @@ def undo(
         ui.print_info("Executing rollback commands...")
         
         executor = ExecutorAgent()
-        result = executor.execute_commands(exec_entry["rollback_commands"])
+        result = executor.execute_commands(
+            exec_entry["rollback_commands"], on_output=ui.print_output_line
+        )
         
         if result.success:
             ui.print_success("Rollback successful!")
         else:
             ui.print_error("Rollback failed!")
-            console.print(result.error)
+            if result.error:
+                console.print(result.error, markup=False)
     else:
         ui.print_error("No rollback commands available for this execution.")
 
 @app.command()
 def history_cmd(
-    count: int = typer.Option(10, help="Number of recent executions to show")
+    count: int = typer.Option(10, help="Number of recent executions to show"),
+    output: Optional[int] = typer.Option(None, help="Show the saved output of this execution ID"),
+    lines: int = typer.Option(200, help="Lines of saved output to show")
 ):
     """Show execution history"""
     
+    if output is not None:
+        entry = history.get_execution_by_id(output)
+        if not entry:
+            ui.print_error(f"No execution with ID {output}.")
+            raise typer.Exit(1)
+        if not entry.get("output_file"):
+            ui.print_info("That execution's output was not saved (it fit in the terminal).")
+            return
+        ui.print_output_file(history.read_output(entry, limit=lines), entry.get("output_lines", 0))
+        return
+    
     recent = history.list_recent(count)
     
     if not recent:
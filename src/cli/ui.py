@@ -11,9 +11,10 @@ from rich.live import Live
 from rich.layout import Layout
 from rich.tree import Tree
 from rich.syntax import Syntax
+from rich.markup import escape
 from rich import box
-from typing import List, Dict
-from ..graph.state import ErrorAnalysis, SolutionStrategy, DocumentationResult
+from typing import Iterable, List, Dict
+from ..graph.state import ErrorAnalysis, SolutionStrategy, DocumentationResult, TrialResult
 
 console = Console()
 
@@ -71,6 +72,7 @@ class TerminalHeroUI:
             "ErrorAnalyzer",
             "DocSearch",
             "SolutionArchitect",
+            "Preflight",
             "Executor"
         ]
         
@@ -172,6 +174,11 @@ class TerminalHeroUI:
                 for effect in strategy.side_effects:
                     strategy_content += f"  • {effect}\n"
             
+            if strategy.preflight_issues:
+                strategy_content += f"\n[red]Pre-flight:[/red]\n"
+                for issue in strategy.preflight_issues:
+                    strategy_content += f"  • {issue}\n"
+            
             panel = Panel(
                 strategy_content,
                 title=f"Strategy {i}",
@@ -227,6 +234,80 @@ class TerminalHeroUI:
                 console.print(f"   • {effect}")
             console.print()
     
+    @staticmethod
+    def print_output_line(stream: str, line: str):
+        """Print one line of live command output"""
+        if stream == "command":
+            console.print(f"[bold cyan]$ {escape(line)}[/bold cyan]")
+        elif stream == "satisfied":
+            console.print(f"[green]✓ Already satisfied, skipped: {escape(line)}[/green]")
+        elif stream == "stderr":
+            console.print(line, style="red", markup=False, highlight=False)
+        else:
+            console.print(line, style="dim", markup=False, highlight=False)
+    
+    @staticmethod
+    def print_output_file(lines: Iterable[str], total: int = 0):
+        """Print output read lazily from a spill file"""
+        shown = 0
+        for line in lines:
+            console.print(line, style="dim", markup=False, highlight=False)
+            shown += 1
+        if total > shown:
+            console.print(f"[dim]... {total - shown} more lines[/dim]")
+    
+    @staticmethod
+    def print_trial_progress(strategy: str, message: str):
+        """Print one progress line from a sandbox trial"""
+        console.print(f"[dim]\\[{escape(strategy)}][/dim] {escape(message)}")
+    
+    @staticmethod
+    def print_trial_results(baseline: TrialResult, results: List[TrialResult]):
+        """Print which strategies fixed the failing command in a sandbox"""
+        table = Table(
+            title="🧪 Sandbox Trials",
+            box=box.ROUNDED,
+            show_header=True,
+            header_style="bold magenta"
+        )
+        table.add_column("Strategy", style="cyan")
+        table.add_column("Result", width=12)
+        table.add_column("Setup", justify="right")
+        table.add_column("Fix", justify="right")
+        table.add_column("Re-check", justify="right")
+        table.add_column("Notes", style="dim")
+        
+        for trial in [baseline] + results:
+            if not trial.eligible:
+                outcome = "[dim]not tried[/dim]"
+            elif trial.fixed:
+                outcome = "[green]✓ passes[/green]" if trial is baseline else "[green]✓ fixed[/green]"
+            else:
+                outcome = "[red]✗ fails[/red]"
+            timings = [
+                f"{seconds:.1f}s" if trial.eligible and seconds else "-"
+                for seconds in (trial.setup_time, trial.strategy_time, trial.recheck_time)
+            ]
+            table.add_row(escape(trial.strategy), outcome, *timings, escape(trial.reason or ""))
+        
+        console.print(table)
+        console.print()
+        
+        if baseline.fixed:
+            console.print(
+                "[yellow]⚠️  The command already passes in an untouched sandbox, so these trials "
+                "cannot tell which strategy fixes it.[/yellow]"
+            )
+            console.print()
+    
+    @staticmethod
+    def prompt_trial_confirmation(count: int) -> bool:
+        """Prompt before running strategies in sandboxes"""
+        response = console.input(
+            f"[bold yellow]Try {count} strategy(ies) in throwaway sandboxes first? [y/N]: [/bold yellow]"
+        )
+        return response.lower() in ['y', 'yes']
+    
     @staticmethod
     def prompt_strategy_selection(strategies: List[SolutionStrategy]) -> int:
         """Prompt user to select a strategy"""
@@ -0,0 +1,126 @@
+# ============================================================================
+# FILE: src/core/command_dag.py
+# Dependency graphs over a strategy's commands
+# ============================================================================
+
+from typing import List, Optional
+
+from .preflight import install_target, is_refresh, program_words, split_command
+
+# Builtins whose effect on the shell must reach later steps
+STATEFUL_BUILTINS = {
+    "cd", "pushd", "popd", "export", "unset", "source", ".", "set", "alias",
+    "shopt", "umask", "ulimit", "eval", "exec",
+}
+
+# Cache cleanups, keyed by the package manager they lock
+CLEANUPS = {
+    ("pip", "cache"): "python",
+    ("npm", "cache"): "node",
+    ("yarn", "cache"): "node",
+    ("apt-get", "clean"): "apt",
+    ("apt", "clean"): "apt",
+    ("brew", "cleanup"): "brew",
+    ("dnf", "clean"): "rpm",
+    ("yum", "clean"): "rpm",
+}
+
+# Package managers sharing one lock or database
+LOCK_GROUPS = {"dnf": "rpm", "yum": "rpm"}
+
+# System package managers: what they install (headers, compilers, runtimes)
+# often feeds language-level installs, so those wait for them
+SYSTEM_RESOURCES = {"apt", "rpm", "brew", "pacman"}
+
+
+def _segments(command: str) -> Optional[List[List[str]]]:
+    try:
+        return [program_words(words) for words in split_command(command)]
+    except ValueError:
+        return None
+
+
+def is_stateful(command: str) -> bool:
+    """Whether a command changes the shell state (cwd, environment) for later steps"""
+    segments = _segments(command)
+    if segments is None:
+        return True
+    return any(words and words[0] in STATEFUL_BUILTINS for words in segments)
+
+
+def command_resource(command: str) -> Optional[str]:
+    """
+    The package manager a command only installs with or cleans up after
+    (python, node, apt, ...), or None for anything else. Commands on
+    different resources cannot interfere with each other.
+    """
+    segments = _segments(command)
+    if not segments:
+        return None
+    resources = set()
+    for words in segments:
+        if not words:
+            continue
+        target = install_target(words)
+        if target:
+            resources.add(LOCK_GROUPS.get(target.ecosystem, target.ecosystem))
+            continue
+        program = words[0].split("/")[-1]
+        args = words[1:]
+        if program.startswith("python") and args[:2] == ["-m", "pip"]:
+            program, args = "pip", args[2:]
+        resource = CLEANUPS.get((program, args[0] if args else ""))
+        if resource is None and is_refresh(words):
+            resource = LOCK_GROUPS.get(program, "apt" if program.startswith("apt") else program)
+        if resource is None:
+            return None
+        resources.add(resource)
+    return resources.pop() if len(resources) == 1 else None
+
+
+def infer_dependencies(commands: List[str]) -> List[List[int]]:
+    """
+    Prerequisites of each command, by index. Installs and cleanups for
+    different language package managers are independent; steps on the same
+    manager stay in order, and language installs wait for earlier system
+    package steps (libpq-dev before pip install psycopg2, brew install node
+    before npm install). Any other command is a barrier that waits for
+    everything before it and that everything after it waits for.
+    """
+    graph: List[List[int]] = []
+    barrier: Optional[int] = None
+    since_barrier: List[int] = []
+    system_steps: List[int] = []
+    last_on: dict = {}
+
+    for i, command in enumerate(commands):
+        resource = command_resource(command)
+        if resource is None:
+            deps = list(since_barrier) if since_barrier else ([barrier] if barrier is not None else [])
+            barrier, since_barrier, system_steps, last_on = i, [], [], {}
+        else:
+            deps = [barrier] if barrier is not None else []
+            if resource in last_on:
+                deps.append(last_on[resource])
+            if resource in SYSTEM_RESOURCES:
+                system_steps.append(i)
+            else:
+                deps.extend(system_steps)
+            last_on[resource] = i
+            since_barrier.append(i)
+        graph.append(sorted(set(deps)))
+    return graph
+
+
+def normalize_dependencies(depends_on: Optional[List[List[int]]], count: int) -> List[List[int]]:
+    """Declared dependencies limited to earlier commands, so the graph has no cycles"""
+    graph = []
+    for i in range(count):
+        deps = depends_on[i] if depends_on and i < len(depends_on) else []
+        graph.append(sorted({d for d in deps if isinstance(d, int) and 0 <= d < i}))
+    return graph
+
+
+def is_sequential(graph: List[List[int]]) -> bool:
+    """Whether the graph leaves nothing to run in parallel"""
+    return all(i - 1 in deps for i, deps in enumerate(graph) if i)
@@ -0,0 +1,366 @@
+# ============================================================================
+# FILE: src/core/command_safety.py
+# Tokenizer-based safety validation for commands before they are executed
+# ============================================================================
+
+import os
+import re
+import shlex
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+SEPARATORS = {"&&", "||", ";", "&", ";;"}
+PIPES = {"|", "|&"}
+WRAPPERS = {"sudo", "doas", "env", "nohup", "time", "exec", "command", "nice", "ionice", "xargs", "timeout", "stdbuf"}
+# Per wrapper, options whose value is the next word; any other option is a
+# plain flag (sudo -s, sudo -i, env -i), so the program follows it
+WRAPPER_VALUE_OPTIONS = {
+    "sudo": {"-u", "-g", "-h", "-p", "-C", "-U", "-D", "-r", "-t",
+             "--user", "--group", "--host", "--prompt", "--close-from", "--other-user",
+             "--chdir", "--role", "--type"},
+    "doas": {"-u", "-C"},
+    "env": {"-u", "-C", "-S", "--unset", "--chdir", "--split-string"},
+    "nice": {"-n", "--adjustment"},
+    "ionice": {"-c", "-n", "-p", "--class", "--classdata", "--pid"},
+    "timeout": {"-s", "-k", "--signal", "--kill-after"},
+    "xargs": {"-a", "-d", "-E", "-I", "-L", "-n", "-P", "-s",
+              "--arg-file", "--delimiter", "--max-args", "--max-procs", "--max-chars"},
+    "stdbuf": {"-i", "-o", "-e", "--input", "--output", "--error"},
+}
+SHELLS = {"sh", "bash", "zsh", "dash", "ksh", "fish"}
+MAX_DEPTH = 3  # Nested `bash -c` / eval strings that are unpacked
+
+# Paths whose recursive removal or re-permissioning breaks the system or home
+CRITICAL_PATHS = {"/", "/*", "*", ".", "..", "~", "~/", "~/*"}
+# Top-level directories holding user data; what is below them may be fair game
+SYSTEM_DIRS = {"/home", "/opt", "/root", "/var", "/Users", "/private"}
+# Directories that are critical together with everything below them
+SYSTEM_TREES = {
+    "/bin", "/boot", "/dev", "/etc", "/lib", "/lib32", "/lib64", "/libx32", "/proc",
+    "/sbin", "/sys", "/usr", "/var/lib", "/var/log", "/var/db", "/System", "/Library",
+    "/private/etc", "/private/var/db",
+}
+_VARIABLE_RE = re.compile(r"\$(?:\{(\w+)\}|(\w+))")
+_DISK_RE = re.compile(r"^/dev/(sd[a-z]|hd[a-z]|vd[a-z]|xvd[a-z]|nvme\d|mmcblk\d|disk\d|md\d|dm-\d)")
+_FORK_BOMB_RE = re.compile(r"(\w+|:)\s*\(\)\s*\{\s*\1\s*\|\s*\1\s*&\s*\}\s*;\s*\1")
+
+
+@dataclass
+class SimpleCommand:
+    """One program invocation: argv after wrappers, and its redirections"""
+    argv: List[str]
+    redirects: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def program(self) -> str:
+        return os.path.basename(self.argv[0]) if self.argv else ""
+
+
+@dataclass
+class SafetyRule:
+    """
+    A check in the rule table. `scope` says what `check` receives:
+    "argv" (a SimpleCommand), "pipeline" (a list of them) or "text" (the raw
+    command). `severity` "block" rejects the command, "warn" only reports.
+    """
+    name: str
+    reason: str
+    check: Callable
+    scope: str = "argv"
+    programs: Optional[frozenset] = None  # argv rules: only run for these programs
+    severity: str = "block"
+
+
+@dataclass
+class Verdict:
+    """Validation outcome for one command"""
+    command: str
+    safe: bool
+    violations: List[str] = field(default_factory=list)  # Blocking rule reasons
+    warnings: List[str] = field(default_factory=list)
+
+
+def unwrap_command(words: List[str]) -> List[str]:
+    """argv from the real program on, past assignments and wrappers such as sudo"""
+    words = list(words)
+    i = 0
+    while i < len(words):
+        word = words[i]
+        wrapper = os.path.basename(word)
+        if re.match(r"^[A-Za-z_][A-Za-z0-9_]*=", word):
+            i += 1
+        elif wrapper in WRAPPERS:
+            i += 1
+            value_options = WRAPPER_VALUE_OPTIONS.get(wrapper, set())
+            while i < len(words) and words[i].startswith("-") and words[i] != "-":
+                option = words[i]
+                if option == "--":
+                    i += 1
+                    break
+                if wrapper == "env" and option in ("-S", "--split-string") and i + 1 < len(words):
+                    # env -S 'prog args' runs the split string: unpack it in place
+                    words[i:i + 2] = shlex.split(words[i + 1])
+                    break
+                i += 2 if option in value_options else 1
+            if wrapper == "timeout" and i < len(words):
+                i += 1  # Duration
+        else:
+            break
+    return words[i:]
+
+
+def parse_command(command: str) -> List[List[SimpleCommand]]:
+    """Pipelines in a command line, each a list of simple commands"""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    lexer.commenters = "#"
+
+    pipelines: List[List[SimpleCommand]] = []
+    pipeline: List[SimpleCommand] = []
+    current = SimpleCommand([])
+    redirect_op = None
+
+    def finish_command():
+        nonlocal current
+        current.argv = unwrap_command(current.argv)
+        if current.argv or current.redirects:
+            pipeline.append(current)
+        current = SimpleCommand([])
+
+    for token in lexer:
+        if redirect_op:
+            current.redirects.append((redirect_op, token))
+            redirect_op = None
+        elif token in PIPES:
+            finish_command()
+        elif token in SEPARATORS:
+            finish_command()
+            if pipeline:
+                pipelines.append(pipeline)
+            pipeline = []
+        elif token in ("(", ")", "{", "}"):
+            continue
+        elif set(token) <= set("<>&|"):
+            if current.argv and current.argv[-1].isdigit():
+                current.argv.pop()  # File descriptor, as in 2>
+            redirect_op = token
+        else:
+            current.argv.append(token)
+    finish_command()
+    if pipeline:
+        pipelines.append(pipeline)
+    return pipelines
+
+
+# ----------------------------------------------------------------------
+# Rule checks
+# ----------------------------------------------------------------------
+
+def _flags(argv: List[str]) -> set:
+    """Single-letter flags (-rf -> r, f) and long options of a command"""
+    flags = set()
+    for arg in argv[1:]:
+        if arg == "--":
+            break
+        if arg.startswith("--"):
+            flags.add(arg)
+        elif arg.startswith("-") and len(arg) > 1:
+            flags.update(arg[1:])
+    return flags
+
+
+def _operands(argv: List[str]) -> List[str]:
+    operands, options_done = [], False
+    for arg in argv[1:]:
+        if arg == "--" and not options_done:
+            options_done = True
+        elif options_done or not arg.startswith("-"):
+            operands.append(arg)
+    return operands
+
+
+def expand_variables(path: str) -> str:
+    """$VAR and ${VAR} replaced as the shell would; unset variables become empty"""
+    return _VARIABLE_RE.sub(lambda m: os.environ.get(m.group(1) or m.group(2), ""), path)
+
+
+def is_critical_path(path: str) -> bool:
+    """Root, home, the working directory, a top-level system directory or anything in a system tree"""
+    path = expand_variables(path)
+    if path in CRITICAL_PATHS:
+        return True
+    # Normalize relative paths too, so ./ and ../ are caught like . and ..
+    normalized = os.path.normpath(os.path.expanduser(path)) if path else path
+    if normalized in CRITICAL_PATHS or normalized in ("/", os.path.expanduser("~")):
+        return True
+    if all(part == ".." for part in normalized.split("/")):
+        return True  # An ancestor of the working directory
+    stripped = normalized.rstrip("/*") or "/"
+    if stripped in SYSTEM_DIRS or stripped in ("/", os.path.expanduser("~")):
+        return True
+    return any(stripped == tree or stripped.startswith(tree + "/") for tree in SYSTEM_TREES)
+
+
+def _recursive_delete(cmd: SimpleCommand) -> bool:
+    flags = _flags(cmd.argv)
+    if "--no-preserve-root" in flags:
+        return True
+    recursive = flags & {"r", "R", "--recursive"}
+    return bool(recursive) and any(is_critical_path(p) for p in _operands(cmd.argv))
+
+
+def _recursive_permissions(cmd: SimpleCommand) -> bool:
+    if not _flags(cmd.argv) & {"R", "--recursive"}:
+        return False
+    operands = _operands(cmd.argv)[1:]  # The first operand is the mode or owner
+    return any(is_critical_path(p) for p in operands)
+
+
+def _disk_write(cmd: SimpleCommand) -> bool:
+    return any(
+        arg.startswith("of=") and _DISK_RE.match(arg[3:]) for arg in cmd.argv[1:]
+    )
+
+
+def _device_operand(cmd: SimpleCommand) -> bool:
+    return any(_DISK_RE.match(arg) for arg in _operands(cmd.argv))
+
+
+def _redirect_to_disk(cmd: SimpleCommand) -> bool:
+    return any(">" in op and _DISK_RE.match(target) for op, target in cmd.redirects)
+
+
+def _pipe_to_shell(pipeline: List[SimpleCommand]) -> bool:
+    """Downloaded content executed directly (curl ... | sh)"""
+    fetched = False
+    for cmd in pipeline:
+        if cmd.program in ("curl", "wget", "fetch"):
+            fetched = True
+        elif fetched and cmd.program in SHELLS and not _operands(cmd.argv):
+            return True
+    return False
+
+
+def _fork_bomb(text: str) -> bool:
+    return bool(_FORK_BOMB_RE.search(text))
+
+
+RULES: List[SafetyRule] = [
+    SafetyRule("fork_bomb", "Fork bomb", _fork_bomb, scope="text"),
+    SafetyRule(
+        "recursive_delete", "Recursive delete of a critical path", _recursive_delete,
+        programs=frozenset({"rm"})
+    ),
+    SafetyRule(
+        "recursive_permissions", "Recursive permission or owner change on a critical path",
+        _recursive_permissions, programs=frozenset({"chmod", "chown", "chgrp"})
+    ),
+    SafetyRule("disk_write", "Raw write to a disk device", _disk_write, programs=frozenset({"dd"})),
+    SafetyRule(
+        "format_disk", "Formats or repartitions a disk",
+        lambda cmd: True,
+        programs=frozenset({"mkfs", "mke2fs", "mkswap", "wipefs", "fdisk", "sfdisk", "parted"})
+    ),
+    SafetyRule(
+        "format_disk_variant", "Formats a disk",
+        lambda cmd: cmd.program.startswith("mkfs.")
+    ),
+    SafetyRule("device_operand", "Operates on a raw disk device", _device_operand,
+               programs=frozenset({"cat", "cp", "tee", "truncate", "shred"})),
+    SafetyRule("redirect_to_disk", "Output redirected onto a disk device", _redirect_to_disk),
+    SafetyRule(
+        "pipe_to_shell", "Runs a downloaded script without review", _pipe_to_shell,
+        scope="pipeline", severity="warn"
+    ),
+]
+
+
+def register_rule(rule: SafetyRule):
+    """Add a rule to the table used by every validator"""
+    RULES.append(rule)
+    _validate_cached.cache_clear()
+
+
+class CommandValidator:
+    """
+    Validates commands against the rule table. Commands are tokenized with
+    shlex into pipelines of simple commands (wrappers such as sudo removed,
+    redirections separated), so spacing and flag order do not matter, and
+    `bash -c '...'` / `eval` strings are validated recursively. Verdicts
+    are cached, which keeps repeated batches of auto-fix candidates cheap.
+    """
+
+    def validate(self, command: str) -> Verdict:
+        return _validate_cached(command)
+
+    def validate_batch(self, commands: List[str]) -> List[Verdict]:
+        return [_validate_cached(command) for command in commands]
+
+    def check(self, commands: List[str]) -> Tuple[bool, str]:
+        """(all safe, reason for the first unsafe command)"""
+        for verdict in self.validate_batch(commands):
+            if not verdict.safe:
+                return False, f"{'; '.join(verdict.violations)}: {verdict.command}"
+        return True, "Commands validated successfully"
+
+
+@lru_cache(maxsize=2048)
+def _validate_cached(command: str) -> Verdict:
+    verdict = Verdict(command=command, safe=True)
+    _apply_rules(command, verdict, depth=0)
+    verdict.safe = not verdict.violations
+    return verdict
+
+
+def _report(verdict: Verdict, rule: SafetyRule):
+    target = verdict.violations if rule.severity == "block" else verdict.warnings
+    if rule.reason not in target:
+        target.append(rule.reason)
+
+
+def _apply_rules(command: str, verdict: Verdict, depth: int):
+    stripped = command.strip()
+    if not stripped or stripped.startswith("#"):
+        return
+
+    for rule in RULES:
+        if rule.scope == "text" and rule.check(command):
+            _report(verdict, rule)
+
+    try:
+        pipelines = parse_command(command)
+    except ValueError as e:
+        verdict.violations.append(f"Could not parse command ({e})")
+        return
+
+    for pipeline in pipelines:
+        for rule in RULES:
+            if rule.scope == "pipeline" and rule.check(pipeline):
+                _report(verdict, rule)
+
+        for cmd in pipeline:
+            for rule in RULES:
+                if rule.scope != "argv":
+                    continue
+                if rule.programs is not None and cmd.program not in rule.programs:
+                    continue
+                if rule.check(cmd):
+                    _report(verdict, rule)
+
+            # Validate strings a shell will run as code
+            if depth < MAX_DEPTH:
+                for inner in _nested_scripts(cmd):
+                    _apply_rules(inner, verdict, depth + 1)
+
+
+def _nested_scripts(cmd: SimpleCommand) -> List[str]:
+    if cmd.program in SHELLS:
+        args = cmd.argv[1:]
+        for i, arg in enumerate(args):
+            if arg.startswith("-") and not arg.startswith("--") and "c" in arg[1:] and i + 1 < len(args):
+                return [args[i + 1]]
+        return []
+    if cmd.program == "eval":
+        return [" ".join(cmd.argv[1:])]
+    return []
@@ -0,0 +1,271 @@
+# ============================================================================
+# FILE: src/core/error_classifier.py
+# Local naive Bayes error classifier trained from memory history
+# ============================================================================
+
+import json
+import os
+import re
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .error_patterns import ErrorPatterns
+from .fingerprint import normalize_error
+
+N_FEATURES = 2 ** 14
+MODEL_VERSION = 3        # Bumped when persisted counts must be rebuilt from history
+MAX_LABELS = 32          # Free-text error types kept apart; later ones are merged per category
+ROW_BLOCK = 8            # Labels the count matrix grows by
+OTHER_PREFIX = "other_"
+ALPHA = 0.1              # Additive smoothing
+MIN_SAMPLES = 20         # Below this many training rows nothing is predicted
+MIN_CLASS_SAMPLES = 3    # Nor for classes seen fewer times than this
+
+# Label sources trusted for training; others (the classifier itself, pattern
+# fallbacks) count only once a fix built on them has worked
+CONFIRMED_SOURCES = {"llm"}
+
+_TOKEN_RE = re.compile(r"<[a-z]+>|[a-z_][a-z0-9_]+")
+
+# Severity when the predicted type has no built-in pattern
+CATEGORY_SEVERITY = {
+    "permission": "high",
+    "not_found": "medium",
+    "dependency": "high",
+    "config": "medium",
+    "network": "medium",
+    "unknown": "medium",
+}
+
+
+@dataclass
+class Prediction:
+    """Classifier output for one error"""
+    error_type: str
+    error_category: str
+    severity: str
+    confidence: float
+    samples: int  # Training rows behind the predicted class
+
+
+def normalize_label(error_type: str) -> str:
+    """Free-text LLM error type as an identifier, so spelling variants share a label"""
+    return re.sub(r"[^a-z0-9]+", "_", error_type.lower()).strip("_") or "unknown"
+
+
+def hashed_features(error_text: str) -> Dict[int, int]:
+    """Hashed unigram and bigram counts of the normalized error"""
+    normalized, _ = normalize_error(error_text)
+    tokens = _TOKEN_RE.findall(normalized.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    features: Dict[int, int] = {}
+    for gram in grams:
+        # crc32 rather than hash(): it must be stable across processes
+        index = zlib.crc32(gram.encode()) % N_FEATURES
+        features[index] = features.get(index, 0) + 1
+    return features
+
+
+class ErrorClassifier:
+    """
+    Multinomial naive Bayes over hashed n-grams.
+
+    Labels are error types (each remembering its category) taken from the
+    `error_patterns` table, only where the LLM produced them or the fix the
+    user ran succeeded, so predictions are never fed back as training data.
+    Built-in pattern names are always kept apart, but LLM error types are
+    free text, so at most MAX_LABELS of those are; later ones are merged
+    into one "other" label per category, which is never predicted. The
+    count matrix is pre-allocated in blocks of ROW_BLOCK labels.
+    Training is incremental: only rows added since the last run are read,
+    and the counts are persisted between sessions.
+    """
+
+    def __init__(self, model_path: str = "~/.terminal_hero/error_classifier.npz"):
+        self.model_path = Path(model_path).expanduser()
+        self.model_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._training: Optional[threading.Thread] = None
+
+        self.labels: List[str] = []
+        self.categories: List[str] = []
+        self._class_counts = np.zeros(0)
+        self._feature_counts = np.zeros((0, N_FEATURES), dtype=np.float32)
+        self._feature_totals = np.zeros(0)
+        self.last_id = 0
+        self._load()
+
+    # Views over the rows in use
+    @property
+    def class_counts(self) -> np.ndarray:
+        return self._class_counts[:len(self.labels)]
+
+    @property
+    def feature_counts(self) -> np.ndarray:
+        return self._feature_counts[:len(self.labels)]
+
+    @property
+    def feature_totals(self) -> np.ndarray:
+        return self._feature_totals[:len(self.labels)]
+
+    def _load(self):
+        """Load persisted counts, starting empty if missing or stale"""
+        try:
+            with np.load(self.model_path) as data:
+                meta = json.loads(str(data["meta"]))
+                counts = data["feature_counts"]
+                if counts.shape[1] != N_FEATURES or meta.get("version") != MODEL_VERSION:
+                    return
+                n = counts.shape[0]
+                if n != len(meta["labels"]):
+                    return
+                self._reserve(n)
+                self._feature_counts[:n] = counts
+                self._class_counts[:n] = data["class_counts"]
+                self._feature_totals[:n] = counts.sum(axis=1, dtype=np.float64)
+                self.labels = meta["labels"]
+                self.categories = meta["categories"]
+                self.last_id = meta["last_id"]
+        except:
+            pass
+
+    def _snapshot(self) -> dict:
+        """Copy of the state to persist; call with the lock held"""
+        return {
+            "meta": json.dumps({
+                "version": MODEL_VERSION,
+                "labels": list(self.labels),
+                "categories": list(self.categories),
+                "last_id": self.last_id,
+            }),
+            "feature_counts": self.feature_counts.copy(),
+            "class_counts": self.class_counts.copy(),
+        }
+
+    def _save(self, snapshot: dict):
+        """Persist a snapshot atomically, outside the lock predict() needs"""
+        with self._save_lock:
+            tmp_path = self.model_path.with_suffix(".tmp.npz")
+            np.savez_compressed(
+                tmp_path,
+                feature_counts=snapshot["feature_counts"],
+                class_counts=snapshot["class_counts"],
+                meta=np.array(snapshot["meta"]),
+            )
+            os.replace(tmp_path, self.model_path)
+
+    @property
+    def samples(self) -> int:
+        return int(self.class_counts.sum())
+
+    def _reserve(self, rows: int):
+        """Make room for `rows` labels, a block at a time"""
+        capacity = len(self._class_counts)
+        if rows <= capacity:
+            return
+        extra = -(-(rows - capacity) // ROW_BLOCK) * ROW_BLOCK
+        self._class_counts = np.concatenate([self._class_counts, np.zeros(extra)])
+        self._feature_totals = np.concatenate([self._feature_totals, np.zeros(extra)])
+        self._feature_counts = np.concatenate(
+            [self._feature_counts, np.zeros((extra, N_FEATURES), dtype=np.float32)]
+        )
+
+    def _row(self, error_type: str, error_category: str) -> int:
+        """Row for a label, adding it (or its category's "other" row) if new"""
+        if error_category not in CATEGORY_SEVERITY:
+            error_category = "unknown"
+        if error_type not in self.labels:
+            rules = ErrorPatterns.rules()
+            free_text = sum(
+                1 for label in self.labels if label not in rules and not label.startswith(OTHER_PREFIX)
+            )
+            if error_type not in rules and free_text >= MAX_LABELS:
+                error_type = OTHER_PREFIX + error_category
+            if error_type not in self.labels:
+                self._reserve(len(self.labels) + 1)
+                self.labels.append(error_type)
+                self.categories.append(error_category)
+        row = self.labels.index(error_type)
+        self.categories[row] = error_category  # Latest label wins
+        return row
+
+    def learn(self, error_text: str, error_type: str, error_category: str):
+        """Add one labelled example"""
+        row = self._row(normalize_label(error_type), error_category)
+        self._class_counts[row] += 1
+        features = hashed_features(error_text)
+        if features:
+            indices = np.fromiter(features.keys(), dtype=np.int64)
+            counts = np.fromiter(features.values(), dtype=np.float32)
+            self._feature_counts[row, indices] += counts
+            self._feature_totals[row] += counts.sum()
+
+    def train(self, memory) -> int:
+        """Learn from error_patterns rows added since the last run"""
+        rows = memory.get_labelled_errors(after_id=self.last_id)
+        if not rows:
+            return 0
+        with self._lock:
+            for row in rows:
+                confirmed = row["label_source"] in CONFIRMED_SOURCES or row["success"]
+                if confirmed and row["error_type"] != "unknown":
+                    self.learn(row["raw_error"], row["error_type"], row["error_category"])
+                self.last_id = max(self.last_id, row["id"])
+            snapshot = self._snapshot()
+        self._save(snapshot)
+        return len(rows)
+
+    def train_async(self, memory):
+        """Retrain in a background thread unless a run is already going"""
+        if self._training and self._training.is_alive():
+            return
+
+        def run():
+            try:
+                self.train(memory)
+            except:
+                pass  # A failed retrain leaves the previous model in place
+
+        self._training = threading.Thread(target=run, daemon=True)
+        self._training.start()
+
+    def predict(self, error_text: str) -> Optional[Prediction]:
+        """Most likely type and category, or None without enough history"""
+        features = hashed_features(error_text)
+        if not features:
+            return None
+        with self._lock:
+            if self.samples < MIN_SAMPLES or len(self.labels) < 2:
+                return None
+            indices = np.fromiter(features.keys(), dtype=np.int64)
+            counts = np.fromiter(features.values(), dtype=np.float64)
+
+            log_likelihood = np.log(self.feature_counts[:, indices] + ALPHA) \
+                - np.log(self.feature_totals + ALPHA * N_FEATURES)[:, None]
+            scores = np.log(self.class_counts / self.class_counts.sum()) + log_likelihood @ counts
+
+            probabilities = np.exp(scores - scores.max())
+            probabilities /= probabilities.sum()
+            best = int(probabilities.argmax())
+            samples = int(self.class_counts[best])
+            if samples < MIN_CLASS_SAMPLES:
+                return None
+            error_type = self.labels[best]
+            category = self.categories[best]
+        if error_type.startswith(OTHER_PREFIX):
+            return None  # Merged rare labels say nothing specific
+
+        rule = ErrorPatterns.rules().get(error_type, {})
+        return Prediction(
+            error_type=error_type,
+            error_category=category,
+            severity=rule.get("severity") or CATEGORY_SEVERITY.get(category, "medium"),
+            confidence=float(probabilities[best]),
+            samples=samples,
+        )
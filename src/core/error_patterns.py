@@ -3,8 +3,10 @@
 # Error pattern matching library
 # ============================================================================
 
-import re
-from typing import Optional, Tuple
+from typing import Dict, List, Optional
+from .pattern_engine import PatternEngine, PatternMatch
+from .stream_scanner import StreamScanner
+from .pattern_packs import DEFAULT_PACK_DIR, load_rules, render_fixes
 
 class ErrorPatterns:
     """Library of common error patterns and their categorization"""
@@ -12,31 +14,66 @@ class ErrorPatterns:
     PATTERNS = {
         "command_not_found": {
             "regex": r"(command not found|not recognized as an internal or external command)",
+            "weak_regex": [r"No such file or directory", r"not found in"],
+            "extract": [
+                r"(?P<command>[\w.+-]+): command not found(?!:)",
+                r"command not found: (?P<command>[\w.+-]+)",
+            ],
             "category": "not_found",
             "severity": "medium"
         },
         "permission_denied": {
-            "regex": r"(permission denied|access denied|EACCES)",
+            "regex": r"(permission denied|access denied|EACCES|Operation not permitted)",
+            "extract": [r"(?:ba|z)?sh: (?P<file>\.{0,2}/[^\s:]+): Permission denied"],
             "category": "permission",
-            "severity": "medium"
+            "severity": "medium",
+            "fixes": ["chmod +x {file}"]
         },
         "module_not_found": {
-            "regex": r"(ModuleNotFoundError|ImportError|cannot find module)",
+            "regex": r"(ModuleNotFoundError|ImportError|cannot find module|No module named)",
+            "extract": [
+                r"No module named ['\"]?(?P<module>[\w.]+)",
+                r"Cannot find module ['\"](?P<node_module>[^'\"./][^'\"]*)['\"]",
+            ],
             "category": "dependency",
-            "severity": "high"
+            "severity": "high",
+            "resolver_type": "missing_dependency",
+            "fixes": [
+                {"commands": ["pip install {package}"], "requires": "pip"},
+                {"commands": ["npm install {node_package}"], "requires": "npm"},
+            ]
         },
         "package_not_found": {
             "regex": r"(package not found|E: Unable to locate package|No matching distribution)",
+            "extract": [
+                r"Unable to locate package (?P<package>[\w.+-]+)",
+                r"No matching distribution found for (?P<package>[\w.-]+)",
+            ],
             "category": "dependency",
             "severity": "high"
         },
         "port_in_use": {
             "regex": r"(address already in use|port.*already in use|EADDRINUSE)",
+            "extract": [
+                r"port (?P<port>\d{2,5}) is already in use",
+                r"EADDRINUSE[^\n]*?:(?P<port>\d{2,5})\b",
+                r"address already in use[^\n]*?:(?P<port>\d{2,5})\b",
+            ],
             "category": "config",
-            "severity": "medium"
+            "severity": "medium",
+            "resolver_type": "port_already_in_use",
+            "fixes": [
+                {"commands": ["fuser -k {port}/tcp"], "requires": "fuser"},
+                {"commands": ["lsof -ti tcp:{port} | xargs kill"], "requires": "lsof"},
+            ]
         },
         "network_error": {
             "regex": r"(network.*error|connection.*refused|timeout|unable to connect)",
+            "weak_regex": [
+                r"Connection reset",
+                r"Network unreachable",
+                r"Temporary failure in name resolution",
+            ],
             "category": "network",
             "severity": "medium"
         },
@@ -47,6 +84,7 @@ class ErrorPatterns:
         },
         "missing_dependency": {
             "regex": r"(missing.*dependency|required.*not found|needs.*to be installed)",
+            "weak_regex": [r"cannot find -l", r"pkg-config"],
             "category": "dependency",
             "severity": "high"
         },
@@ -57,18 +95,53 @@ class ErrorPatterns:
         },
         "disk_space": {
             "regex": r"(no space left|disk.*full|out of disk space)",
+            "weak_regex": [r"out of space"],
             "category": "config",
             "severity": "critical"
         }
     }
     
+    _engine: Optional[PatternEngine] = None
+    _rules: Optional[Dict[str, dict]] = None
+    
+    @classmethod
+    def rules(cls) -> Dict[str, dict]:
+        """Built-in patterns merged with user pattern packs"""
+        if cls._rules is None:
+            cls._rules = load_rules(cls.PATTERNS)
+        return cls._rules
+    
+    @classmethod
+    def engine(cls) -> PatternEngine:
+        """Compiled engine for the pattern table, built once"""
+        if cls._engine is None:
+            cls._engine = PatternEngine(cls.rules())
+        return cls._engine
+    
+    @classmethod
+    def reload(cls, pack_dir: str = DEFAULT_PACK_DIR):
+        """Reload pattern packs and recompile the engine"""
+        cls._rules = load_rules(cls.PATTERNS, pack_dir)
+        cls._engine = PatternEngine(cls._rules)
+    
+    # Inputs longer than this are scanned through the bounded stream scanner
+    STREAM_THRESHOLD = 64 * 1024
+    
+    @classmethod
+    def scan(cls, error_text: str) -> List[PatternMatch]:
+        """All matching patterns with positions and scores, best first"""
+        if len(error_text) <= cls.STREAM_THRESHOLD:
+            return cls.engine().scan(error_text)
+        step = cls.STREAM_THRESHOLD
+        chunks = (error_text[i:i + step] for i in range(0, len(error_text), step))
+        return StreamScanner.scan_stream(cls.engine(), chunks)
+    
+    @classmethod
+    def stream_scanner(cls, **kwargs) -> StreamScanner:
+        """Scanner to feed live stdout/stderr: bounded memory, stops at the first severe hit"""
+        return StreamScanner(cls.engine(), **kwargs)
+    
     @classmethod
-    def match_error(cls, error_text: str) -> Optional[Tuple[str, dict]]:
-        """Match error text against known patterns"""
-        error_lower = error_text.lower()
-        
-        for pattern_name, pattern_info in cls.PATTERNS.items():
-            if re.search(pattern_info["regex"], error_lower, re.IGNORECASE):
-                return pattern_name, pattern_info
-        
-        return None
\ No newline at end of file
+    def fixes_for(cls, match: PatternMatch, package_managers: Optional[List[str]] = None) -> List[List[str]]:
+        """Concrete fix commands for a match, rendered from captured parameters"""
+        return render_fixes(cls.rules()[match.name], match.groups, package_managers)
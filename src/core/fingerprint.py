@@ -0,0 +1,88 @@
+# ============================================================================
+# FILE: src/core/fingerprint.py
+# Error normalization and stable fingerprints
+# ============================================================================
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# Huge logs are cut to their head and tail before normalizing
+MAX_INPUT_HEAD = 4000
+MAX_INPUT_TAIL = 12000
+
+_ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+# (kind, regex, placeholder), applied in order. Earlier rules claim text
+# first, e.g. timestamps before versions so 12:30:01 is not read as a version.
+_RULES: List[Tuple[str, re.Pattern, str]] = [
+    ("timestamp", re.compile(
+        r"\b\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+        r"|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) +\d{1,2} \d{2}:\d{2}:\d{2}"
+        r"|\b\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\b"
+    ), "<TS>"),
+    ("uuid", re.compile(
+        r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"
+    ), "<UUID>"),
+    ("address", re.compile(r"\b0x[0-9a-fA-F]+\b"), "<ADDR>"),
+    ("hash", re.compile(r"\b[0-9a-f]{12,64}\b"), "<HEX>"),
+    ("url", re.compile(r"\b[a-z][a-z0-9+.-]*://[^\s'\"<>]+", re.IGNORECASE), "<URL>"),
+    ("ip", re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b"), "<IP>"),
+    ("path", re.compile(
+        r"(?:(?<=^)|(?<=[\s'\"(=:,\[]))(?:~|\.{1,2})?/[^\s'\":,()\[\]]+"
+        r"|\b[A-Za-z]:\\[^\s'\":,()\[\]]+"
+    ), "<PATH>"),
+    ("port", re.compile(
+        r"(?<=\bport )\d{2,5}\b|(?<=:)\d{2,5}\b(?=\s|$|/|\))", re.IGNORECASE
+    ), "<PORT>"),
+    ("pid", re.compile(
+        r"(?<=\bpid )\d+|(?<=\bpid=)\d+|(?<=\bprocess )\d+|(?<=\[)\d{2,7}(?=\])", re.IGNORECASE
+    ), "<PID>"),
+    ("line", re.compile(
+        r"(?<=\bline )\d+|(?<=<PATH>:)\d+(?::\d+)?|(?<=[A-Za-z]:)\d+(?::\d+)?(?=:)", re.IGNORECASE
+    ), "<N>"),
+    ("version", re.compile(r"\bv?\d+(?:\.\d+){1,3}(?:[-+]?[A-Za-z][0-9A-Za-z.]*)?\b"), "<VER>"),
+    ("number", re.compile(r"\b\d{4,}\b"), "<N>"),
+]
+
+
+@dataclass
+class ErrorFingerprint:
+    """Stable identity of an error plus the volatile values stripped from it"""
+    fingerprint: str
+    normalized: str
+    params: Dict[str, List[str]] = field(default_factory=dict)
+
+    def key(self, *parts: str) -> str:
+        """Composite cache key, e.g. fingerprint plus a system context hash"""
+        if not parts:
+            return self.fingerprint
+        return hashlib.sha1("|".join((self.fingerprint,) + parts).encode()).hexdigest()[:16]
+
+
+def normalize_error(error_text: str) -> Tuple[str, Dict[str, List[str]]]:
+    """Replace paths, PIDs, addresses, timestamps, ports and versions with placeholders"""
+    if len(error_text) > MAX_INPUT_HEAD + MAX_INPUT_TAIL:
+        error_text = error_text[:MAX_INPUT_HEAD] + "\n" + error_text[-MAX_INPUT_TAIL:]
+    text = _ANSI_RE.sub("", error_text)
+    params: Dict[str, List[str]] = {}
+
+    for kind, regex, placeholder in _RULES:
+        def replace(m, kind=kind, placeholder=placeholder):
+            values = params.setdefault(kind, [])
+            if m.group(0) not in values:
+                values.append(m.group(0))
+            return placeholder
+        text = regex.sub(replace, text)
+
+    lines = [" ".join(line.split()) for line in text.splitlines()]
+    normalized = "\n".join(line for line in lines if line)
+    return normalized, params
+
+
+def fingerprint_error(error_text: str) -> ErrorFingerprint:
+    """Normalize an error and hash it into a short, stable fingerprint"""
+    normalized, params = normalize_error(error_text)
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:16]
+    return ErrorFingerprint(fingerprint=digest, normalized=normalized, params=params)
@@ -0,0 +1,209 @@
+# ============================================================================
+# FILE: src/core/idempotency.py
+# Cheap postcondition probes for commands that may already be satisfied
+# ============================================================================
+
+import os
+import re
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from .preflight import VALUE_OPTIONS, PreflightChecker, install_target, program_words, split_command
+from .system_detector import SystemDetector
+
+# Package lists refreshed more recently than this are not refreshed again
+REFRESH_MAX_AGE = 3600
+
+APT_STAMPS = (
+    "/var/lib/apt/periodic/update-success-stamp",
+    "/var/lib/apt/lists",
+)
+
+# Install flags asking for something other than "make sure it is there"
+INTENT_FLAGS = {
+    "-U", "--upgrade", "--force-reinstall", "-I", "--ignore-installed", "--pre",
+    "--reinstall", "--force",
+}
+
+_PINNED_RE = re.compile(r"[<>=!~]")
+# pip's long-path launcher: a /bin/sh shebang, then '''exec' "/path/to/python"
+_EXEC_RE = re.compile(rb"^'''exec' \"?([^\" ]+)")
+# `pip --version`: pip 24.0 from /path/to/site-packages/pip (python 3.12)
+_PIP_VERSION_RE = re.compile(r" from (.+?)[/\\]pip \(python ")
+
+
+def _pinned(spec: str, ecosystem: str) -> bool:
+    """Whether an install argument asks for a specific version"""
+    if ecosystem == "node":
+        return spec.rfind("@") > 0
+    return bool(_PINNED_RE.search(spec))
+
+
+def _shebang_python(script: str) -> Optional[str]:
+    """The interpreter a pip script's shebang names, or None"""
+    try:
+        with open(script, "rb") as f:
+            head = [f.readline(512), f.readline(512)]
+    except OSError:
+        return None
+    if not head[0].startswith(b"#!"):
+        return None  # A compiled launcher
+    shebang = head[0][2:].decode(errors="replace").split()
+    if shebang and Path(shebang[0]).name == "env":
+        shebang = [word for word in shebang[1:] if not word.startswith("-")]
+    if shebang and Path(shebang[0]).name in ("sh", "bash"):
+        match = _EXEC_RE.match(head[1])
+        shebang = [match.group(1).decode(errors="replace")] if match else []
+    if not shebang or not Path(shebang[0]).name.startswith("python"):
+        return None  # A wrapper such as a pyenv shim
+    return shutil.which(shebang[0])
+
+
+def site_dirs_for(words: List[str]) -> Optional[List[str]]:
+    """
+    Site-packages of the interpreter a pip or python command line installs
+    into, or None when that interpreter cannot be determined
+    """
+    path = shutil.which(words[0])
+    if not path:
+        return None
+    python = path if Path(words[0]).name.startswith("python") else _shebang_python(path)
+    if python:
+        return SystemDetector.get_site_packages_for(python)
+
+    # Shims and launchers: ask the pip itself where it lives
+    try:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = _PIP_VERSION_RE.search(result.stdout)
+    return [match.group(1)] if result.returncode == 0 and match else None
+
+
+def _apt_update(words: List[str]) -> Optional[str]:
+    if words[1:] != ["update"]:
+        return None
+    for stamp in APT_STAMPS:
+        try:
+            age = time.time() - os.stat(stamp).st_mtime
+        except OSError:
+            continue
+        if age < REFRESH_MAX_AGE:
+            return f"package lists refreshed {int(age // 60)} min ago"
+        return None
+    return None
+
+
+def _mkdir(words: List[str]) -> Optional[str]:
+    args = words[1:]
+    if "-p" not in args and "--parents" not in args:
+        return None
+    paths = [a for a in args if not a.startswith("-")]
+    if paths and all(Path(p).expanduser().is_dir() for p in paths):
+        return f"{', '.join(paths)} already exists"
+    return None
+
+
+def _chmod_exec(words: List[str]) -> Optional[str]:
+    if len(words) < 3 or words[1] not in ("+x", "u+x", "a+x", "ugo+x"):
+        return None
+    paths = [Path(p).expanduser() for p in words[2:]]
+    if all(p.is_file() for p in paths):
+        mask = 0o100 if words[1] == "u+x" else 0o111
+        if all(p.stat().st_mode & mask == mask for p in paths):
+            return f"{' '.join(words[2:])} already executable"
+    return None
+
+
+def _symlink(words: List[str]) -> Optional[str]:
+    flags = [a for a in words[1:] if a.startswith("-")]
+    args = [a for a in words[1:] if not a.startswith("-")]
+    if not any("s" in f for f in flags) or len(args) != 2:
+        return None
+    target, link = args
+    link_path = Path(link).expanduser()
+    if link_path.is_dir() and not link_path.is_symlink():
+        link_path = link_path / Path(target).name
+    if link_path.is_symlink() and os.readlink(link_path) == target:
+        return f"{link} already links to {target}"
+    return None
+
+
+# Program -> probe returning why its postcondition already holds, or None
+PROBES: Dict[str, Callable[[List[str]], Optional[str]]] = {
+    "apt-get": _apt_update,
+    "apt": _apt_update,
+    "mkdir": _mkdir,
+    "chmod": _chmod_exec,
+    "ln": _symlink,
+}
+
+
+class IdempotencyProbe:
+    """
+    Recognizes common idempotent commands (package installs, package list
+    refreshes, mkdir -p, chmod +x, ln -s) and checks their postcondition
+    cheaply, so steps that would change nothing can be skipped. Anything
+    not recognized is never reported as satisfied.
+    """
+
+    def __init__(self, checker: Optional[PreflightChecker] = None):
+        self.checker = checker or PreflightChecker()
+        self._site_dirs: Dict[str, Optional[List[str]]] = {}
+
+    def satisfied(self, command: str) -> Optional[str]:
+        """Why `command` would change nothing, or None if it should run"""
+        try:
+            segments = [program_words(words) for words in split_command(command)]
+        except ValueError:
+            return None
+        # Only plain command lists; pipes and redirections have other effects
+        if not segments or any(op in command for op in ("|", ">", "<", "$(", "`", "||")):
+            return None
+
+        reasons = []
+        for words in segments:
+            reason = self._probe(words) if words else None
+            if reason is None:
+                return None
+            reasons.append(reason)
+        return "; ".join(reasons)
+
+    def _probe(self, words: List[str]) -> Optional[str]:
+        target = install_target(words)
+        if target:
+            rest = words[words.index("install") + 1:] if "install" in words else words[2:]
+            operands = [
+                arg for i, arg in enumerate(rest)
+                if not arg.startswith("-") and not (i > 0 and rest[i - 1] in VALUE_OPTIONS)
+            ]
+            # Versions, local paths and URLs may differ from what is installed
+            if len(operands) != len(target.packages) or any(_pinned(a, target.ecosystem) for a in operands):
+                return None
+            if INTENT_FLAGS & set(rest):
+                return None
+            site_dirs = None
+            if target.ecosystem == "python":
+                # The pip being run, not this tool's own interpreter
+                if words[0] not in self._site_dirs:
+                    self._site_dirs[words[0]] = site_dirs_for(words)
+                site_dirs = self._site_dirs[words[0]]
+                if not site_dirs:
+                    return None
+            installed = []
+            for package in target.packages:
+                version = self.checker.installed_version(target.ecosystem, package, site_dirs)
+                if version is None:
+                    return None
+                installed.append(f"{package} {version}".strip())
+            return f"{', '.join(installed)} already installed"
+
+        probe = PROBES.get(Path(words[0]).name)
+        return probe(words) if probe else None
+
+    def forget(self):
+        """Drop cached package probes after a command may have changed them"""
+        self.checker = PreflightChecker(self.checker.package_index)
@@ -0,0 +1,142 @@
+# ============================================================================
+# FILE: src/core/limits.py
+# Resource caps, timeouts and process-group cleanup for executed commands
+# ============================================================================
+
+import os
+import signal
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Environment overrides (see .env.example)
+TIMEOUT_ENV = "TERMINAL_HERO_COMMAND_TIMEOUT"
+CPU_ENV = "TERMINAL_HERO_LIMIT_CPU"
+MEMORY_ENV = "TERMINAL_HERO_LIMIT_MEMORY_MB"
+FILE_SIZE_ENV = "TERMINAL_HERO_LIMIT_FILE_MB"
+PROCESSES_ENV = "TERMINAL_HERO_LIMIT_PROCESSES"
+
+DEFAULT_TIMEOUT = 30.0
+KILL_GRACE = 2.0  # Seconds between SIGTERM and SIGKILL
+
+
+def _env_number(name: str, default: Optional[float]) -> Optional[float]:
+    """Numeric setting from the environment; 0 or "none" disables it"""
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    if value in ("0", "none", "off", "unlimited"):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return default
+
+
+def _default_memory_mb() -> Optional[float]:
+    """Three quarters of physical memory"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") * 0.75 / 2 ** 20
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def command_timeout() -> Optional[float]:
+    """Default per-command timeout in seconds (None: no limit)"""
+    return _env_number(TIMEOUT_ENV, DEFAULT_TIMEOUT)
+
+
+@dataclass
+class ResourceLimits:
+    """
+    setrlimit caps for a command and everything it starts. None leaves a
+    resource unlimited. The process cap (RLIMIT_NPROC) counts all of the
+    user's processes, so it is off unless configured.
+    """
+    cpu_seconds: Optional[float] = 600
+    memory_mb: Optional[float] = None     # Data segment (RLIMIT_DATA)
+    file_size_mb: Optional[float] = 4096
+    max_processes: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "ResourceLimits":
+        defaults = cls()
+        return cls(
+            cpu_seconds=_env_number(CPU_ENV, defaults.cpu_seconds),
+            memory_mb=_env_number(MEMORY_ENV, _default_memory_mb()),
+            file_size_mb=_env_number(FILE_SIZE_ENV, defaults.file_size_mb),
+            max_processes=_env_number(PROCESSES_ENV, defaults.max_processes),
+        )
+
+    def _caps(self):
+        if resource is None:
+            return []
+        caps = [
+            (resource.RLIMIT_CPU, self.cpu_seconds),
+            (resource.RLIMIT_DATA, self.memory_mb and self.memory_mb * 2 ** 20),
+            (resource.RLIMIT_FSIZE, self.file_size_mb and self.file_size_mb * 2 ** 20),
+        ]
+        if hasattr(resource, "RLIMIT_NPROC"):
+            caps.append((resource.RLIMIT_NPROC, self.max_processes))
+        return [(limit, int(value)) for limit, value in caps if value]
+
+    def apply(self, pid: int):
+        """
+        Cap a freshly started process with prlimit; its children inherit the
+        caps. Used instead of a preexec_fn, which is unsafe in the threaded
+        executor. A no-op where prlimit is unavailable.
+        """
+        if resource is None or not hasattr(resource, "prlimit"):
+            return
+        for limit, value in self._caps():
+            try:
+                _, hard = resource.prlimit(pid, limit)
+                if hard != resource.RLIM_INFINITY:
+                    value = min(value, hard)
+                resource.prlimit(pid, limit, (value, hard))
+            except (OSError, ValueError):
+                pass  # The process already exited, or the cap is not allowed here
+
+
+def popen_group(*args, limits: Optional[ResourceLimits] = None, **kwargs) -> subprocess.Popen:
+    """
+    Popen in a process group of its own with resource caps applied. Not a
+    new session: that would detach the controlling terminal, and sudo and
+    other prompts need /dev/tty.
+    """
+    if os.name == "posix":
+        if sys.version_info >= (3, 11):
+            kwargs["process_group"] = 0
+        else:
+            kwargs["preexec_fn"] = os.setpgrp
+    process = subprocess.Popen(*args, **kwargs)
+    if limits:
+        limits.apply(process.pid)
+    return process
+
+
+def kill_group(process: subprocess.Popen, grace: float = KILL_GRACE):
+    """Terminate a process and everything in its group, forcefully after `grace` seconds"""
+    if os.name != "posix":
+        process.kill()
+        process.wait()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    try:
+        process.wait(timeout=grace)
+    except subprocess.TimeoutExpired:
+        pass
+    try:
+        os.killpg(process.pid, signal.SIGKILL)  # Stragglers that ignored SIGTERM
+    except ProcessLookupError:
+        pass
+    process.wait()
@@ -0,0 +1,445 @@
+# ============================================================================
+# FILE: src/core/local_docs.py
+# Offline documentation index (man pages, --help, package READMEs, project docs)
+# ============================================================================
+
+import gzip
+import math
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .project_scanner import ALWAYS_SKIP
+from .system_detector import SystemDetector
+
+K1 = 1.2
+B = 0.75
+MAX_DOC_CHARS = 20000     # Text indexed per document
+MAX_DOC_TERMS = 200       # Distinct terms kept per document (highest tf)
+SNIPPET_CHARS = 300
+
+MAN_SECTIONS = ("1", "8")
+MAX_MAN_PAGES = 5000
+MAX_PROJECT_DOCS = 200
+PROJECT_MAX_AGE = 600     # Seconds before a project's docs are re-checked
+DOC_EXTENSIONS = (".md", ".rst", ".txt", ".adoc")
+
+# Binaries whose --help is indexed when they have no man page. Running
+# arbitrary executables is not safe, so this stays an explicit list.
+HELP_BINARIES = (
+    "git", "pip", "pip3", "python", "python3", "node", "npm", "npx", "yarn", "pnpm",
+    "cargo", "rustc", "rustup", "go", "docker", "kubectl", "make", "cmake", "gcc",
+    "apt", "apt-get", "dnf", "yum", "pacman", "brew", "poetry", "uv", "conda",
+)
+HELP_TIMEOUT = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have how in is it its of on or that the "
+    "this to was were will with fix error".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased alphanumeric terms without stopwords"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def strip_roff(text: str) -> str:
+    """Plain text from man page source"""
+    lines = []
+    for line in text.splitlines():
+        if line.startswith(('.\\"', "'\\\"")):
+            continue
+        if line.startswith((".", "'")):
+            parts = line.split(None, 1)
+            line = parts[1] if len(parts) > 1 else ""
+            line = line.replace('"', "")
+        lines.append(line)
+    text = "\n".join(lines)
+    text = re.sub(r"\\f(?:\[[^\]]*\]|\(..|.)", "", text)
+    text = text.replace("\\-", "-").replace("\\(em", "-")
+    text = re.sub(r"\\(?:\(..|\[[^\]]*\]|\*\(..|\*.|.)", " ", text)
+    return text
+
+
+class LocalDocIndex:
+    """
+    Inverted index with BM25 ranking over locally available documentation.
+
+    Each source (a man page, a binary's --help, a package's metadata, a
+    project doc file) is recorded with its mtime, so `update()` only
+    re-reads what changed and drops what disappeared. Postings are stored
+    as (term id, doc, tf) rows in SQLite; snippets are zlib-compressed.
+    """
+
+    def __init__(self, index_path: str = "~/.terminal_hero/doc_index.db"):
+        self.index_path = Path(index_path).expanduser()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._updating: Optional[threading.Thread] = None
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT UNIQUE NOT NULL,
+                mtime REAL NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                snippet BLOB NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS terms (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                term TEXT UNIQUE NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term INTEGER NOT NULL,
+                doc INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value REAL
+            );
+        """)
+        conn.commit()
+        conn.close()
+
+    # ------------------------------------------------------------------
+    # Sources: each yields (source key, mtime, loader)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _man_dirs() -> List[str]:
+        manpath = os.environ.get("MANPATH", "")
+        roots = [p for p in manpath.split(os.pathsep) if p] or [
+            "/usr/share/man", "/usr/local/share/man", "/opt/homebrew/share/man"
+        ]
+        return [
+            os.path.join(root, f"man{section}")
+            for root in roots for section in MAN_SECTIONS
+            if os.path.isdir(os.path.join(root, f"man{section}"))
+        ]
+
+    def _man_sources(self) -> Iterator[Tuple[str, float, Callable]]:
+        count = 0
+        for directory in self._man_dirs():
+            try:
+                entries = sorted(os.scandir(directory), key=lambda e: e.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if count >= MAX_MAN_PAGES:
+                    return
+                if not entry.is_file():
+                    continue
+                count += 1
+                yield f"man:{entry.path}", entry.stat().st_mtime, \
+                    lambda path=entry.path: self._load_man(path)
+
+    @staticmethod
+    def _load_man(path: str) -> Optional[Dict]:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", errors="replace") as f:
+            text = strip_roff(f.read(MAX_DOC_CHARS * 2))
+        name = os.path.basename(path).split(".")[0]
+        section = os.path.basename(os.path.dirname(path))[3:]
+        summary = re.search(r"^NAME\s*\n+\s*\S+.*? - (.+)$", text, re.MULTILINE)
+        return {
+            "title": f"{name}({section})" + (f" - {summary.group(1).strip()}" if summary else ""),
+            "url": f"man:{name}({section})",
+            "text": text,
+        }
+
+    def _help_sources(self) -> Iterator[Tuple[str, float, Callable]]:
+        man_names = set()
+        for directory in self._man_dirs():
+            try:
+                man_names.update(name.split(".")[0] for name in os.listdir(directory))
+            except OSError:
+                continue
+        for name in HELP_BINARIES:
+            path = shutil.which(name)
+            if not path or name in man_names:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            yield f"help:{path}", mtime, lambda name=name, path=path: self._load_help(name, path)
+
+    @staticmethod
+    def _load_help(name: str, path: str) -> Optional[Dict]:
+        try:
+            result = subprocess.run(
+                [path, "--help"],
+                capture_output=True,
+                text=True,
+                timeout=HELP_TIMEOUT,
+                stdin=subprocess.DEVNULL,
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        text = result.stdout or result.stderr
+        if not text.strip():
+            return None
+        return {"title": f"{name} --help", "url": f"help:{name}", "text": text}
+
+    def _package_sources(self) -> Iterator[Tuple[str, float, Callable]]:
+        for directory in SystemDetector.get_site_packages():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.name.endswith(".dist-info"):
+                    continue
+                metadata = os.path.join(entry.path, "METADATA")
+                try:
+                    mtime = os.stat(metadata).st_mtime
+                except OSError:
+                    continue
+                yield f"pkg:{metadata}", mtime, lambda path=metadata: self._load_metadata(path)
+
+    @staticmethod
+    def _load_metadata(path: str) -> Optional[Dict]:
+        with open(path, errors="replace") as f:
+            text = f.read(MAX_DOC_CHARS)
+        name = re.search(r"^Name:\s*(.+)$", text, re.MULTILINE)
+        summary = re.search(r"^Summary:\s*(.+)$", text, re.MULTILINE)
+        if not name:
+            return None
+        title = name.group(1).strip()
+        if summary:
+            title += f" - {summary.group(1).strip()}"
+        return {"title": title, "url": f"pypi:{name.group(1).strip()}", "text": text}
+
+    def _project_sources(self, root: Path) -> Iterator[Tuple[str, float, Callable]]:
+        count = 0
+        for directory, subdirs, files in os.walk(root):
+            subdirs[:] = [d for d in subdirs if d not in ALWAYS_SKIP and not d.startswith(".")]
+            rel = os.path.relpath(directory, root)
+            depth = 0 if rel == "." else rel.count(os.sep) + 1
+            if depth > 3:
+                subdirs[:] = []
+            for name in sorted(files):
+                is_doc = name.lower().startswith(("readme", "contributing", "install", "troubleshooting"))
+                in_docs = rel.split(os.sep)[0] in ("doc", "docs")
+                if not (is_doc or (in_docs and name.endswith(DOC_EXTENSIONS))):
+                    continue
+                if count >= MAX_PROJECT_DOCS:
+                    return
+                count += 1
+                path = os.path.join(directory, name)
+                try:
+                    mtime = os.stat(path).st_mtime
+                except OSError:
+                    continue
+                yield f"project:{path}", mtime, lambda path=path: self._load_file(path)
+
+    @staticmethod
+    def _load_file(path: str) -> Optional[Dict]:
+        with open(path, errors="replace") as f:
+            text = f.read(MAX_DOC_CHARS)
+        heading = re.search(r"^#+\s*(.+)$", text, re.MULTILINE)
+        title = heading.group(1).strip() if heading else os.path.basename(path)
+        return {"title": title, "url": Path(path).as_uri(), "text": text}
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def update(self, project_root: Optional[Path] = None, system: bool = True) -> int:
+        """
+        Index new or changed sources and drop vanished ones; returns documents
+        (re)indexed. With `system=False` only the project's docs are indexed
+        (quick). Freshness is recorded separately for the system sources and
+        for each project root.
+        """
+        groups = {}
+        if system:
+            groups = {
+                "man:": self._man_sources(),
+                "help:": self._help_sources(),
+                "pkg:": self._package_sources(),
+            }
+        if project_root:
+            # Trailing separator, so /a/b's stale docs never match /a/bc's
+            root = os.path.join(str(Path(project_root)), "")
+            groups[f"project:{root}"] = self._project_sources(Path(project_root))
+
+        conn = self._connect()
+        indexed = 0
+        try:
+            for prefix, sources in groups.items():
+                known = dict(conn.execute(
+                    "SELECT source, mtime FROM docs WHERE substr(source, 1, length(?)) = ?", (prefix, prefix)
+                ).fetchall())
+                seen = set()
+                for source, mtime, loader in sources:
+                    seen.add(source)
+                    if known.get(source) == mtime:
+                        continue
+                    try:
+                        doc = loader()
+                    except (OSError, UnicodeError, EOFError, zlib.error):
+                        doc = None
+                    self._remove(conn, source)
+                    if doc:
+                        self._add(conn, source, mtime, doc)
+                        indexed += 1
+                for source in set(known) - seen:
+                    self._remove(conn, source)
+                conn.commit()
+            now = time.time()
+            if system:
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('updated', ?)", (now,))
+            if project_root:
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    (self._project_key(project_root), now)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+        return indexed
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, source: str):
+        row = conn.execute("SELECT id FROM docs WHERE source = ?", (source,)).fetchone()
+        if row:
+            conn.execute("DELETE FROM postings WHERE doc = ?", (row[0],))
+            conn.execute("DELETE FROM docs WHERE id = ?", (row[0],))
+
+    @staticmethod
+    def _add(conn: sqlite3.Connection, source: str, mtime: float, doc: Dict):
+        text = doc["text"][:MAX_DOC_CHARS]
+        terms = tokenize(doc["title"] + "\n" + text)
+        if not terms:
+            return
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:MAX_DOC_TERMS]
+
+        snippet = " ".join(text.split())[:SNIPPET_CHARS]
+        cursor = conn.execute(
+            "INSERT INTO docs (source, mtime, title, url, snippet, length) VALUES (?, ?, ?, ?, ?, ?)",
+            (source, mtime, doc["title"][:200], doc["url"], zlib.compress(snippet.encode()), len(terms)),
+        )
+        conn.executemany("INSERT OR IGNORE INTO terms (term) VALUES (?)", [(term,) for term, _ in top])
+        conn.executemany(
+            "INSERT INTO postings (term, doc, tf) "
+            "SELECT id, ?, ? FROM terms WHERE term = ?",
+            [(cursor.lastrowid, tf, term) for term, tf in top],
+        )
+
+    @staticmethod
+    def _project_key(project_root: Path) -> str:
+        return f"project:{os.path.join(str(Path(project_root)), '')}"
+
+    def last_updated(self, project_root: Optional[Path] = None) -> float:
+        """When the system sources (or a project root's docs) were last indexed (0 if never)"""
+        name = self._project_key(project_root) if project_root else "updated"
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        conn.close()
+        return row[0] if row else 0.0
+
+    def project_stale(self, project_root: Optional[Path], max_age: float = PROJECT_MAX_AGE) -> bool:
+        """Whether a project's docs are missing from the index or older than `max_age`"""
+        return bool(project_root) and time.time() - self.last_updated(project_root) >= max_age
+
+    def update_async(self, project_root: Optional[Path] = None, max_age: float = 24 * 3600):
+        """
+        Refresh in a background thread: everything if the system sources are
+        older than `max_age`, else just the project's docs if they are stale.
+        """
+        if self._updating and self._updating.is_alive():
+            return
+        system = time.time() - self.last_updated() >= max_age
+        if not system and not self.project_stale(project_root):
+            return
+
+        def run():
+            try:
+                self.update(project_root, system=system)
+            except Exception:
+                pass  # The previous index stays usable
+
+        self._updating = threading.Thread(target=run, daemon=True)
+        self._updating.start()
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 5) -> List[Dict]:
+        """BM25-ranked documents: title, url, snippet and a 0-1 score"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        conn = self._connect()
+        try:
+            total_docs, total_length = conn.execute("SELECT COUNT(*), SUM(length) FROM docs").fetchone()
+            if not total_docs:
+                return []
+            avgdl = total_length / total_docs
+            marks = ",".join("?" * len(terms))
+            term_ids = [row[0] for row in conn.execute(
+                f"SELECT id FROM terms WHERE term IN ({marks})", terms
+            ).fetchall()]
+            if not term_ids:
+                return []
+            marks = ",".join("?" * len(term_ids))
+            df = dict(conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", term_ids
+            ).fetchall())
+
+            scores: Dict[int, float] = {}
+            rows = conn.execute(
+                f"SELECT p.term, p.doc, p.tf, d.length FROM postings p JOIN docs d ON d.id = p.doc "
+                f"WHERE p.term IN ({marks})", term_ids
+            ).fetchall()
+            for term, doc, tf, length in rows:
+                idf = math.log(1 + (total_docs - df[term] + 0.5) / (df[term] + 0.5))
+                norm = tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / avgdl))
+                scores[doc] = scores.get(doc, 0.0) + idf * norm
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            if not best:
+                return []
+            top_score = best[0][1]
+            results = []
+            for doc, score in best:
+                title, url, snippet = conn.execute(
+                    "SELECT title, url, snippet FROM docs WHERE id = ?", (doc,)
+                ).fetchone()
+                results.append({
+                    "title": title,
+                    "url": url,
+                    "snippet": zlib.decompress(snippet).decode(),
+                    "score": score / top_score,
+                })
+            return results
+        finally:
+            conn.close()
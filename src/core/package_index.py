@@ -0,0 +1,334 @@
+# ============================================================================
+# FILE: src/core/package_index.py
+# Local index of installed Python and Node packages
+# ============================================================================
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+from .project_scanner import ProjectScanner
+from .system_detector import SystemDetector
+
+# Import names whose distribution name differs, for modules that are not
+# installed yet (installed ones are mapped from top_level.txt / RECORD)
+KNOWN_IMPORT_NAMES = {
+    "cv2": "opencv-python",
+    "yaml": "PyYAML",
+    "PIL": "Pillow",
+    "sklearn": "scikit-learn",
+    "skimage": "scikit-image",
+    "bs4": "beautifulsoup4",
+    "dateutil": "python-dateutil",
+    "dotenv": "python-dotenv",
+    "jwt": "PyJWT",
+    "serial": "pyserial",
+    "usb": "pyusb",
+    "zmq": "pyzmq",
+    "attr": "attrs",
+    "Crypto": "pycryptodome",
+    "OpenSSL": "pyOpenSSL",
+    "magic": "python-magic",
+    "gi": "PyGObject",
+    "docx": "python-docx",
+    "pptx": "python-pptx",
+    "fitz": "PyMuPDF",
+    "MySQLdb": "mysqlclient",
+    "psycopg2": "psycopg2-binary",
+    "google.protobuf": "protobuf",
+    "win32api": "pywin32",
+    "Levenshtein": "python-Levenshtein",
+    "telegram": "python-telegram-bot",
+    "discord": "discord.py",
+    "jose": "python-jose",
+    "multipart": "python-multipart",
+}
+
+PYTHON_MISSING_RE = re.compile(r"No module named ['\"]?([\w.]+)['\"]?")
+NODE_MISSING_RE = re.compile(r"Cannot find module ['\"]([^'\"]+)['\"]", re.IGNORECASE)
+
+
+def normalize_name(name: str) -> str:
+    """PEP 503 normalized distribution name"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class PackageIndex:
+    """
+    Index of installed packages built from local metadata only:
+    *.dist-info / *.egg-info under site-packages and node_modules/*/package.json.
+    Each scanned directory is cached with its mtime and rescanned only when it changes.
+    """
+
+    def __init__(self, cache_path: str = "~/.terminal_hero/package_index.json"):
+        self.cache_path = Path(cache_path).expanduser()
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._cache = self._load_cache()
+        self._dirty = False
+
+    def _load_cache(self) -> Dict:
+        """Load cached directory scans"""
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except:
+            return {"python": {}, "node": {}}
+
+    def _save_cache(self):
+        """Persist cached directory scans if anything changed"""
+        if not self._dirty:
+            return
+        tmp_path = self.cache_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._cache, f)
+        os.replace(tmp_path, self.cache_path)
+        self._dirty = False
+
+    def _cached_scan(self, ecosystem: str, directory: str, scanner) -> Dict:
+        """Return the scan of `directory`, rerunning `scanner` only if its mtime moved"""
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            return {}
+        entry = self._cache[ecosystem].get(directory)
+        if entry and entry["mtime"] == mtime:
+            return entry["packages"]
+        packages = scanner(directory)
+        self._cache[ecosystem][directory] = {"mtime": mtime, "packages": packages}
+        self._dirty = True
+        return packages
+
+    # ------------------------------------------------------------------
+    # Python
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_metadata(meta_dir: str) -> Optional[Dict]:
+        """Read name, version and top-level modules from a dist-info/egg-info dir"""
+        name = version = None
+        for meta_file in ("METADATA", "PKG-INFO"):
+            try:
+                with open(os.path.join(meta_dir, meta_file), errors="replace") as f:
+                    for line in f:
+                        if not line.strip():
+                            break  # End of headers
+                        if line.startswith("Name:"):
+                            name = line[5:].strip()
+                        elif line.startswith("Version:"):
+                            version = line[8:].strip()
+                break
+            except OSError:
+                continue
+        if not name:
+            return None
+
+        top_level: List[str] = []
+        try:
+            with open(os.path.join(meta_dir, "top_level.txt")) as f:
+                top_level = [line.strip() for line in f if line.strip()]
+        except OSError:
+            # Derive top-level modules from RECORD
+            try:
+                with open(os.path.join(meta_dir, "RECORD"), errors="replace") as f:
+                    for line in f:
+                        first = line.split(",", 1)[0].split("/", 1)[0]
+                        if first.endswith(".py"):
+                            first = first[:-3]
+                        if (
+                            first
+                            and not first.endswith((".dist-info", ".data", ".pth"))
+                            and first not in ("__pycache__", "..")
+                            and first.isidentifier()
+                            and first not in top_level
+                        ):
+                            top_level.append(first)
+            except OSError:
+                pass
+        if not top_level:
+            top_level = [name.replace("-", "_")]
+        return {"name": name, "version": version, "top_level": top_level}
+
+    def _scan_site_packages(self, directory: str) -> Dict:
+        """Scan one site-packages dir: {normalized name: metadata}"""
+        packages = {}
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return packages
+        for entry in entries:
+            if entry.endswith((".dist-info", ".egg-info")):
+                meta = self._read_metadata(os.path.join(directory, entry))
+                if meta:
+                    packages[normalize_name(meta["name"])] = meta
+        return packages
+
+    def python_packages(self, site_dirs: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        All installed Python distributions keyed by normalized name, in
+        `site_dirs` (default: the active interpreter's or virtualenv's)
+        """
+        packages: Dict[str, Dict] = {}
+        if site_dirs is None:
+            site_dirs = SystemDetector.get_site_packages()
+        for directory in site_dirs:
+            for key, meta in self._cached_scan("python", directory, self._scan_site_packages).items():
+                packages.setdefault(key, meta)
+        self._save_cache()
+        return packages
+
+    def import_owners(self) -> Dict[str, List[str]]:
+        """Top-level import name -> installed distributions providing it"""
+        mapping: Dict[str, List[str]] = {}
+        for meta in self.python_packages().values():
+            for module in meta["top_level"]:
+                mapping.setdefault(module, []).append(meta["name"])
+        return mapping
+
+    @staticmethod
+    def _is_namespace(top: str) -> bool:
+        """Whether an installed top-level package is a namespace (no __init__.py)"""
+        for directory in SystemDetector.get_site_packages():
+            package = Path(directory) / top
+            if package.is_dir() and not (package / "__init__.py").exists():
+                return True
+        return False
+
+    @staticmethod
+    def known_name(module: str) -> Optional[str]:
+        """Distribution from the static map for the longest dotted prefix of a module"""
+        parts = module.split(".")
+        for end in range(len(parts), 0, -1):
+            name = KNOWN_IMPORT_NAMES.get(".".join(parts[:end]))
+            if name:
+                return name
+        return None
+
+    def distribution_for_import(self, module: str) -> str:
+        """
+        Distribution that provides (or would provide) an import name.
+        Namespace packages (google.*, azure.*) are shared by many
+        distributions, so their owners are not trusted for a submodule: the
+        static map decides, else the dotted path is only a guess.
+        """
+        top = module.split(".")[0]
+        owners = self.import_owners().get(top, [])
+        shared = len(owners) > 1 or (owners and "." in module and self._is_namespace(top))
+        if owners and not shared:
+            return owners[0]
+        known = self.known_name(module)
+        if known:
+            return known
+        return module.replace(".", "-") if shared else top
+
+    def python_version_of(self, distribution: str, site_dirs: Optional[List[str]] = None) -> Optional[str]:
+        """Installed version of a distribution, or None"""
+        meta = self.python_packages(site_dirs).get(normalize_name(distribution))
+        return meta["version"] if meta else None
+
+    # ------------------------------------------------------------------
+    # Node
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scan_node_modules(directory: str) -> Dict:
+        """Scan one node_modules dir: {package name: version}"""
+        packages = {}
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return packages
+        for entry in entries:
+            candidates = [entry]
+            if entry.startswith("@"):
+                try:
+                    candidates = [f"{entry}/{sub}" for sub in os.listdir(os.path.join(directory, entry))]
+                except OSError:
+                    continue
+            for candidate in candidates:
+                try:
+                    with open(os.path.join(directory, candidate, "package.json")) as f:
+                        data = json.load(f)
+                    packages[data.get("name", candidate)] = data.get("version")
+                except:
+                    continue
+        return packages
+
+    def _node_module_dirs(self, cwd: Path) -> List[str]:
+        """node_modules dirs visible from cwd (ancestors) plus NODE_PATH"""
+        dirs = []
+        for candidate in [cwd, *cwd.parents]:
+            node_modules = candidate / "node_modules"
+            if node_modules.is_dir():
+                dirs.append(str(node_modules))
+        node_path = SystemDetector.get_relevant_env_vars().get("NODE_PATH", "")
+        dirs.extend(p for p in node_path.split(os.pathsep) if p and os.path.isdir(p))
+        return dirs
+
+    def node_packages(self, cwd: Optional[Path] = None) -> Dict[str, Optional[str]]:
+        """Installed Node packages resolvable from cwd"""
+        packages: Dict[str, Optional[str]] = {}
+        for directory in self._node_module_dirs((cwd or Path.cwd()).resolve()):
+            for name, version in self._cached_scan("node", directory, self._scan_node_modules).items():
+                packages.setdefault(name, version)
+        self._save_cache()
+        return packages
+
+    # ------------------------------------------------------------------
+    # Error resolution
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def is_project_module(module: str, cwd: Optional[Path] = None) -> bool:
+        """Whether an import name matches a package or module in the working directory or project root"""
+        top = module.split(".")[0]
+        cwd = (cwd or Path.cwd()).resolve()
+        for directory in {cwd, ProjectScanner.find_root(cwd)}:
+            if (directory / top).is_dir() or (directory / f"{top}.py").is_file():
+                return True
+        return False
+
+    def resolve_error(self, error_text: str, cwd: Optional[Path] = None) -> Optional[Dict]:
+        """
+        Resolve a missing-module error locally.
+        Returns the ecosystem, module, package to install and whether it is installed.
+        `known` is False when the package name is only a guess from the import
+        name, and `local` is True when the module is part of the project
+        rather than a distribution; neither should be installed blindly.
+        """
+        match = PYTHON_MISSING_RE.search(error_text)
+        if match:
+            module = match.group(1).rstrip(".")
+            distribution = self.distribution_for_import(module)
+            version = self.python_version_of(distribution)
+            return {
+                "ecosystem": "python",
+                "module": module,
+                "package": distribution,
+                "installed": version is not None,
+                "version": version,
+                "known": version is not None or self.known_name(module) is not None,
+                "local": self.is_project_module(module, cwd),
+                "install_command": f"pip install {distribution}",
+            }
+
+        match = NODE_MISSING_RE.search(error_text)
+        if match:
+            module = match.group(1)
+            if module.startswith((".", "/")):
+                return None  # Relative import of a project file, not a package
+            parts = module.split("/")
+            package = "/".join(parts[:2]) if module.startswith("@") else parts[0]
+            version = self.node_packages(cwd).get(package)
+            return {
+                "ecosystem": "node",
+                "module": module,
+                "package": package,
+                "installed": version is not None,
+                "version": version,
+                "known": True,  # npm package names are the import names
+                "local": False,
+                "install_command": f"npm install {package}",
+            }
+
+        return None
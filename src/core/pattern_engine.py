@@ -0,0 +1,367 @@
+# ============================================================================
+# FILE: src/core/pattern_engine.py
+# Single-pass compiled error pattern engine
+# ============================================================================
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# User-defined named groups are prefixed per alternative so they stay unique
+# inside the combined regex
+_GROUP_DEF_RE = re.compile(r"\(\?P<([A-Za-z_]\w*)>")
+_GROUP_REF_RE = re.compile(r"\(\?P=([A-Za-z_]\w*)\)")
+
+MAX_POSITIONS = 20
+
+# Upper bound substituted for unbounded quantifiers, and how far around an
+# inner-literal hit a pattern is verified
+QUANTIFIER_LIMIT = 200
+VERIFY_SPAN = QUANTIFIER_LIMIT
+MIN_LITERAL = 3
+
+# A quantified group that itself contains a quantifier, e.g. (a+)+ or (\w*)*
+_NESTED_QUANTIFIER_RE = re.compile(r"\(((?:[^()\\]|\\.)*[*+](?:[^()\\]|\\.)*)\)[*+{]")
+_QUANTIFIED_ATOM_RE = re.compile(r"(?:\\.|\[[^\]]*\]|[^\\])(?:[*+?]|\{\d*,?\d*\})\??")
+_OPEN_REPEAT_RE = re.compile(r"\{(\d+),\}")
+
+
+def has_nested_quantifier(pattern: str) -> bool:
+    """
+    Whether a pattern is prone to catastrophic backtracking: a quantified
+    group made only of quantified atoms, so repetitions can split the same
+    text in exponentially many ways. (\\d+\\.)+ is allowed because the
+    literal dot anchors each repetition.
+    """
+    for m in _NESTED_QUANTIFIER_RE.finditer(pattern):
+        body = m.group(1)
+        if body.startswith("?:"):
+            body = body[2:]
+        remainder = _QUANTIFIED_ATOM_RE.sub("", body).replace("|", "")
+        if not remainder:
+            return True
+    return False
+
+
+def bound_quantifiers(pattern: str, limit: int = QUANTIFIER_LIMIT) -> str:
+    """Rewrite unbounded ``*``, ``+`` and ``{n,}`` into ``{0,limit}``-style repeats"""
+    out = []
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+            # A leading ']' is literal inside a class
+            if pattern[i + 1:i + 2] == "]":
+                out.append("[]")
+                i += 2
+                continue
+        elif ch in "*+":
+            out.append(f"{{{0 if ch == '*' else 1},{limit}}}")
+            i += 1
+            continue
+        elif ch == "{":
+            m = _OPEN_REPEAT_RE.match(pattern, i)
+            if m and int(m.group(1)) <= limit:
+                out.append(f"{{{m.group(1)},{limit}}}")
+                i = m.end()
+                continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def _tokens(pattern: str) -> List[Tuple[str, str]]:
+    """
+    Split a pattern into top-level tokens: ("lit", char), ("meta", text),
+    ("group", text), ("class", text), ("quant", text) or ("alt", "|").
+    """
+    tokens = []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            nxt = pattern[i + 1:i + 2]
+            kind = "lit" if nxt and not nxt.isalnum() else "meta"
+            tokens.append((kind, nxt if kind == "lit" else pattern[i:i + 2]))
+            i += 2
+        elif ch == "[":
+            j = i + 1
+            if pattern[j:j + 1] == "^":
+                j += 1
+            if pattern[j:j + 1] == "]":
+                j += 1
+            while j < len(pattern) and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            tokens.append(("class", pattern[i:j + 1]))
+            i = j + 1
+        elif ch == "(":
+            depth, j = 0, i
+            while j < len(pattern):
+                if pattern[j] == "\\":
+                    j += 2
+                    continue
+                if pattern[j] == "[":
+                    j += 1
+                    while j < len(pattern) and pattern[j] != "]":
+                        j += 2 if pattern[j] == "\\" else 1
+                depth += pattern[j] == "("
+                depth -= pattern[j] == ")"
+                j += 1
+                if depth == 0:
+                    break
+            tokens.append(("group", pattern[i:j]))
+            i = j
+        elif ch in "*+?":
+            tokens.append(("quant", ch))
+            i += 1
+        elif ch == "{":
+            j = pattern.find("}", i)
+            j = len(pattern) - 1 if j < 0 else j
+            tokens.append(("quant", pattern[i:j + 1]))
+            i = j + 1
+        elif ch == "|":
+            tokens.append(("alt", ch))
+            i += 1
+        elif ch in ".^$":
+            tokens.append(("meta", ch))
+            i += 1
+        else:
+            tokens.append(("lit", ch))
+            i += 1
+    return tokens
+
+
+def _branches(pattern: str) -> List[List[Tuple[str, str]]]:
+    """Top-level alternation branches, looking through one wrapping group"""
+    tokens = _tokens(pattern)
+    if len(tokens) == 1 and tokens[0][0] == "group":
+        inner = tokens[0][1][1:-1]
+        if inner.startswith("?:"):
+            inner = inner[2:]
+        elif inner.startswith("?P<"):
+            inner = inner[inner.index(">") + 1:]
+        if not inner.startswith("?"):
+            return _branches(inner)
+    branches, current = [], []
+    for token in tokens:
+        if token[0] == "alt":
+            branches.append(current)
+            current = []
+        else:
+            current.append(token)
+    branches.append(current)
+    return branches
+
+
+def branch_literals(pattern: str) -> Optional[List[Tuple[str, bool]]]:
+    """
+    One required lowercase literal per top-level branch, with whether it is
+    the branch's prefix (anchored). None if any branch has no literal of at
+    least MIN_LITERAL characters, in which case the pattern cannot be
+    prefiltered.
+    """
+    literals = []
+    for branch in _branches(pattern):
+        runs: List[Tuple[int, str]] = []
+        start, current = 0, []
+        for idx, (kind, text) in enumerate(branch):
+            quantified = idx + 1 < len(branch) and branch[idx + 1][0] == "quant"
+            if kind == "lit" and not quantified:
+                if not current:
+                    start = idx
+                current.append(text)
+                continue
+            if current:
+                runs.append((start, "".join(current)))
+                current = []
+        if current:
+            runs.append((start, "".join(current)))
+
+        runs = [(idx, run) for idx, run in runs if len(run) >= MIN_LITERAL]
+        if not runs:
+            return None
+        if runs[0][0] == 0:
+            literals.append((runs[0][1].lower(), True))
+        else:
+            literals.append((max(runs, key=lambda r: len(r[1]))[1].lower(), False))
+    return literals
+
+
+@dataclass
+class PatternMatch:
+    """All hits of one rule in a scanned text"""
+    name: str
+    category: str
+    severity: str
+    score: float
+    positions: List[Tuple[int, int]] = field(default_factory=list)
+    groups: Dict[str, str] = field(default_factory=dict)
+    resolver_type: Optional[str] = None
+
+    @property
+    def start(self) -> int:
+        return self.positions[0][0] if self.positions else -1
+
+
+class PatternEngine:
+    """
+    Compiles a rule table into a literal prefilter and classifies text in a
+    single scan.
+
+    Every branch of most patterns contains a required literal ("permission
+    denied", ": command not found"). Those literals are joined into one
+    case-sensitive alternation run over the lowercased text, which `re` scans
+    far faster than an IGNORECASE alternation. Each prefilter hit is then
+    verified by anchoring the owning pattern at that offset, or searching a
+    short window around it for inner literals. Patterns without a usable
+    literal go into one combined fallback regex.
+
+    Unbounded quantifiers are rewritten to at most QUANTIFIER_LIMIT repeats,
+    so verifying a hit costs a bounded amount of work.
+    """
+
+    def __init__(self, rules: Dict[str, Dict]):
+        self.rules = rules
+        self._order = {name: i for i, name in enumerate(rules)}
+        # literal -> [(rule name, weight, compiled pattern, anchored)]
+        self._literals: Dict[str, List[Tuple[str, float, re.Pattern, bool]]] = {}
+        # group id -> (rule name, weight, {prefixed group: user group})
+        self._groups: Dict[str, Tuple[str, float, Dict[str, str]]] = {}
+        self._literal_patterns: List[Tuple[str, float, re.Pattern]] = []
+        fallback = []
+
+        for rule_idx, (name, rule) in enumerate(rules.items()):
+            for pat_idx, (pattern, weight) in enumerate(self._rule_patterns(rule)):
+                literals = branch_literals(pattern)
+                if literals:
+                    compiled = re.compile(pattern, re.IGNORECASE)
+                    self._literal_patterns.append((name, weight, compiled))
+                    for literal, anchored in literals:
+                        self._literals.setdefault(literal, []).append(
+                            (name, weight, compiled, anchored)
+                        )
+                    continue
+
+                gid = f"r{rule_idx}_{pat_idx}"
+                prefix = f"{gid}__"
+                user_groups = {
+                    prefix + g: g for g in _GROUP_DEF_RE.findall(pattern)
+                }
+                pattern = _GROUP_DEF_RE.sub(lambda m: f"(?P<{prefix}{m.group(1)}>", pattern)
+                pattern = _GROUP_REF_RE.sub(lambda m: f"(?P={prefix}{m.group(1)})", pattern)
+                self._groups[gid] = (name, weight, user_groups)
+                # Zero-width so a greedy pattern does not hide later hits
+                fallback.append(f"(?=(?P<{gid}>{pattern}))")
+
+        # Longest literals first so the alternation prefers specific hits
+        ordered = sorted(self._literals, key=len, reverse=True)
+        self.prefilter = re.compile("|".join(re.escape(lit) for lit in ordered) or r"(?!)")
+        self._buckets: Dict[str, List[str]] = {}
+        for literal in ordered:
+            self._buckets.setdefault(literal[:3], []).append(literal)
+        self.fallback = re.compile("|".join(fallback), re.IGNORECASE) if fallback else None
+
+    @staticmethod
+    def _rule_patterns(rule: Dict) -> List[Tuple[str, float]]:
+        """Patterns of a rule with their weights, wildcards bounded"""
+        patterns = []
+        if rule.get("regex"):
+            patterns.append((rule["regex"], 1.0))
+        for pattern in rule.get("extract", []):
+            patterns.append((pattern, 1.0))
+        for pattern in rule.get("weak_regex", []):
+            patterns.append((pattern, 0.5))
+        return [(bound_quantifiers(pattern), weight) for pattern, weight in patterns]
+
+    def scan(self, text: str) -> List[PatternMatch]:
+        """Scan once; return every matching rule, best first"""
+        found: Dict[str, PatternMatch] = {}
+        hits: Dict[str, int] = {}
+        seen = set()
+
+        def record(name: str, weight: float, span: Tuple[int, int], groups: Dict[str, str]):
+            if (name, span) in seen:
+                return  # Same match reached through another literal
+            seen.add((name, span))
+            rule = self.rules[name]
+            match = found.get(name)
+            if match is None:
+                match = found[name] = PatternMatch(
+                    name=name,
+                    category=rule["category"],
+                    severity=rule["severity"],
+                    score=weight,
+                    resolver_type=rule.get("resolver_type", name),
+                )
+                hits[name] = 0
+            hits[name] += 1
+            match.score = max(match.score, weight)
+            if len(match.positions) < MAX_POSITIONS:
+                match.positions.append(span)
+            for key, value in groups.items():
+                if value is not None and key not in match.groups:
+                    match.groups[key] = value
+
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            lowered = None  # Case folding changed offsets; verify on the raw text only
+
+        if lowered is not None:
+            pos = 0
+            search = self.prefilter.search
+            while True:
+                hit = search(lowered, pos)
+                if hit is None:
+                    break
+                start = hit.start()
+                # Several literals may start at the same offset
+                for literal in self._buckets.get(lowered[start:start + 3], ()):
+                    if not lowered.startswith(literal, start):
+                        continue
+                    for name, weight, compiled, anchored in self._literals[literal]:
+                        if anchored:
+                            m = compiled.match(text, start)
+                            if m:
+                                record(name, weight, m.span(), m.groupdict())
+                            continue
+                        lo = max(0, start - VERIFY_SPAN)
+                        hi = min(len(text), start + len(literal) + VERIFY_SPAN)
+                        for m in compiled.finditer(text, lo, hi):
+                            if m.start() <= start < m.end():
+                                record(name, weight, m.span(), m.groupdict())
+                pos = start + 1
+
+        else:
+            for name, weight, compiled in self._literal_patterns:
+                for m in compiled.finditer(text):
+                    record(name, weight, m.span(), m.groupdict())
+
+        if self.fallback is not None:
+            for m in self.fallback.finditer(text):
+                gid = m.lastgroup
+                name, weight, user_groups = self._groups[gid]
+                groups = {user: m.group(prefixed) for prefixed, user in user_groups.items()}
+                record(name, weight, m.span(gid), groups)
+
+        # Repeated hits raise confidence slightly
+        for name, match in found.items():
+            match.score = min(1.0, match.score + 0.05 * (hits[name] - 1))
+
+        return self.rank(found.values())
+
+    def rank(self, matches) -> List[PatternMatch]:
+        """Order matches best first: score, then table order, then position"""
+        return sorted(matches, key=lambda m: (-m.score, self._order[m.name], m.start))
+
+    def best(self, text: str) -> Optional[PatternMatch]:
+        """Highest-scoring match, or None"""
+        matches = self.scan(text)
+        return matches[0] if matches else None
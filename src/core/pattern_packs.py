@@ -0,0 +1,145 @@
+# ============================================================================
+# FILE: src/core/pattern_packs.py
+# Loadable pattern packs with capture groups and fix templates
+# ============================================================================
+
+import copy
+import json
+import re
+import shlex
+import shutil
+import string
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from .pattern_engine import has_nested_quantifier
+
+DEFAULT_PACK_DIR = "~/.terminal_hero/patterns"
+
+# Keys a pack rule may extend (lists) or set (scalars)
+LIST_KEYS = ("extract", "weak_regex", "fixes")
+SCALAR_KEYS = ("regex", "category", "severity", "resolver_type")
+CATEGORIES = ("permission", "not_found", "dependency", "config", "network", "unknown")
+SEVERITIES = ("low", "medium", "high", "critical")
+
+
+class PatternPackError(ValueError):
+    """Raised when a pattern pack is malformed"""
+
+
+def _read_pack(path: Path) -> Dict:
+    """Parse one pack file (JSON, or YAML when PyYAML is available)"""
+    text = path.read_text()
+    if path.suffix == ".json":
+        return json.loads(text)
+    try:
+        import yaml
+    except ImportError:
+        raise PatternPackError(f"{path.name}: PyYAML is required for YAML pattern packs")
+    return yaml.safe_load(text) or {}
+
+
+def validate_rule(name: str, rule: Dict, is_new: bool):
+    """Check a rule from a pack before it is merged"""
+    if not isinstance(rule, dict):
+        raise PatternPackError(f"{name}: rule must be a mapping")
+    if is_new:
+        if not (rule.get("regex") or rule.get("extract")):
+            raise PatternPackError(f"{name}: new rules need 'regex' or 'extract'")
+        for key in ("category", "severity"):
+            if key not in rule:
+                raise PatternPackError(f"{name}: new rules need '{key}'")
+    if "category" in rule and rule["category"] not in CATEGORIES:
+        raise PatternPackError(f"{name}: unknown category {rule['category']!r}")
+    if "severity" in rule and rule["severity"] not in SEVERITIES:
+        raise PatternPackError(f"{name}: unknown severity {rule['severity']!r}")
+    for pattern in [rule.get("regex")] + list(rule.get("extract", [])) + list(rule.get("weak_regex", [])):
+        if pattern:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise PatternPackError(f"{name}: invalid regex {pattern!r}: {e}")
+            if has_nested_quantifier(pattern):
+                raise PatternPackError(f"{name}: nested quantifier in {pattern!r} can backtrack catastrophically")
+
+
+def merge_pack(rules: Dict[str, Dict], pack: Dict) -> Dict[str, Dict]:
+    """Merge one pack's rules into `rules` in place"""
+    for name, rule in (pack.get("patterns") or {}).items():
+        is_new = name not in rules
+        validate_rule(name, rule, is_new)
+        target = rules.setdefault(name, {})
+        for key in SCALAR_KEYS:
+            if key in rule:
+                target[key] = rule[key]
+        for key in LIST_KEYS:
+            if key in rule:
+                target[key] = list(target.get(key, [])) + list(rule[key])
+    return rules
+
+
+def load_rules(base: Dict[str, Dict], pack_dir: str = DEFAULT_PACK_DIR) -> Dict[str, Dict]:
+    """Built-in rules merged with every pack in `pack_dir` (sorted by filename)"""
+    rules = copy.deepcopy(base)
+    directory = Path(pack_dir).expanduser()
+    if not directory.is_dir():
+        return rules
+
+    for path in sorted(directory.iterdir()):
+        if path.suffix not in (".json", ".yaml", ".yml"):
+            continue
+        try:
+            merge_pack(rules, _read_pack(path))
+        except (PatternPackError, ValueError, OSError) as e:
+            # A broken pack must not take classification down with it
+            print(f"[Terminal Hero] Skipping pattern pack {path.name}: {e}", file=sys.stderr)
+    return rules
+
+
+def derive_params(groups: Dict[str, str]) -> Dict[str, str]:
+    """Add parameters implied by captured ones (module -> package to install)"""
+    params = dict(groups)
+    if params.get("module") and "package" not in params:
+        from .package_index import PackageIndex
+
+        module = params["module"]
+        params["package"] = PackageIndex.known_name(module) or module.split(".")[0]
+    if params.get("node_module") and "node_package" not in params:
+        parts = params["node_module"].split("/")
+        params["node_package"] = "/".join(parts[:2]) if parts[0].startswith("@") else parts[0]
+    return params
+
+
+def _placeholders(template: str) -> List[str]:
+    """Field names used by a format template"""
+    return [field for _, field, _, _ in string.Formatter().parse(template) if field]
+
+
+def render_fixes(rule: Dict, groups: Dict[str, str], package_managers: Optional[List[str]] = None) -> List[List[str]]:
+    """
+    Render a rule's fix templates with captured parameters.
+
+    Each fix is either a command string or a mapping with ``commands`` and
+    optional ``requires`` (binaries that must be on PATH, or package managers).
+    Fixes whose placeholders are not all captured are skipped. Returns a list
+    of command lists, one per applicable fix.
+    """
+    params = derive_params(groups)
+    rendered = []
+    for fix in rule.get("fixes", []):
+        if isinstance(fix, str):
+            fix = {"commands": [fix]}
+        requires = fix.get("requires", [])
+        if isinstance(requires, str):
+            requires = [requires]
+        if any(
+            not shutil.which(req) and req not in (package_managers or [])
+            for req in requires
+        ):
+            continue
+        commands = fix.get("commands", [])
+        if any(field not in params for cmd in commands for field in _placeholders(cmd)):
+            continue
+        quoted = {key: shlex.quote(value) for key, value in params.items()}
+        rendered.append([cmd.format(**quoted) for cmd in commands])
+    return rendered
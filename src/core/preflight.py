@@ -0,0 +1,295 @@
+# ============================================================================
+# FILE: src/core/preflight.py
+# Pre-flight feasibility checks for solution strategy commands
+# ============================================================================
+
+import re
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .command_safety import unwrap_command
+from .package_index import PackageIndex
+
+SEPARATORS = {"&&", "||", "|", "|&", ";", "&", ";;"}
+SHELL_BUILTINS = {
+    "cd", "echo", "export", "source", ".", "set", "unset", "test", "[", "[[",
+    "true", "false", "read", "exit", "ulimit", "umask", "alias", "type",
+    "printf", "pwd", "eval", "hash", "shift", "wait", "kill", "trap", "return",
+    "if", "then", "else", "fi", "for", "do", "done", "while", "case", "esac",
+}
+PACKAGE_MANAGERS = {
+    "apt", "apt-get", "dnf", "yum", "pacman", "brew", "pip", "pip3",
+    "npm", "yarn", "pnpm", "cargo", "gem",
+}
+
+# Probe that exits 0 when a system package is installed
+SYSTEM_PROBES = {
+    "apt": ["dpkg-query", "-W", "-f=${Status}"],
+    "dnf": ["rpm", "-q"],
+    "yum": ["rpm", "-q"],
+    "pacman": ["pacman", "-Q"],
+    "brew": ["brew", "list", "--versions"],
+}
+PROBE_TIMEOUT = 10
+
+# Seconds PATH lookups and package probes are reused; the user may install
+# things between diagnoses
+CACHE_TTL = 60
+
+# Install options whose value is the next word, not a package
+VALUE_OPTIONS = {"--prefix", "-t", "--target", "-i", "--index-url", "--extra-index-url", "-c", "--constraint"}
+
+_VERSION_RE = re.compile(r"[<>=!~;\[ ]")
+
+
+@dataclass
+class InstallTarget:
+    """Packages one command installs, and with what"""
+    ecosystem: str  # python, node or a system package manager
+    packages: List[str]
+
+
+@dataclass
+class PreflightReport:
+    """What pre-flight found for one strategy"""
+    missing_binaries: List[str] = field(default_factory=list)
+    missing_managers: List[str] = field(default_factory=list)
+    installed: List[str] = field(default_factory=list)   # "name (version)"
+    install_targets: int = 0
+    only_installs: bool = False
+    unparseable: List[str] = field(default_factory=list)
+
+    @property
+    def feasible(self) -> bool:
+        return not (self.missing_binaries or self.missing_managers)
+
+    @property
+    def redundant(self) -> bool:
+        """Every command installs something and it is all installed already"""
+        return self.only_installs and 0 < self.install_targets == len(self.installed)
+
+    def issues(self) -> List[str]:
+        issues = []
+        if self.missing_managers:
+            issues.append(f"Package manager not available: {', '.join(self.missing_managers)}")
+        if self.missing_binaries:
+            issues.append(f"Not found on PATH: {', '.join(self.missing_binaries)}")
+        if self.installed:
+            issues.append(f"Already installed: {', '.join(self.installed)}")
+        if self.unparseable:
+            issues.append(f"Could not parse: {', '.join(self.unparseable)}")
+        return issues
+
+
+def split_command(command: str) -> List[List[str]]:
+    """Simple commands in a shell line, as word lists without redirections"""
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=True)
+    lexer.whitespace_split = True
+    lexer.commenters = "#"
+    segments, words = [], []
+    skip_next = False
+    for token in lexer:
+        if skip_next:
+            skip_next = False
+        elif token in SEPARATORS:
+            if words:
+                segments.append(words)
+            words = []
+        elif token in ("(", ")", "{", "}"):
+            continue
+        elif token and set(token) <= set("<>&"):
+            if words and words[-1].isdigit():
+                words.pop()  # File descriptor, as in 2>&1
+            skip_next = True  # Redirection target
+        else:
+            words.append(token)
+    if words:
+        segments.append(words)
+    return segments
+
+
+def program_words(words: List[str]) -> List[str]:
+    """Words from the program name on, past assignments and wrappers like sudo"""
+    return unwrap_command(words)
+
+
+def _strip_version(spec: str, ecosystem: str) -> str:
+    if ecosystem == "node":
+        at = spec.rfind("@")
+        return spec[:at] if at > 0 else spec
+    return _VERSION_RE.split(spec, 1)[0]
+
+
+def install_target(words: List[str]) -> Optional[InstallTarget]:
+    """Packages installed by a simple command, if it is a recognized install"""
+    if not words:
+        return None
+    program = Path(words[0]).name
+    args = words[1:]
+    if program.startswith("python") and args[:2] == ["-m", "pip"]:
+        program, args = "pip", args[2:]
+
+    if program in ("pip", "pip3") and args[:1] == ["install"]:
+        ecosystem, rest = "python", args[1:]
+        if any(a in ("-r", "--requirement", "-e", "--editable", "-U", "--upgrade") for a in rest):
+            return None  # Not a fixed set of packages, or meant to change versions
+    elif program == "npm" and args[:1] in (["install"], ["i"], ["add"]) and len(args) > 1:
+        ecosystem, rest = "node", args[1:]
+        if any(a in ("-g", "--global") for a in rest):
+            return None
+    elif program in ("yarn", "pnpm") and args[:1] == ["add"]:
+        ecosystem, rest = "node", args[1:]
+    elif program in ("apt-get", "apt") and args[:1] == ["install"]:
+        ecosystem, rest = "apt", args[1:]
+    elif program in ("dnf", "yum", "brew") and args[:1] == ["install"]:
+        ecosystem, rest = program, args[1:]
+    elif program == "pacman" and args[:1] and args[0].startswith("-S") and "y" not in args[0][2:]:
+        ecosystem, rest = "pacman", args[1:]
+    else:
+        return None
+
+    packages = []
+    for i, arg in enumerate(rest):
+        if arg.startswith("-") or (i > 0 and rest[i - 1] in VALUE_OPTIONS):
+            continue
+        package = _strip_version(arg, ecosystem)
+        if package and not package.startswith((".", "/", "~")):
+            packages.append(package)
+    return InstallTarget(ecosystem, packages) if packages else None
+
+
+def is_refresh(words: List[str]) -> bool:
+    """Package list refreshes (apt-get update, ...) that accompany installs"""
+    if not words or words[0] not in PACKAGE_MANAGERS:
+        return False
+    return words[1:2] in (["update"], ["makecache"], ["-Sy"])
+
+
+class PreflightChecker:
+    """
+    Checks strategies against this machine before they are offered:
+    binaries on PATH, package managers present, and install targets that are
+    already installed. Strategies are checked concurrently; package probes
+    (dpkg-query, rpm, ...) are the slow part.
+    """
+
+    def __init__(self, package_index: Optional[PackageIndex] = None, max_workers: int = 8):
+        self.package_index = package_index or PackageIndex()
+        self.max_workers = max_workers
+        self._which: Dict[str, bool] = {}
+        self._probes: Dict[Tuple, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._cached_at = time.monotonic()
+
+    def reset(self):
+        """Forget PATH lookups and package probes"""
+        self._which = {}
+        self._probes = {}
+        self._cached_at = time.monotonic()
+
+    def _expire(self):
+        if time.monotonic() - self._cached_at > CACHE_TTL:
+            self.reset()
+
+    def _on_path(self, program: str) -> bool:
+        if program not in self._which:
+            if "/" in program:
+                self._which[program] = Path(program).expanduser().exists()
+            else:
+                self._which[program] = shutil.which(program) is not None
+        return self._which[program]
+
+    def installed_version(
+        self, ecosystem: str, package: str, site_dirs: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """
+        Installed version of a package ("" when installed but unversioned), or
+        None. Python packages are looked up in `site_dirs` when given, else
+        in the active interpreter's site-packages.
+        """
+        key = (ecosystem, package, tuple(site_dirs) if site_dirs is not None else None)
+        if key in self._probes:
+            return self._probes[key]
+
+        version = None
+        if ecosystem == "python":
+            with self._lock:  # The index rescans and saves its cache
+                version = self.package_index.python_version_of(package, site_dirs)
+        elif ecosystem == "node":
+            with self._lock:
+                packages = self.package_index.node_packages()
+            if package in packages:
+                version = packages[package] or ""
+        elif ecosystem in SYSTEM_PROBES and self._on_path(SYSTEM_PROBES[ecosystem][0]):
+            try:
+                result = subprocess.run(
+                    SYSTEM_PROBES[ecosystem] + [package],
+                    capture_output=True,
+                    text=True,
+                    timeout=PROBE_TIMEOUT
+                )
+                installed = result.returncode == 0
+                if ecosystem == "apt":
+                    installed = installed and "install ok installed" in result.stdout
+                version = "" if installed else None
+            except:
+                pass
+
+        self._probes[key] = version
+        return version
+
+    def check(self, commands: List[str]) -> PreflightReport:
+        """Check one strategy's commands"""
+        self._expire()
+        report = PreflightReport()
+        installing = False
+        other_steps = False
+        for command in commands:
+            if not command.strip() or command.strip().startswith("#"):
+                continue
+            try:
+                segments = split_command(command)
+            except ValueError:
+                report.unparseable.append(command)
+                continue
+
+            for words in segments:
+                words = program_words(words)
+                if not words:
+                    continue
+                program = words[0]
+                target = install_target(words)
+                if not target and not is_refresh(words):
+                    other_steps = True
+
+                # Programs a previous step installs may legitimately be missing now
+                if program not in SHELL_BUILTINS and not installing and not self._on_path(program):
+                    missing = report.missing_managers if program in PACKAGE_MANAGERS else report.missing_binaries
+                    if program not in missing:
+                        missing.append(program)
+
+                if target:
+                    installing = True
+                    report.install_targets += len(target.packages)
+                    for package in target.packages:
+                        version = self.installed_version(target.ecosystem, package)
+                        if version is not None:
+                            report.installed.append(f"{package} ({version})" if version else package)
+
+        report.only_installs = installing and not other_steps
+        return report
+
+    def check_all(self, strategies: List) -> List[PreflightReport]:
+        """Reports for many strategies, checked concurrently"""
+        if not strategies:
+            return []
+        self.reset()  # Each batch sees the system as it is now
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(strategies))) as pool:
+            return list(pool.map(lambda s: self.check(s.commands), strategies))
@@ -0,0 +1,326 @@
+# ============================================================================
+# FILE: src/core/project_scanner.py
+# Gitignore-aware project scanner with a persistent manifest index
+# ============================================================================
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Manifest filename -> project type
+MANIFESTS = {
+    "package.json": "node",
+    "requirements.txt": "python",
+    "Pipfile": "python",
+    "pyproject.toml": "python",
+    "setup.py": "python",
+    "Cargo.toml": "rust",
+    "go.mod": "go",
+    "pom.xml": "java",
+    "build.gradle": "java",
+    "Gemfile": "ruby",
+}
+
+# Files that only exist at the top of a multi-package workspace
+WORKSPACE_MARKERS = {
+    "pnpm-workspace.yaml",
+    "lerna.json",
+    "nx.json",
+    "turbo.json",
+    "go.work",
+}
+
+# Never descend into these, whatever .gitignore says
+ALWAYS_SKIP = {".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".tox"}
+
+
+class GitIgnore:
+    """Minimal .gitignore matcher for a single directory's rules"""
+
+    def __init__(self, base: str, lines: List[str]):
+        self.base = base
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, dir_only)
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            self.rules.append((self._compile(line, anchored), negated, dir_only))
+
+    @staticmethod
+    def _compile(pattern: str, anchored: bool) -> re.Pattern:
+        """Translate a gitignore glob into a regex over '/'-separated relative paths"""
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("/**", i) and i + 3 == len(pattern):
+                parts.append("/.*")
+                i += 3
+            elif pattern[i] == "*":
+                parts.append("[^/]*")
+                i += 1
+            elif pattern[i] == "?":
+                parts.append("[^/]")
+                i += 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        prefix = "" if anchored else "(?:.*/)?"
+        return re.compile(f"^{prefix}{''.join(parts)}$")
+
+    @classmethod
+    def load(cls, directory: str, rel: str) -> Optional["GitIgnore"]:
+        """Load the .gitignore in `directory` (indexed as `rel`), if any"""
+        try:
+            with open(os.path.join(directory, ".gitignore"), errors="replace") as f:
+                return cls(rel, f.readlines())
+        except OSError:
+            return None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True/False if a rule decides `rel_path`, None if no rule applies"""
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        decision = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                decision = not negated
+        return decision
+
+
+def is_ignored(ignores: List[GitIgnore], rel_path: str, is_dir: bool) -> bool:
+    """Apply stacked .gitignore files; deeper files override shallower ones"""
+    ignored = False
+    for ignore in ignores:
+        decision = ignore.match(rel_path, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+
+class ProjectScanner:
+    """
+    Finds project manifests under a repository root and records them in a
+    persistent index. Rescans are incremental: a directory whose mtime has not
+    changed since the last scan is not listed again. A directory outside any
+    repository (such as $HOME) is only scanned `loose_depth` levels deep.
+    """
+
+    def __init__(
+        self,
+        index_path: str = "~/.terminal_hero/project_index.json",
+        max_depth: int = 8,
+        max_files: int = 50000,
+        rescan_interval: float = 30.0,
+        loose_depth: int = 1,
+    ):
+        self.index_path = Path(index_path).expanduser()
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_depth = max_depth
+        self.max_files = max_files
+        self.rescan_interval = rescan_interval
+        self.loose_depth = loose_depth
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict:
+        """Load the persisted index"""
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except:
+            return {"roots": {}}
+
+    def _save_index(self):
+        """Persist the index atomically"""
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+
+    @staticmethod
+    def find_root(start: Path) -> Path:
+        """Nearest ancestor containing .git, or `start` itself"""
+        start = start.resolve()
+        for candidate in [start, *start.parents]:
+            if (candidate / ".git").exists():
+                return candidate
+        return start
+
+    def _list_dir(self, path: str, cached: Optional[Dict]) -> Optional[Dict]:
+        """Return the index entry for a directory, relisting only if its mtime moved"""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        if cached and cached.get("mtime") == mtime:
+            return cached
+
+        manifests, subdirs, entries = [], [], 0
+        has_gitignore = False
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    entries += 1
+                    name = entry.name
+                    if name == ".gitignore":
+                        has_gitignore = True
+                    elif name in MANIFESTS or name in WORKSPACE_MARKERS:
+                        manifests.append(name)
+                    elif name not in ALWAYS_SKIP and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(name)
+        except OSError:
+            return None
+        return {
+            "mtime": mtime,
+            "manifests": sorted(manifests),
+            "subdirs": sorted(subdirs),
+            "entries": entries,
+            "gitignore": has_gitignore,
+        }
+
+    def scan(self, root: Path, max_depth: Optional[int] = None) -> Dict[str, List[str]]:
+        """Incrementally (re)scan `root`; returns {relative_dir: [manifests]}"""
+        root = root.resolve()
+        root_key = str(root)
+        max_depth = self.max_depth if max_depth is None else max_depth
+        old_dirs = self._index["roots"].get(root_key, {}).get("dirs", {})
+        new_dirs: Dict[str, Dict] = {}
+        seen = 0
+
+        # Depth-first walk carrying the stack of applicable .gitignore files
+        stack: List[Tuple[str, int, List[GitIgnore]]] = [("", 0, [])]
+        while stack and seen < self.max_files:
+            rel, depth, ignores = stack.pop()
+            abs_path = os.path.join(root_key, rel) if rel else root_key
+            entry = self._list_dir(abs_path, old_dirs.get(rel))
+            if entry is None:
+                continue
+            new_dirs[rel] = entry
+            seen += entry["entries"]
+
+            if entry["gitignore"]:
+                loaded = GitIgnore.load(abs_path, rel)
+                if loaded:
+                    ignores = ignores + [loaded]
+
+            if depth >= max_depth:
+                continue
+            for name in reversed(entry["subdirs"]):
+                child = f"{rel}/{name}" if rel else name
+                if not is_ignored(ignores, child, True):
+                    stack.append((child, depth + 1, ignores))
+
+        self._index["roots"][root_key] = {
+            "dirs": new_dirs,
+            "truncated": seen >= self.max_files,
+            "scanned_at": time.time(),
+        }
+        self._save_index()
+        return {rel: entry["manifests"] for rel, entry in new_dirs.items() if entry["manifests"]}
+
+    def _refresh_chain(self, root: Path, cwd: Path) -> Dict[str, Dict]:
+        """Revalidate only the directories between root and cwd"""
+        dirs = self._index["roots"][str(root)]["dirs"]
+        try:
+            rel_parts = cwd.relative_to(root).parts
+        except ValueError:
+            rel_parts = ()
+        changed = False
+        rels = [""] + ["/".join(rel_parts[:i]) for i in range(1, len(rel_parts) + 1)]
+        for rel in rels:
+            abs_path = os.path.join(str(root), rel) if rel else str(root)
+            entry = self._list_dir(abs_path, dirs.get(rel))
+            if entry is not None and entry is not dirs.get(rel):
+                dirs[rel] = entry
+                changed = True
+        if changed:
+            self._save_index()
+        return dirs
+
+    def get_context(self, cwd: Optional[Path] = None) -> Dict:
+        """Nearest manifests for `cwd` plus the workspace-level manifests above it"""
+        cwd = (cwd or Path.cwd()).resolve()
+        root = self.find_root(cwd)
+
+        # Revalidate the whole tree (only changed directories are relisted)
+        # at most every rescan_interval; in between just root -> cwd
+        indexed = self._index["roots"].get(str(root))
+        if not indexed or time.time() - indexed.get("scanned_at", 0) >= self.rescan_interval:
+            is_repo = (root / ".git").exists()
+            self.scan(root, None if is_repo else self.loose_depth)
+        dirs = self._refresh_chain(root, cwd)
+
+        # Walk from cwd up to the root collecting manifests
+        chain: List[Tuple[Path, List[str]]] = []
+        for candidate in [cwd, *cwd.parents]:
+            try:
+                rel = str(candidate.relative_to(root))
+            except ValueError:
+                break
+            rel = "" if rel == "." else rel
+            entry = dirs.get(rel)
+            if entry and entry["manifests"]:
+                chain.append((candidate, entry["manifests"]))
+            if candidate == root:
+                break
+
+        nearest: List[str] = []
+        workspace: List[str] = []
+        if chain:
+            nearest_dir, names = chain[0]
+            nearest = [str(nearest_dir / name) for name in names]
+            for directory, names in chain[1:]:
+                if directory == root or self._is_workspace_dir(directory, names):
+                    workspace.extend(str(directory / name) for name in names)
+
+        return {
+            "project_root": str(root),
+            "nearest_manifests": nearest,
+            "workspace_manifests": workspace,
+            "packages": self.list_packages(root),
+        }
+
+    @staticmethod
+    def _is_workspace_dir(directory: Path, names: List[str]) -> bool:
+        """Whether a directory's manifests declare a workspace"""
+        if any(name in WORKSPACE_MARKERS for name in names):
+            return True
+        try:
+            if "package.json" in names:
+                return "workspaces" in json.loads((directory / "package.json").read_text())
+            if "Cargo.toml" in names:
+                return "[workspace]" in (directory / "Cargo.toml").read_text()
+        except:
+            pass
+        return False
+
+    def list_packages(self, root: Path) -> List[str]:
+        """All indexed directories under `root` that hold a manifest"""
+        dirs = self._index["roots"].get(str(root), {}).get("dirs", {})
+        return sorted(rel or "." for rel, entry in dirs.items() if entry["manifests"])
+
+    @staticmethod
+    def project_type(manifest_names: List[str]) -> Optional[str]:
+        """Project type implied by a set of manifest filenames"""
+        for name in MANIFESTS:
+            if name in manifest_names:
+                return MANIFESTS[name]
+        return None
@@ -0,0 +1,258 @@
+# ============================================================================
+# FILE: src/core/sandbox.py
+# Throwaway project copies for trying strategies away from the real tree
+# ============================================================================
+
+import os
+import shlex
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .command_safety import SHELLS, parse_command
+
+DEFAULT_TRIAL_DIR = "~/.terminal_hero/trials"
+
+# ioctl that makes a copy-on-write clone of a file (btrfs, XFS, bcachefs)
+FICLONE = 0x40049409
+
+# Caches rewritten in place and cheap to regenerate; left out of sandboxes
+SKIP_DIRS = {"__pycache__", ".pytest_cache", ".mypy_cache", ".ruff_cache"}
+
+# Copied bytes (not counting copy-on-write clones) above this make the
+# project too large to sandbox
+MAX_COPY_BYTES = 512 * 2 ** 20
+
+PRIVILEGED = {"sudo", "doas", "su", "pkexec"}
+
+# Programs whose effects are outside the project whatever their arguments
+SYSTEM_PROGRAMS = {
+    "apt", "apt-get", "dpkg", "dnf", "yum", "rpm", "pacman", "brew", "port", "snap",
+    "systemctl", "service", "launchctl", "kill", "pkill", "killall", "reboot", "shutdown",
+    "mount", "umount", "crontab", "docker", "podman", "ssh", "scp", "ldconfig",
+    "update-alternatives", "useradd", "usermod", "passwd", "chsh", "gem",
+    # Install into an environment the sandbox does not copy
+    "conda", "mamba", "micromamba", "pipx",
+}
+
+# uv subcommands that manage an interpreter's packages rather than the project's
+UV_GLOBAL = {"pip", "tool", "python"}
+
+# Variables naming an active environment outside the project; sandboxes unset them
+ENVIRONMENT_VARS = ("VIRTUAL_ENV", "CONDA_PREFIX", "CONDA_DEFAULT_ENV", "PYTHONHOME", "PYTHONUSERBASE")
+
+# Special files any command may name
+HARMLESS_PATHS = {"/dev/null", "/dev/stdout", "/dev/stderr", "/dev/stdin", "/dev/tty"}
+
+
+class SandboxError(Exception):
+    """The project cannot be sandboxed"""
+
+
+def _outside_path(arg: str, cwd: str) -> Optional[str]:
+    """The path in an argument if it leads out of the project directory"""
+    value = arg.split("=", 1)[1] if arg.startswith("-") and "=" in arg else arg
+    if value in HARMLESS_PATHS:
+        return None
+    if value.startswith("/"):
+        return value
+    if ".." in Path(value).parts:
+        if os.path.normpath(os.path.join(cwd, value)).startswith(".."):
+            return value
+    return None
+
+
+def local_violation(command: str, cwd: str = ".") -> Optional[str]:
+    """
+    Why a command may change something outside the project directory, or
+    None if all it touches is the project and $HOME (which sandboxes
+    replace). `cwd` is the command's directory relative to the project
+    root. Conservative: anything unrecognized that names an absolute path
+    counts as outside.
+    """
+    try:
+        words = shlex.split(command, comments=True)
+        pipelines = parse_command(command)
+    except ValueError:
+        return "cannot be parsed"
+    if PRIVILEGED & set(words):
+        return "needs elevated privileges"
+
+    for pipeline in pipelines:
+        for cmd in pipeline:
+            program, args = cmd.program, cmd.argv[1:]
+            if program in SYSTEM_PROGRAMS:
+                return f"{program} changes the system"
+            if (program in SHELLS and any(a.startswith("-") and "c" in a for a in args)) or program == "eval":
+                return "runs a nested script"
+            if program.startswith("python") and args[:1] == ["-m"] and args[1:2] == ["pip"]:
+                program, args = "pip", args[2:]
+            if program in ("pip", "pip3") and args[:1] in (["install"], ["uninstall"]):
+                return "pip installs into the interpreter's site-packages"
+            if program == "uv" and args[:1] and args[0] in UV_GLOBAL:
+                return f"uv {args[0]} changes packages outside the project"
+            if program in ("npm", "yarn", "pnpm") and (
+                {"-g", "--global", "global", "link"} & set(args)
+            ):
+                return f"{program} changes global packages"
+            if program == "git" and (args[:1] == ["push"] or {"--global", "--system"} & set(args)):
+                return "git changes a remote or global config"
+            for arg in args + [target for _, target in cmd.redirects]:
+                outside = _outside_path(arg, cwd)
+                if outside:
+                    return f"refers to {outside}"
+            if program == "cd" and args:
+                cwd = os.path.normpath(os.path.join(cwd, args[0]))
+    return None
+
+
+def strategy_violation(commands: List[str], cwd: str = ".") -> Optional[str]:
+    """First reason a strategy's commands may reach outside the project"""
+    if not any(c.strip() and not c.strip().startswith("#") for c in commands):
+        return "has no commands"
+    for command in commands:
+        reason = local_violation(command, cwd)
+        if reason:
+            return f"{command}: {reason}"
+    return None
+
+
+class Sandbox:
+    """
+    A throwaway copy of a project with a HOME of its own. Every file is
+    copied, as a copy-on-write clone where the filesystem supports it, so
+    nothing done in the sandbox can reach the project's own files; symlinks
+    into the project are re-pointed at the copy. Delete with `close()`, or
+    use as a context manager.
+
+        with Sandbox(root) as box:
+            subprocess.run(cmd, shell=True, cwd=box.cwd_for(os.getcwd()), env=box.environ())
+    """
+
+    def __init__(self, root: str, base_dir: Optional[str] = DEFAULT_TRIAL_DIR, max_copy_bytes: int = MAX_COPY_BYTES):
+        self.root = Path(root).resolve()
+        self.base_dir = Path(base_dir).expanduser() if base_dir else None
+        self.max_copy_bytes = max_copy_bytes
+        self.path: Optional[Path] = None
+        self.copied_bytes = 0
+        self.cloned_files = 0
+
+    @property
+    def tree(self) -> Path:
+        return self.path / "project"
+
+    @property
+    def home(self) -> Path:
+        return self.path / "home"
+
+    def create(self) -> "Sandbox":
+        if self.base_dir:
+            # Next to the user's other data, so clones usually stay on one filesystem
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.path = Path(tempfile.mkdtemp(prefix="trial-", dir=self.base_dir))
+        try:
+            for name in ("home", "tmp", "home/.cache", "home/.config", "home/.local/share"):
+                (self.path / name).mkdir(parents=True, exist_ok=True)
+            self._copy_dir(self.root, self.tree)
+        except:
+            self.close()
+            raise
+        return self
+
+    def _copy_dir(self, src: Path, dst: Path):
+        dst.mkdir()
+        shutil.copystat(src, dst)
+        for entry in os.scandir(src):
+            source, target = Path(entry.path), dst / entry.name
+            if entry.is_symlink():
+                self._copy_link(source, target)
+            elif entry.is_dir():
+                if entry.name not in SKIP_DIRS:
+                    self._copy_dir(source, target)
+            elif entry.is_file():
+                self._copy_file(source, target)
+
+    def _copy_link(self, source: Path, target: Path):
+        destination = os.readlink(source)
+        if os.path.isabs(destination):
+            try:
+                inside = Path(destination).relative_to(self.root)
+                destination = str(self.tree / inside)
+            except ValueError:
+                pass  # Outside the project; left pointing where it did
+        os.symlink(destination, target)
+
+    def _copy_file(self, source: Path, target: Path):
+        if self._clone(source, target):
+            self.cloned_files += 1
+            return
+        self.copied_bytes += source.stat().st_size
+        if self.copied_bytes > self.max_copy_bytes:
+            raise SandboxError(
+                f"{self.root} is too large to sandbox (over {self.max_copy_bytes // 2 ** 20} MB to copy)"
+            )
+        shutil.copy2(source, target)
+
+    @staticmethod
+    def _clone(source: Path, target: Path) -> bool:
+        """Copy-on-write clone; False (and nothing left behind) where unsupported"""
+        if fcntl is None:
+            return False
+        try:
+            with open(source, "rb") as src, open(target, "wb") as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source, target)
+            return True
+        except OSError:
+            try:
+                target.unlink()
+            except OSError:
+                pass
+            return False
+
+    def cwd_for(self, cwd: str) -> Path:
+        """The sandbox directory matching `cwd` in the real project"""
+        try:
+            return self.tree / Path(cwd).resolve().relative_to(self.root)
+        except ValueError:
+            return self.tree
+
+    def environ(self) -> Dict[str, Optional[str]]:
+        """
+        Environment overrides pointing HOME, XDG dirs and TMPDIR into the
+        sandbox. Active virtualenv/conda variables are unset (None) and their
+        bin directories dropped from PATH, so installs cannot land in them.
+        """
+        home = str(self.home)
+        outside = [os.environ[name] for name in ENVIRONMENT_VARS if os.environ.get(name)]
+        path = [
+            entry for entry in os.environ.get("PATH", "").split(os.pathsep)
+            if not any(entry.startswith(prefix.rstrip("/") + "/") for prefix in outside)
+        ]
+        return {
+            **{name: None for name in ENVIRONMENT_VARS},
+            "PATH": os.pathsep.join(path),
+            "HOME": home,
+            "XDG_CACHE_HOME": os.path.join(home, ".cache"),
+            "XDG_CONFIG_HOME": os.path.join(home, ".config"),
+            "XDG_DATA_HOME": os.path.join(home, ".local", "share"),
+            "TMPDIR": str(self.path / "tmp"),
+        }
+
+    def close(self):
+        """Delete the sandbox"""
+        if self.path:
+            shutil.rmtree(self.path, ignore_errors=True)
+            self.path = None
+
+    def __enter__(self) -> "Sandbox":
+        return self.create()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,95 @@
+# ============================================================================
+# FILE: src/core/search_backends.py
+# Pluggable web search backends for documentation search
+# ============================================================================
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import requests
+
+# Environment overrides (see .env.example)
+BACKEND_ENV = "TERMINAL_HERO_SEARCH_BACKEND"
+ENDPOINT_ENV = "TERMINAL_HERO_SEARCH_ENDPOINT"
+
+
+class SearchBackend(ABC):
+    """
+    A web search provider. Results use the DuckDuckGo field names:
+    ``{"href": ..., "title": ..., "body": ...}``.
+    Implementations must be safe to call from several threads at once.
+    """
+
+    name = "web"
+
+    @abstractmethod
+    def search(self, query: str, max_results: int = 3) -> List[Dict]:
+        """Run one query; raise on transport errors so they are not cached"""
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """DuckDuckGo via duckduckgo_search, imported and constructed on first use"""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _client(self):
+        """DDGS client for the calling thread"""
+        if not hasattr(self._local, "ddgs"):
+            from duckduckgo_search import DDGS
+
+            self._local.ddgs = DDGS()
+        return self._local.ddgs
+
+    def search(self, query: str, max_results: int = 3) -> List[Dict]:
+        return list(self._client().text(query, max_results=max_results) or [])
+
+
+class HTTPSearchBackend(SearchBackend):
+    """
+    Any endpoint answering ``GET <endpoint>?q=<query>&max_results=<n>`` with a
+    JSON list of results (or ``{"results": [...]}``), e.g. a SearxNG bridge or
+    the stand-in server in search_stub.py.
+    """
+
+    def __init__(self, endpoint: str, timeout: float = 10.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.name = f"http:{endpoint}"
+
+    def search(self, query: str, max_results: int = 3) -> List[Dict]:
+        response = requests.get(
+            self.endpoint,
+            params={"q": query, "max_results": max_results},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        data = response.json()
+        if isinstance(data, dict):
+            data = data.get("results", [])
+        return [
+            {
+                "href": r.get("href") or r.get("url", ""),
+                "title": r.get("title", ""),
+                "body": r.get("body") or r.get("snippet", ""),
+            }
+            for r in data[:max_results]
+        ]
+
+
+def create_backend(name: Optional[str] = None, endpoint: Optional[str] = None) -> SearchBackend:
+    """Backend from arguments or the environment; an endpoint alone implies "http" """
+    endpoint = endpoint or os.getenv(ENDPOINT_ENV)
+    name = (name or os.getenv(BACKEND_ENV) or ("http" if endpoint else "duckduckgo")).lower()
+
+    if name == "http":
+        if not endpoint:
+            raise ValueError(f"The http search backend needs {ENDPOINT_ENV}")
+        return HTTPSearchBackend(endpoint)
+    if name == "duckduckgo":
+        return DuckDuckGoBackend()
+    raise ValueError(f"Unknown search backend: {name}")
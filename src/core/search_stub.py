@@ -0,0 +1,137 @@
+# ============================================================================
+# FILE: src/core/search_stub.py
+# Local stand-in search server with scripted results and injectable latency
+# ============================================================================
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubSearchServer:
+    """
+    Serves the HTTPSearchBackend protocol from a script, for deterministic
+    tests and offline load tests of the research stage.
+
+    The script is a list of rules tried in order. Each rule has a ``match``
+    regex (searched case-insensitively in the query), ``results``, and
+    optionally ``latency`` (seconds) or ``status`` (an HTTP error code).
+    Queries matching no rule get ``default`` results. Every request is
+    recorded in ``requests``.
+
+        with StubSearchServer(script, latency=0.2) as server:
+            backend = HTTPSearchBackend(server.endpoint)
+    """
+
+    def __init__(
+        self,
+        script: Optional[List[Dict]] = None,
+        default: Optional[List[Dict]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.script = [
+            dict(rule, _regex=re.compile(rule.get("match", ""), re.IGNORECASE))
+            for rule in script or []
+        ]
+        self.default = default or []
+        self.latency = latency
+        self.jitter = jitter
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def _respond(self, query: str, max_results: int) -> tuple:
+        """(status, delay, results) for a query"""
+        for rule in self.script:
+            if rule["_regex"].search(query):
+                delay = rule.get("latency", self.latency)
+                return rule.get("status", 200), delay, rule.get("results", [])[:max_results]
+        return 200, self.latency, self.default[:max_results]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlsplit(self.path).query)
+                query = params.get("q", [""])[0]
+                max_results = int(params.get("max_results", ["10"])[0])
+                status, delay, results = stub._respond(query, max_results)
+                with stub._lock:
+                    stub.requests.append({"query": query, "time": time.time()})
+
+                time.sleep(max(0.0, delay + random.uniform(-stub.jitter, stub.jitter)))
+                body = json.dumps(results if status == 200 else {"error": status}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep test and benchmark output clean
+
+        return Handler
+
+    def start(self) -> "StubSearchServer":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubSearchServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scripted stand-in for the doc search backend")
+    parser.add_argument("--script", help="JSON file: list of {match, results, latency, status} rules")
+    parser.add_argument("--latency", type=float, default=0.0, help="Default response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random +/- delay in seconds")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    script = []
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    default = [
+        {"href": "https://example.com/stub", "title": "Stub result", "body": "Scripted by search_stub"}
+    ]
+
+    server = StubSearchServer(
+        script, default=default, latency=args.latency, jitter=args.jitter, port=args.port
+    )
+    print(f"Serving on {server.endpoint} (set TERMINAL_HERO_SEARCH_ENDPOINT to use it)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
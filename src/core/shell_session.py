@@ -0,0 +1,183 @@
+# ============================================================================
+# FILE: src/core/shell_session.py
+# Long-lived bash process that runs a strategy's commands in one environment
+# ============================================================================
+
+import itertools
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+from .limits import ResourceLimits, kill_group, popen_group
+
+# Lines buffered between a pipe reader and the consumer; a full queue makes
+# the command wait rather than letting fast output pile up in memory
+LINE_QUEUE_SIZE = 1000
+
+
+def child_env(overrides: Optional[Dict[str, Optional[str]]]) -> Dict[str, str]:
+    """This process's environment with `overrides` applied; a None value unsets the variable"""
+    env = dict(os.environ, **(overrides or {}))
+    return {name: value for name, value in env.items() if value is not None}
+
+
+def pump_lines(pipe, stream: str, lines: "queue.Queue", abandoned: threading.Event):
+    """Copy a pipe into `lines` as (stream, line), then (stream, None) at EOF"""
+    items = ((stream, line.rstrip("\n")) for line in pipe)
+    for item in itertools.chain(items, [(stream, None)]):
+        while True:
+            try:
+                lines.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                if abandoned.is_set():
+                    return  # Nobody will read this queue again
+
+
+class ShellSession:
+    """
+    One bash process fed commands over stdin, so `cd`, `export` and
+    `source venv/bin/activate` in one step carry over to the next, and a
+    strategy costs one fork instead of one per command.
+
+    Each command is eval'd (a syntax error fails the step, not the session)
+    with stdin from /dev/null, then a sentinel carrying `$?` is written to
+    stdout and a bare sentinel to stderr; reading up to both sentinels
+    delimits the command's output.
+
+        with ShellSession() as shell:
+            shell.run("cd /tmp && export X=1")
+            code = shell.run("echo $X in $PWD", on_output=print)
+    """
+
+    def __init__(
+        self,
+        shell: Optional[str] = None,
+        cwd: Optional[str] = None,
+        limits: Optional[ResourceLimits] = None,
+        env: Optional[Dict[str, Optional[str]]] = None
+    ):
+        self.shell = shell or shutil.which("bash")
+        if not self.shell:
+            raise FileNotFoundError("bash is required for a shell session")
+        self.cwd = cwd
+        self.limits = limits
+        self.env = env or {}  # Overrides on top of this process's environment (None unsets)
+        self.sentinel = f"__TERMINAL_HERO_{uuid.uuid4().hex}__"
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue" = queue.Queue(LINE_QUEUE_SIZE)
+        self._abandoned = threading.Event()
+
+    @staticmethod
+    def available() -> bool:
+        return shutil.which("bash") is not None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> "ShellSession":
+        """Start bash without profile or rc files, in its own process group"""
+        self._process = popen_group(
+            [self.shell, "--noprofile", "--norc"],
+            limits=self.limits,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            cwd=self.cwd,
+            env=child_env(dict(self.env, PS1="", PS2=""))
+        )
+        for pipe, stream in ((self._process.stdout, "stdout"), (self._process.stderr, "stderr")):
+            threading.Thread(
+                target=pump_lines, args=(pipe, stream, self._lines, self._abandoned), daemon=True
+            ).start()
+        return self
+
+    def run(
+        self,
+        command: str,
+        on_output: Optional[Callable[[str, str], None]] = None,
+        timeout: Optional[float] = None
+    ) -> Optional[int]:
+        """
+        Run one command in the session. Lines go to `on_output(stream, line)`.
+        Returns the exit code, or None on timeout (the session's whole process
+        group is then killed, since a non-interactive bash cannot abandon a
+        running command).
+        """
+        if not self.alive:
+            self.start()
+
+        script = (
+            f"eval {shlex.quote(command)} < /dev/null\n"
+            f"printf '%s %d\\n' {self.sentinel} $?\n"
+            f"printf '%s\\n' {self.sentinel} >&2\n"
+        )
+        self._process.stdin.write(script)
+        self._process.stdin.flush()
+
+        deadline = time.monotonic() + timeout if timeout else None
+        returncode = None
+        pending = {"stdout", "stderr"}
+        while pending:
+            remaining = deadline - time.monotonic() if deadline else 0.1
+            if remaining <= 0:
+                self.close(force=True)
+                return None
+            try:
+                stream, line = self._lines.get(timeout=min(remaining, 0.1))
+            except queue.Empty:
+                continue
+
+            if line is None:
+                # The command ended the shell (exit, exec, fatal signal)
+                pending.discard(stream)
+                if not pending:
+                    return self._process.wait()
+                continue
+
+            marker = line.find(self.sentinel)
+            if marker >= 0:
+                # Output without a trailing newline shares the sentinel's line
+                if marker > 0 and on_output:
+                    on_output(stream, line[:marker])
+                if stream == "stdout":
+                    returncode = int(line[marker + len(self.sentinel):].strip() or 0)
+                pending.discard(stream)
+            elif on_output:
+                on_output(stream, line)
+
+        return returncode
+
+    def close(self, force: bool = False):
+        """End the session, killing its process group if bash does not exit promptly"""
+        if self._process is None:
+            return
+        try:
+            if not force and self.alive:
+                self._process.stdin.write("exit\n")
+                self._process.stdin.flush()
+                self._process.wait(timeout=2)
+        except:
+            pass
+        if force or self._process.poll() is None:
+            kill_group(self._process)
+        self._process = None
+        self._abandoned.set()
+        self._lines = queue.Queue(LINE_QUEUE_SIZE)
+        self._abandoned = threading.Event()
+
+    def __enter__(self) -> "ShellSession":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
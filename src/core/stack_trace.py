@@ -0,0 +1,453 @@
+# ============================================================================
+# FILE: src/core/stack_trace.py
+# Stack-trace parsers for Python, Node, Rust, Go and Java
+# ============================================================================
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+# Huge outputs are cut to their head and tail before parsing
+MAX_TRACE_INPUT = 256 * 1024
+MAX_FRAMES = 200
+CONTEXT_LINES = 5
+
+
+@dataclass
+class StackFrame:
+    """One frame of a stack trace"""
+    file: str
+    line: Optional[int] = None
+    function: Optional[str] = None
+    code: Optional[str] = None
+    user: bool = True  # False for stdlib, runtime and third-party frames
+
+    def location(self) -> str:
+        """file:line in function"""
+        text = f"{self.file}:{self.line}" if self.line is not None else self.file
+        if self.function:
+            text += f" in {self.function}"
+        return text
+
+
+@dataclass
+class ParsedTrace:
+    """Structured view of a stack trace"""
+    language: str
+    exception_type: str
+    message: str = ""
+    frames: List[StackFrame] = field(default_factory=list)  # Innermost first
+    causes: List["ParsedTrace"] = field(default_factory=list)  # Root cause first
+    context: List[str] = field(default_factory=list)  # Output just before the trace
+
+    @property
+    def user_frame(self) -> Optional[StackFrame]:
+        """Innermost frame in the user's own code (or the innermost frame)"""
+        for frame in self.frames:
+            if frame.user:
+                return frame
+        return self.frames[0] if self.frames else None
+
+    @property
+    def root(self) -> "ParsedTrace":
+        """The exception everything else follows from"""
+        return self.causes[0] if self.causes else self
+
+    def headline(self, limit: int = 200) -> str:
+        """Type: message"""
+        text = f"{self.exception_type}: {self.message}" if self.message else self.exception_type
+        return text if len(text) <= limit else text[:limit] + "..."
+
+    def _step(self) -> str:
+        frame = self.user_frame
+        return f"{self.headline()} (at {frame.location()})" if frame else self.headline()
+
+    def causality_chain(self) -> List[str]:
+        """Steps from the root cause to the visible error"""
+        return [cause._step() for cause in self.causes] + [self._step()]
+
+    def summary(self, max_frames: int = 5) -> str:
+        """Compact text replacing the raw frames in prompts"""
+        lines = [f"{self.language.title()} error: {self.headline()}"]
+        frame = self.user_frame
+        if frame:
+            lines.append(f"Innermost user frame: {frame.location()}")
+            if frame.code:
+                lines.append(f"    {frame.code}")
+        if self.causes:
+            lines.append("Chained causes (root first):")
+            lines.extend(f"- {cause._step()}" for cause in self.causes)
+        if self.frames:
+            lines.append("Frames (innermost first):")
+            lines.extend(f"  {f.location()}" for f in self.frames[:max_frames])
+            if len(self.frames) > max_frames:
+                lines.append(f"  ... {len(self.frames) - max_frames} more frames")
+        if self.context:
+            lines.append("Output before the trace:")
+            lines.extend(f"  {line}" for line in self.context)
+        return "\n".join(lines)
+
+
+# ----------------------------------------------------------------------
+# Python
+# ----------------------------------------------------------------------
+
+_PY_HEADER = "Traceback (most recent call last):"
+_PY_CHAIN_MARKERS = (
+    "The above exception was the direct cause of the following exception:",
+    "During handling of the above exception, another exception occurred:",
+)
+_PY_FRAME_RE = re.compile(r'^\s*File "(?P<file>[^"]+)", line (?P<line>\d+)(?:, in (?P<func>.+))?$')
+_PY_EXC_RE = re.compile(r"^(?P<type>[A-Za-z_][\w.]*)(?::\s?(?P<msg>.*))?$")
+_PY_LIBRARY_RE = re.compile(r"site-packages|dist-packages|[\\/]lib[\\/]python\d|^<|[\\/]Lib[\\/]")
+
+
+def _parse_python(lines: List[str]) -> Optional[ParsedTrace]:
+    """Python tracebacks, following `raise ... from` and implicit chaining"""
+    traces: List[ParsedTrace] = []
+    starts: List[int] = []
+    chained: List[bool] = []  # Whether each trace was chained to the previous one
+    pending_chain = False
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.strip() in _PY_CHAIN_MARKERS:
+            pending_chain = True
+        elif line.startswith(_PY_HEADER) or line.strip() == _PY_HEADER:
+            start = i
+            frames: List[StackFrame] = []
+            i += 1
+            exc = None
+            while i < len(lines):
+                text = lines[i]
+                frame_match = _PY_FRAME_RE.match(text)
+                if frame_match:
+                    path = frame_match.group("file")
+                    frames.append(StackFrame(
+                        file=path,
+                        line=int(frame_match.group("line")),
+                        function=frame_match.group("func"),
+                        user=not _PY_LIBRARY_RE.search(path),
+                    ))
+                elif text.startswith((" ", "\t")) or not text.strip():
+                    code = text.strip()
+                    # Source line under a frame (not caret/tilde markers)
+                    if frames and frames[-1].code is None and code and not set(code) <= set("^~ "):
+                        frames[-1].code = code
+                else:
+                    exc = _PY_EXC_RE.match(text.strip())
+                    break
+                i += 1
+            if exc:
+                frames.reverse()
+                traces.append(ParsedTrace(
+                    language="python",
+                    exception_type=exc.group("type"),
+                    message=(exc.group("msg") or "").strip(),
+                    frames=frames[:MAX_FRAMES],
+                ))
+                starts.append(start)
+                chained.append(pending_chain)
+            pending_chain = False
+        i += 1
+
+    if not traces:
+        return None
+    # Walk back through the chain that ends in the last traceback
+    main = traces[-1]
+    index = len(traces) - 1
+    while index > 0 and chained[index]:
+        index -= 1
+    main.causes = traces[index:-1]
+    main.context = _context(lines, starts[index])
+    return main
+
+
+# ----------------------------------------------------------------------
+# Node / V8
+# ----------------------------------------------------------------------
+
+_NODE_FRAME_RE = re.compile(
+    r"^\s+at (?:(?P<func>[^()]+?) \()?(?P<file>[^\s()]+?):(?P<line>\d+):\d+\)?(?: \{)?$"
+)
+_NODE_EXC_RE = re.compile(
+    r"^\s*(?P<cause>\[cause\]: )?(?:Uncaught )?(?P<type>[A-Z]\w*(?:Error|Exception)|Error)"
+    r"(?: \[(?P<code>[A-Z0-9_]+)\])?(?::\s?(?P<msg>.*))?$"
+)
+
+
+def _is_node_user(path: str) -> bool:
+    return not (path.startswith(("node:", "internal/")) or "node_modules" in path)
+
+
+def _parse_node(lines: List[str]) -> Optional[ParsedTrace]:
+    """V8 stacks, including Error.cause ([cause]: ...) chains"""
+    traces: List[ParsedTrace] = []
+    start_line = None
+    i = 0
+    while i < len(lines):
+        if not _NODE_FRAME_RE.match(lines[i]):
+            i += 1
+            continue
+        # Header is the nearest preceding exception line (messages may wrap)
+        header = None
+        for back in range(i - 1, max(i - 20, -1), -1):
+            header = _NODE_EXC_RE.match(lines[back])
+            if header:
+                if start_line is None:
+                    start_line = back
+                break
+        frames: List[StackFrame] = []
+        while i < len(lines):
+            frame_match = _NODE_FRAME_RE.match(lines[i])
+            if not frame_match:
+                break
+            if len(frames) < MAX_FRAMES:
+                path = frame_match.group("file")
+                frames.append(StackFrame(
+                    file=path,
+                    line=int(frame_match.group("line")),
+                    function=frame_match.group("func"),
+                    user=_is_node_user(path),
+                ))
+            i += 1
+        if header:
+            exception_type = header.group("type")
+            if header.group("code"):
+                exception_type += f" [{header.group('code')}]"
+            traces.append(ParsedTrace(
+                language="node",
+                exception_type=exception_type,
+                message=(header.group("msg") or "").strip(),
+                frames=frames,
+            ))
+    if not traces:
+        return None
+    # Printed outermost first, each [cause] nested under the previous one
+    main = traces[0]
+    main.causes = list(reversed(traces[1:]))
+    main.context = _context(lines, start_line)
+    return main
+
+
+# ----------------------------------------------------------------------
+# Rust
+# ----------------------------------------------------------------------
+
+_RUST_PANIC_NEW_RE = re.compile(r"^thread '(?P<thread>[^']*)' panicked at (?P<file>[^\s:]+):(?P<line>\d+):\d+:$")
+_RUST_PANIC_OLD_RE = re.compile(
+    r"^thread '(?P<thread>[^']*)' panicked at '(?P<msg>.*)', (?P<file>[^\s:]+):(?P<line>\d+):\d+$"
+)
+_RUST_FRAME_RE = re.compile(r"^\s+\d+: (?P<func>\S.*)$")
+_RUST_AT_RE = re.compile(r"^\s+at (?P<file>.+?):(?P<line>\d+):\d+$")
+_RUST_LIBRARY_FUNCS = ("std::", "core::", "alloc::", "rust_begin_unwind", "__rust", "<")
+
+
+def _parse_rust(lines: List[str]) -> Optional[ParsedTrace]:
+    """Rust panics with an optional RUST_BACKTRACE backtrace"""
+    for index, line in enumerate(lines):
+        new = _RUST_PANIC_NEW_RE.match(line)
+        old = None if new else _RUST_PANIC_OLD_RE.match(line)
+        if new or old:
+            break
+    else:
+        return None
+
+    match = new or old
+    if new:
+        message = lines[index + 1].strip() if index + 1 < len(lines) else ""
+    else:
+        message = old.group("msg")
+    location = match.group("file")
+    frames = [StackFrame(file=location, line=int(match.group("line")))]
+
+    i = index + 1
+    while i < len(lines) and len(frames) < MAX_FRAMES:
+        frame_match = _RUST_FRAME_RE.match(lines[i])
+        if frame_match:
+            func = frame_match.group("func").strip()
+            at = _RUST_AT_RE.match(lines[i + 1]) if i + 1 < len(lines) else None
+            path = at.group("file") if at else ""
+            if at:
+                i += 1
+            user = bool(at) and "/rustc/" not in path and ".cargo/registry" not in path \
+                and not func.startswith(_RUST_LIBRARY_FUNCS)
+            if user and frames[0].function is None and path.endswith(location.lstrip("./")):
+                frames[0].function = func  # Backtrace frame for the panic location
+            elif path:
+                frames.append(StackFrame(file=path, line=int(at.group("line")), function=func, user=user))
+        i += 1
+
+    return ParsedTrace(
+        language="rust",
+        exception_type="panic",
+        message=message,
+        frames=frames,
+        context=_context(lines, index),
+    )
+
+
+# ----------------------------------------------------------------------
+# Go
+# ----------------------------------------------------------------------
+
+_GO_PANIC_RE = re.compile(r"^\s*(?P<kind>panic|fatal error): (?P<msg>.*?)(?: \[recovered\])?$")
+_GO_GOROUTINE_RE = re.compile(r"^goroutine \d+ \[.*\]:$")
+_GO_FILE_RE = re.compile(r"^\s+(?P<file>\S+\.(?:go|s)):(?P<line>\d+)(?: \+0x[0-9a-f]+)?$")
+_GO_ARGS_RE = re.compile(r"\([^()]*\)$")
+_GO_LIBRARY_FUNCS = ("runtime.", "panic(", "testing.", "reflect.", "sync.")
+
+
+def _go_exception(kind: str, message: str) -> ParsedTrace:
+    if kind == "panic" and message.startswith("runtime error: "):
+        return ParsedTrace(language="go", exception_type="runtime error", message=message[15:])
+    return ParsedTrace(language="go", exception_type=kind, message=message)
+
+
+def _parse_go(lines: List[str]) -> Optional[ParsedTrace]:
+    """Go panics and fatal errors with the panicking goroutine's frames"""
+    panics: List[ParsedTrace] = []
+    start_line = None
+    i = 0
+    while i < len(lines):
+        panic = _GO_PANIC_RE.match(lines[i])
+        if panic:
+            if start_line is None:
+                start_line = i
+            panics.append(_go_exception(panic.group("kind"), panic.group("msg")))
+        elif panics and _GO_GOROUTINE_RE.match(lines[i]):
+            break
+        i += 1
+    if not panics:
+        return None
+
+    frames: List[StackFrame] = []
+    i += 1
+    while i + 1 < len(lines) and len(frames) < MAX_FRAMES:
+        file_match = _GO_FILE_RE.match(lines[i + 1])
+        if not file_match:
+            break
+        func = lines[i].strip()
+        if func.startswith("created by "):
+            func = func[11:].split(" in goroutine")[0]
+        func = _GO_ARGS_RE.sub("", func)
+        path = file_match.group("file")
+        frames.append(StackFrame(
+            file=path,
+            line=int(file_match.group("line")),
+            function=func,
+            user=not func.startswith(_GO_LIBRARY_FUNCS) and "/pkg/mod/" not in path,
+        ))
+        i += 2
+
+    # A recovered panic followed by a new one: the earlier panic is the cause
+    main = panics[-1]
+    main.frames = frames
+    main.causes = panics[:-1]
+    main.context = _context(lines, start_line)
+    return main
+
+
+# ----------------------------------------------------------------------
+# Java / JVM
+# ----------------------------------------------------------------------
+
+_JAVA_EXC_RE = re.compile(
+    r"^(?P<prefix>Exception in thread \"[^\"]*\" |Caused by: |\s*Suppressed: )?"
+    r"(?P<type>[A-Za-z_$][\w$]*(?:\.[\w$]+)+)(?::\s?(?P<msg>.*))?$"
+)
+_JAVA_FRAME_RE = re.compile(r"^\s+at (?:[\w.$@/-]+/)?(?P<func>[\w$.<>]+)\((?P<loc>[^)]*)\)$")
+_JAVA_LOC_RE = re.compile(r"^(?P<file>[^:]+):(?P<line>\d+)$")
+_JAVA_LIBRARY_PREFIXES = (
+    "java.", "javax.", "jdk.", "sun.", "com.sun.", "kotlin.", "scala.",
+    "org.junit.", "org.springframework.", "org.apache.", "org.gradle.",
+)
+
+
+def _parse_java(lines: List[str]) -> Optional[ParsedTrace]:
+    """JVM exceptions with their Caused by: chain"""
+    traces: List[ParsedTrace] = []
+    start_line = None
+    current: Optional[ParsedTrace] = None
+    suppressed = False
+    for index, line in enumerate(lines):
+        frame_match = _JAVA_FRAME_RE.match(line)
+        if frame_match:
+            if current is not None and not suppressed and len(current.frames) < MAX_FRAMES:
+                func = frame_match.group("func")
+                loc = _JAVA_LOC_RE.match(frame_match.group("loc"))
+                current.frames.append(StackFrame(
+                    file=loc.group("file") if loc else frame_match.group("loc"),
+                    line=int(loc.group("line")) if loc else None,
+                    function=func,
+                    user=bool(loc) and not func.startswith(_JAVA_LIBRARY_PREFIXES),
+                ))
+            continue
+        if line.strip().startswith("... ") and line.strip().endswith(" more"):
+            continue
+        header = _JAVA_EXC_RE.match(line.rstrip())
+        # A header only counts when frames follow it
+        if header and index + 1 < len(lines) and _JAVA_FRAME_RE.match(lines[index + 1]):
+            prefix = (header.group("prefix") or "").strip()
+            suppressed = prefix == "Suppressed:"
+            if suppressed:
+                continue
+            if prefix != "Caused by:" and traces:
+                break  # A second, unrelated exception
+            current = ParsedTrace(
+                language="java",
+                exception_type=header.group("type"),
+                message=(header.group("msg") or "").strip(),
+            )
+            if start_line is None:
+                start_line = index
+            traces.append(current)
+    if not traces:
+        return None
+    main = traces[0]
+    main.causes = list(reversed(traces[1:]))
+    main.context = _context(lines, start_line)
+    return main
+
+
+# ----------------------------------------------------------------------
+# Dispatch
+# ----------------------------------------------------------------------
+
+def _context(lines: List[str], start: Optional[int]) -> List[str]:
+    """Non-empty lines just before a trace"""
+    if not start:
+        return []
+    before = [line.strip() for line in lines[max(0, start - CONTEXT_LINES * 2):start] if line.strip()]
+    return before[-CONTEXT_LINES:]
+
+
+# (marker, parser): a parser only runs when its marker is in the text
+_PARSERS: List[tuple] = [
+    ("Traceback (most recent call last)", _parse_python),
+    ("\tat ", _parse_java),
+    ("    at ", _parse_java),
+    ("    at ", _parse_node),
+    ("panicked at", _parse_rust),
+    ("goroutine ", _parse_go),
+    ("fatal error: ", _parse_go),
+]
+
+
+def parse_stack_trace(text: str) -> Optional[ParsedTrace]:
+    """Parse the first recognised stack trace in command output"""
+    if len(text) > MAX_TRACE_INPUT:
+        half = MAX_TRACE_INPUT // 2
+        text = text[:half] + "\n" + text[-half:]
+    lines = None
+    tried: List[Callable] = []
+    for marker, parser in _PARSERS:
+        if marker not in text or parser in tried:
+            continue
+        tried.append(parser)
+        if lines is None:
+            lines = text.splitlines()
+        trace = parser(lines)
+        if trace:
+            return trace
+    return None
@@ -0,0 +1,414 @@
+# ============================================================================
+# FILE: src/core/strategy_rules.py
+# Deterministic solution strategies for well-understood errors
+# ============================================================================
+
+import json
+import os
+import shlex
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..graph.state import ErrorAnalysis, SolutionStrategy, SystemInfo
+from .pattern_engine import PatternMatch
+from .pattern_packs import derive_params
+from .preflight import PreflightChecker
+
+# System package providing a command, where it differs from the command name
+# (per package manager; "*" applies to all of them)
+COMMAND_PACKAGES = {
+    "python": {"*": "python3", "brew": "python"},
+    "python3": {"*": "python3", "brew": "python"},
+    "pip": {"apt": "python3-pip", "dnf": "python3-pip", "yum": "python3-pip", "pacman": "python-pip"},
+    "pip3": {"apt": "python3-pip", "dnf": "python3-pip", "yum": "python3-pip", "pacman": "python-pip"},
+    "node": {"apt": "nodejs", "dnf": "nodejs", "yum": "nodejs", "pacman": "nodejs", "brew": "node"},
+    "gcc": {"apt": "build-essential"},
+    "g++": {"apt": "build-essential", "dnf": "gcc-c++", "yum": "gcc-c++", "pacman": "gcc", "brew": "gcc"},
+    "make": {"apt": "build-essential"},
+    "docker": {"apt": "docker.io", "pacman": "docker", "brew": "docker"},
+    "java": {"apt": "default-jre", "dnf": "java-latest-openjdk", "pacman": "jre-openjdk", "brew": "openjdk"},
+    "javac": {"apt": "default-jdk", "dnf": "java-latest-openjdk-devel", "pacman": "jdk-openjdk", "brew": "openjdk"},
+    "cargo": {"apt": "cargo", "pacman": "rust", "brew": "rust"},
+    "rustc": {"apt": "rustc", "pacman": "rust", "brew": "rust"},
+    "go": {"apt": "golang-go", "dnf": "golang", "yum": "golang", "brew": "go"},
+    "rg": {"*": "ripgrep"},
+    "fd": {"apt": "fd-find", "*": "fd"},
+    "ifconfig": {"*": "net-tools"},
+    "netstat": {"*": "net-tools"},
+    "fuser": {"*": "psmisc"},
+    "pg_config": {"apt": "libpq-dev", "dnf": "libpq-devel", "brew": "libpq"},
+}
+
+# Commands that are Python or Node tools rather than system packages
+PIP_COMMANDS = {
+    "black": "black", "flake8": "flake8", "pytest": "pytest", "mypy": "mypy",
+    "ruff": "ruff", "isort": "isort", "pylint": "pylint", "poetry": "poetry",
+    "pipenv": "pipenv", "virtualenv": "virtualenv", "tox": "tox", "nox": "nox",
+    "ipython": "ipython", "jupyter": "jupyter", "uvicorn": "uvicorn",
+    "gunicorn": "gunicorn", "flask": "flask", "django-admin": "django",
+    "twine": "twine", "pre-commit": "pre-commit",
+}
+NPM_COMMANDS = {
+    "tsc": "typescript", "ts-node": "ts-node", "yarn": "yarn", "pnpm": "pnpm",
+    "eslint": "eslint", "prettier": "prettier", "nodemon": "nodemon",
+    "vite": "vite", "ng": "@angular/cli", "vue": "@vue/cli", "nest": "@nestjs/cli",
+}
+
+# Install/remove command templates per system package manager
+SYSTEM_INSTALLERS = {
+    "apt": (["sudo apt-get update", "sudo apt-get install -y {package}"], ["sudo apt-get remove -y {package}"]),
+    "dnf": (["sudo dnf install -y {package}"], ["sudo dnf remove -y {package}"]),
+    "yum": (["sudo yum install -y {package}"], ["sudo yum remove -y {package}"]),
+    "pacman": (["sudo pacman -S --noconfirm {package}"], ["sudo pacman -R --noconfirm {package}"]),
+    "brew": (["brew install {package}"], ["brew uninstall {package}"]),
+}
+
+# Node lockfiles and the package manager that owns them
+NODE_LOCKFILES = (
+    ("pnpm-lock.yaml", "pnpm", "pnpm add {package}", "pnpm remove {package}"),
+    ("yarn.lock", "yarn", "yarn add {package}", "yarn remove {package}"),
+)
+
+
+class StrategyRules:
+    """
+    Builds concrete, runnable strategies from the detected error type and its
+    captured parameters (package, module, command, port, file) for the
+    package managers present on this system, with matching rollbacks.
+    Returns nothing for errors it does not understand, leaving those to the LLM.
+    """
+
+    def __init__(
+        self,
+        error_analysis: ErrorAnalysis,
+        system_info: Optional[SystemInfo] = None,
+        matches: Optional[List[PatternMatch]] = None,
+        resolution: Optional[Dict] = None,
+        project_context: Optional[Dict] = None
+    ):
+        self.analysis = error_analysis
+        self.package_managers = system_info.package_managers if system_info else []
+        self.env_vars = system_info.env_vars if system_info else {}
+        self.config_files = [Path(p) for p in (project_context or {}).get("config_files", [])]
+        self.resolution = resolution or {}
+        self._preflight: Optional[PreflightChecker] = None
+
+        # Parameters from the best match first; later matches only fill gaps
+        self.error_types = [m.name for m in matches or []]
+        params: Dict[str, str] = {}
+        for match in matches or []:
+            for key, value in derive_params(match.groups).items():
+                params.setdefault(key, value)
+        self.params = params
+
+    def build(self) -> List[SolutionStrategy]:
+        """Strategies for the error, most appropriate first"""
+        builders = [
+            self._python_dependency,
+            self._node_dependency,
+            self._missing_system_package,
+            self._missing_command,
+            self._permission,
+            self._port_in_use,
+            self._disk_space,
+        ]
+        for builder in builders:
+            strategies = builder()
+            if strategies:
+                return strategies
+        return []
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _has(self, tool: str) -> bool:
+        return tool in self.package_managers or shutil.which(tool) is not None
+
+    def _pip(self) -> Optional[str]:
+        """pip invocation bound to the active virtualenv's interpreter, else the default one"""
+        venv = self.env_vars.get("VIRTUAL_ENV") or os.environ.get("VIRTUAL_ENV")
+        if venv:
+            for python in (Path(venv) / "bin" / "python", Path(venv) / "Scripts" / "python.exe"):
+                if python.exists():
+                    return f"{shlex.quote(str(python))} -m pip"
+        if shutil.which("python3"):
+            return "python3 -m pip"
+        if self._has("pip"):
+            return "pip"
+        return None
+
+    def _installed(self, ecosystem: str, package: str) -> bool:
+        """Whether a package is already installed (python, node or a system package manager)"""
+        if self.resolution.get("ecosystem") == ecosystem and self.resolution.get("package") == package:
+            return bool(self.resolution.get("installed"))
+        if self._preflight is None:
+            self._preflight = PreflightChecker()
+        return self._preflight.installed_version(ecosystem, package) is not None
+
+    def _rollback(self, ecosystem: str, package: str, rollback: List[str]) -> List[str]:
+        """Removal as rollback only for a package the fix adds; never remove what the user had"""
+        return [] if self._installed(ecosystem, package) else rollback
+
+    def _pip_rollback(self, pip: str, package: str) -> List[str]:
+        return self._rollback("python", package, [f"{pip} uninstall -y {shlex.quote(package)}"])
+
+    @staticmethod
+    def _declared(manifest: Path, package: str) -> bool:
+        """Whether package.json lists the package in any dependency section"""
+        try:
+            data = json.loads(manifest.read_text())
+        except (OSError, ValueError):
+            return False
+        sections = ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies")
+        return any(isinstance(data.get(s), dict) and package in data[s] for s in sections)
+
+    def _config_file(self, name: str) -> Optional[Path]:
+        """Nearest project manifest with this filename"""
+        return next((p for p in self.config_files if p.name == name), None)
+
+    @staticmethod
+    def _strategy(name: str, description: str, commands: List[str], rollback: List[str], **fields) -> SolutionStrategy:
+        fields.setdefault("risk_level", "low")
+        fields.setdefault("estimated_time", "1 minute")
+        fields.setdefault("confidence", 0.85)
+        return SolutionStrategy(
+            name=name,
+            description=description,
+            commands=commands,
+            rollback_commands=rollback,
+            **fields
+        )
+
+    def _system_install(self, package: str, reason: str) -> List[SolutionStrategy]:
+        """Install a system package with each available package manager"""
+        strategies = []
+        for manager, (install, remove) in SYSTEM_INSTALLERS.items():
+            if not self._has(manager):
+                continue
+            mapping = COMMAND_PACKAGES.get(package, {})
+            name = mapping.get(manager) or mapping.get("*") or package
+            quoted = shlex.quote(name)
+            strategies.append(self._strategy(
+                f"Install {name} ({manager})",
+                f"{reason}; install the {name} package with {manager}",
+                [cmd.format(package=quoted) for cmd in install],
+                self._rollback(manager, name, [cmd.format(package=quoted) for cmd in remove]),
+                risk_level="medium",
+                estimated_time="2 minutes",
+                confidence=0.75,
+                prerequisites=["sudo access"] if manager != "brew" else [],
+                side_effects=[f"Installs {name} system-wide"]
+            ))
+        return strategies
+
+    # ------------------------------------------------------------------
+    # Rules
+    # ------------------------------------------------------------------
+
+    def _python_dependency(self) -> List[SolutionStrategy]:
+        """Missing Python module: install its distribution into the active interpreter"""
+        if self.resolution.get("ecosystem") == "python":
+            if self.resolution.get("local"):
+                return []  # A project module, not something to install
+            if self.resolution.get("installed"):
+                return []  # Installing again would not help; a wrong interpreter or version is for the LLM
+            package = self.resolution["package"]
+        elif self.params.get("module"):
+            package = self.params["package"]
+        else:
+            return []
+        pip = self._pip()
+        if not pip:
+            return []
+        # A distribution name guessed from the import name may be an unrelated project
+        guessed = not self.resolution.get("known")
+
+        quoted = shlex.quote(package)
+        in_venv = bool(self.env_vars.get("VIRTUAL_ENV") or self.env_vars.get("CONDA_DEFAULT_ENV"))
+        strategies = [self._strategy(
+            f"Install {package}",
+            f"Install the {package} distribution that provides the missing module"
+            + (" into the active environment" if in_venv else "")
+            + (f" (assumed from the import name; check that {package} is the right project)" if guessed else ""),
+            [f"{pip} install {quoted}"],
+            self._pip_rollback(pip, package),
+            confidence=0.5 if guessed else 0.9,
+            prerequisites=[] if in_venv else ["Write access to the Python installation"]
+        )]
+        if not in_venv:
+            strategies.append(self._strategy(
+                f"Install {package} for this user",
+                "Install into the user site-packages, without touching the system Python",
+                [f"{pip} install --user {quoted}"],
+                self._pip_rollback(pip, package),
+                confidence=0.45 if guessed else 0.8
+            ))
+        requirements = self._config_file("requirements.txt")
+        if requirements:
+            strategies.append(self._strategy(
+                "Install project requirements",
+                f"Install everything listed in {requirements}",
+                [f"{pip} install -r {shlex.quote(str(requirements))}"],
+                [],
+                estimated_time="3 minutes",
+                confidence=0.7,
+                side_effects=["May upgrade or downgrade other installed packages"]
+            ))
+        return strategies
+
+    def _node_dependency(self) -> List[SolutionStrategy]:
+        """Missing Node module: add it with the project's package manager"""
+        if self.resolution.get("ecosystem") == "node":
+            package = self.resolution["package"]
+        elif self.params.get("node_module"):
+            package = self.params["node_package"]
+        else:
+            return []
+
+        install, remove = "npm install {package}", "npm uninstall {package}"
+        manifest = self._config_file("package.json")
+        if manifest:
+            for lockfile, tool, add, rm in NODE_LOCKFILES:
+                if (manifest.parent / lockfile).exists() and self._has(tool):
+                    install, remove = add, rm
+                    break
+        if not self._has(install.split()[0]):
+            return []
+
+        quoted = shlex.quote(package)
+        present = (manifest and self._declared(manifest, package)) or self._installed("node", package)
+        strategies = [self._strategy(
+            f"Install {package}",
+            f"Add {package} to the project dependencies",
+            [install.format(package=quoted)],
+            [] if present else [remove.format(package=quoted)],
+            confidence=0.9
+        )]
+        if manifest and install.startswith("npm"):
+            strategies.append(self._strategy(
+                "Install project dependencies",
+                f"Install everything declared in {manifest}",
+                [f"npm install --prefix {shlex.quote(str(manifest.parent))}"],
+                [],
+                estimated_time="3 minutes",
+                confidence=0.7,
+                side_effects=["Creates or updates node_modules and package-lock.json"]
+            ))
+        return strategies
+
+    def _missing_system_package(self) -> List[SolutionStrategy]:
+        """apt could not locate a package: refresh the package lists and retry"""
+        package = self.params.get("package")
+        if "package_not_found" not in self.error_types or not package or not self._has("apt"):
+            return []
+        install, remove = SYSTEM_INSTALLERS["apt"]
+        quoted = shlex.quote(package)
+        return [self._strategy(
+            f"Refresh package lists and install {package}",
+            "The package index is stale or missing; update it before installing",
+            [cmd.format(package=quoted) for cmd in install],
+            self._rollback("apt", package, [cmd.format(package=quoted) for cmd in remove]),
+            risk_level="medium",
+            estimated_time="2 minutes",
+            confidence=0.7,
+            prerequisites=["sudo access"],
+            side_effects=[f"Installs {package} system-wide"]
+        )]
+
+    def _missing_command(self) -> List[SolutionStrategy]:
+        """Command not found: install the tool that provides it"""
+        command = self.params.get("command")
+        if self.analysis.error_category != "not_found" or not command:
+            return []
+
+        strategies = []
+        quoted = shlex.quote(command)
+        pip = self._pip()
+        if command in PIP_COMMANDS and pip:
+            package = shlex.quote(PIP_COMMANDS[command])
+            strategies.append(self._strategy(
+                f"Install {PIP_COMMANDS[command]} with pip",
+                f"{command} is a Python tool; install it for this user",
+                [f"{pip} install --user {package}"],
+                self._pip_rollback(pip, PIP_COMMANDS[command]),
+                confidence=0.85,
+                side_effects=["~/.local/bin must be on PATH"]
+            ))
+        if command in NPM_COMMANDS and self._has("npm"):
+            package = shlex.quote(NPM_COMMANDS[command])
+            strategies.append(self._strategy(
+                f"Install {NPM_COMMANDS[command]} with npm",
+                f"{command} is a Node tool; install it globally",
+                [f"npm install -g {package}"],
+                [f"npm uninstall -g {package}"],
+                confidence=0.85,
+                prerequisites=["Write access to the global npm prefix"]
+            ))
+        strategies.extend(self._system_install(command, f"{quoted} is not installed"))
+        return strategies
+
+    def _permission(self) -> List[SolutionStrategy]:
+        """Script not executable: add the execute bit"""
+        path = self.params.get("file")
+        if self.analysis.error_category != "permission" or not path:
+            return []
+        quoted = shlex.quote(path)
+        return [self._strategy(
+            f"Make {path} executable",
+            f"Add the execute permission to {path}",
+            [f"chmod +x {quoted}"],
+            [f"chmod -x {quoted}"],
+            estimated_time="10 seconds",
+            confidence=0.9
+        )]
+
+    def _port_in_use(self) -> List[SolutionStrategy]:
+        """Port already bound: stop whatever is listening on it"""
+        port = self.params.get("port")
+        if not port or not port.isdigit():
+            return []
+        if self._has("fuser"):
+            commands = [f"fuser -k {port}/tcp"]
+        elif self._has("lsof"):
+            commands = [f"lsof -ti tcp:{port} | xargs -r kill"]
+        else:
+            return []
+        return [self._strategy(
+            f"Free port {port}",
+            f"Stop the process currently listening on port {port}",
+            commands,
+            [],
+            risk_level="medium",
+            estimated_time="10 seconds",
+            confidence=0.8,
+            side_effects=[f"Terminates the process bound to port {port}; restart it by hand if it was needed"]
+        )]
+
+    def _disk_space(self) -> List[SolutionStrategy]:
+        """Disk full: drop package manager caches, which are safe to re-download"""
+        if "disk_space" not in self.error_types:
+            return []
+        commands = []
+        pip = self._pip()
+        if pip:
+            commands.append(f"{pip} cache purge")
+        if self._has("npm"):
+            commands.append("npm cache clean --force")
+        if self._has("apt"):
+            commands.append("sudo apt-get clean")
+        if self._has("brew"):
+            commands.append("brew cleanup")
+        if not commands:
+            return []
+        return [self._strategy(
+            "Clear package caches",
+            "Free space by removing cached downloads from the package managers",
+            commands,
+            [],
+            risk_level="low",
+            estimated_time="1 minute",
+            confidence=0.6,
+            side_effects=["Later installs download packages again"]
+        )]
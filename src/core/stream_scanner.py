@@ -0,0 +1,156 @@
+# ============================================================================
+# FILE: src/core/stream_scanner.py
+# Chunked, bounded-memory pattern scanning for large command output
+# ============================================================================
+
+from typing import Dict, Iterable, List, Tuple
+from .pattern_engine import MAX_POSITIONS, PatternEngine, PatternMatch
+
+EARLY_EXIT_SEVERITIES = ("high", "critical")
+
+
+class StreamScanner:
+    """
+    Feeds stdout/stderr through a PatternEngine in fixed-size windows.
+
+    Lines longer than `max_line_length` keep only their head and tail, and
+    each window is prefixed with the last `overlap` characters of the
+    previous one so matches spanning a window boundary are still seen.
+    Memory stays around `chunk_size + max_line_length` however large the
+    input is. Positions are offsets into that line-capped stream.
+    """
+
+    def __init__(
+        self,
+        engine: PatternEngine,
+        chunk_size: int = 64 * 1024,
+        overlap: int = 256,
+        max_line_length: int = 4096,
+        stop_early: bool = True,
+    ):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.overlap = overlap
+        self.max_line_length = max_line_length
+        self.stop_early = stop_early
+        self.done = False
+
+        self._partial_head = ""   # Start of the current unfinished line
+        self._partial_tail = ""   # Rolling end of it once the head is full
+        self._pending: List[str] = []
+        self._pending_len = 0
+        self._carry = ""
+        self._offset = 0          # Stream offset of the start of the carry
+        self._found: Dict[str, PatternMatch] = {}
+        self._seen: set = set()
+
+    def _cap_line(self, line: str) -> str:
+        """Keep the head and tail of an overlong line"""
+        if len(line) <= self.max_line_length:
+            return line
+        half = self.max_line_length // 2
+        return line[:half] + " ... " + line[-half:]
+
+    def feed(self, data: str) -> bool:
+        """Consume a chunk; returns True once an early-exit hit has been found"""
+        if self.done:
+            return True
+
+        lines = data.split("\n")
+        for line in lines[:-1]:
+            self._push_line(self._finish_partial(line))
+            if self.done:
+                return True
+        self._extend_partial(lines[-1])
+        return self.done
+
+    def _extend_partial(self, text: str):
+        """Grow the unfinished line without letting it exceed the cap"""
+        half = self.max_line_length // 2
+        if len(self._partial_head) < half:
+            room = half - len(self._partial_head)
+            self._partial_head += text[:room]
+            text = text[room:]
+        if text:
+            self._partial_tail = (self._partial_tail + text)[-half:]
+
+    def _finish_partial(self, end: str) -> str:
+        """Complete the unfinished line with `end` and reset it"""
+        self._extend_partial(end)
+        if self._partial_tail:
+            line = self._partial_head + " ... " + self._partial_tail
+        else:
+            line = self._partial_head
+        self._partial_head = self._partial_tail = ""
+        return self._cap_line(line)
+
+    def _push_line(self, line: str):
+        """Queue a complete line; scan once a full window is pending"""
+        self._pending.append(line + "\n")
+        self._pending_len += len(line) + 1
+        if self._pending_len >= self.chunk_size:
+            self._scan_pending()
+
+    def _scan_pending(self):
+        """Scan carry + pending lines and merge new hits"""
+        if not self._pending:
+            return
+        window = self._carry + "".join(self._pending)
+        base = self._offset
+        self._pending = []
+        self._pending_len = 0
+
+        for match in self.engine.scan(window):
+            self._merge(match, base)
+
+        self._carry = window[-self.overlap:] if self.overlap else ""
+        self._offset = base + len(window) - len(self._carry)
+        # Only matches starting in the carry can be seen again
+        self._seen = {key for key in self._seen if key[1] >= self._offset}
+
+    def _merge(self, match: PatternMatch, base: int):
+        """Fold a window match into the stream results, skipping overlap repeats"""
+        new_positions: List[Tuple[int, int]] = []
+        for start, end in match.positions:
+            key = (match.name, base + start)
+            if key not in self._seen:
+                self._seen.add(key)
+                new_positions.append((base + start, base + end))
+        if not new_positions:
+            return
+
+        existing = self._found.get(match.name)
+        if existing is None:
+            match.positions = new_positions
+            self._found[match.name] = match
+        else:
+            existing.score = max(existing.score, match.score)
+            room = MAX_POSITIONS - len(existing.positions)
+            existing.positions.extend(new_positions[:max(room, 0)])
+            for key, value in match.groups.items():
+                existing.groups.setdefault(key, value)
+
+        if self.stop_early and match.severity in EARLY_EXIT_SEVERITIES:
+            self.done = True
+
+    def close(self) -> List[PatternMatch]:
+        """Flush buffered input and return all matches, best first"""
+        if not self.done:
+            if self._partial_head or self._partial_tail:
+                self._pending.append(self._finish_partial(""))
+            self._scan_pending()
+        return self.engine.rank(self._found.values())
+
+    @classmethod
+    def scan_stream(
+        cls,
+        engine: PatternEngine,
+        chunks: Iterable[str],
+        **kwargs
+    ) -> List[PatternMatch]:
+        """Scan an iterable of text chunks (e.g. a file opened in text mode)"""
+        scanner = cls(engine, **kwargs)
+        for chunk in chunks:
+            if scanner.feed(chunk):
+                break
+        return scanner.close()
@@ -3,8 +3,12 @@
 # System detection utilities
 # ============================================================================
 
+import glob
+import json
 import platform
+import site
 import subprocess
+import sysconfig
 import os
 import shutil
 from typing import List, Dict, Optional
@@ -92,6 +96,54 @@ class SystemDetector:
             if os.environ.get(var)
         }
     
+    @classmethod
+    def get_site_packages(cls) -> List[str]:
+        """Get site-packages directories of the active interpreter or virtualenv"""
+        venv = cls.get_relevant_env_vars().get("VIRTUAL_ENV")
+        if venv:
+            candidates = glob.glob(os.path.join(venv, "lib", "python*", "site-packages"))
+            candidates.append(os.path.join(venv, "Lib", "site-packages"))
+        else:
+            paths = sysconfig.get_paths()
+            candidates = [paths.get("purelib", ""), paths.get("platlib", "")]
+            try:
+                candidates.extend(site.getsitepackages())
+                candidates.append(site.getusersitepackages())
+            except AttributeError:
+                pass  # Older virtualenv builds lack these
+
+        dirs = []
+        for candidate in candidates:
+            if candidate and os.path.isdir(candidate) and candidate not in dirs:
+                dirs.append(candidate)
+        return dirs
+    
+    @staticmethod
+    def get_site_packages_for(python: str) -> Optional[List[str]]:
+        """Site-packages directories of another interpreter, or None if it cannot be asked"""
+        script = (
+            "import json, site, sysconfig; p = sysconfig.get_paths(); "
+            "d = [p.get('purelib'), p.get('platlib')]; "
+            "d += getattr(site, 'getsitepackages', lambda: [])(); "
+            "d += [site.getusersitepackages()] if site.ENABLE_USER_SITE else []; "
+            "print(json.dumps(d))"
+        )
+        try:
+            result = subprocess.run(
+                [python, "-c", script], capture_output=True, text=True, timeout=10
+            )
+            if result.returncode != 0:
+                return None
+            candidates = json.loads(result.stdout)
+        except (OSError, ValueError, subprocess.SubprocessError):
+            return None
+        
+        dirs = []
+        for candidate in candidates:
+            if candidate and os.path.isdir(candidate) and candidate not in dirs:
+                dirs.append(candidate)
+        return dirs
+
     @classmethod
     def collect_all(cls) -> SystemInfo:
         """Collect all system information"""
@@ -11,6 +11,9 @@ A sophisticated multi-agent system for resolving terminal issues
 from typing import TypedDict, List, Dict, Optional, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime
+from ..core.pattern_engine import PatternMatch
+from ..core.fingerprint import ErrorFingerprint
+from ..core.stack_trace import ParsedTrace
 
 class SystemInfo(BaseModel):
     """System information collected by Context Collector Agent"""
@@ -32,6 +35,8 @@ class ErrorAnalysis(BaseModel):
     affected_components: List[str] = Field(default_factory=list)
     causality_chain: List[str] = Field(default_factory=list)
     confidence: float = Field(ge=0.0, le=1.0)
+    # What produced the labels: llm, classifier, index (package metadata) or fallback
+    source: str = "llm"
 
 class DocumentationResult(BaseModel):
     """Documentation search results"""
@@ -52,6 +57,20 @@ class SolutionStrategy(BaseModel):
     prerequisites: List[str] = Field(default_factory=list)
     side_effects: List[str] = Field(default_factory=list)
     rollback_commands: List[str] = Field(default_factory=list)
+    preflight_issues: List[str] = Field(default_factory=list)
+    # Per command, indices of earlier commands it needs; empty means inferred
+    depends_on: List[List[int]] = Field(default_factory=list)
+    # Seconds per command for this strategy, and overrides by command index
+    timeout: Optional[float] = None
+    command_timeouts: Dict[int, float] = Field(default_factory=dict)
+
+class CommandResult(BaseModel):
+    """Outcome of one command in an execution"""
+    command: str
+    status: Literal["ok", "failed", "timed_out", "skipped", "satisfied"]
+    exit_code: Optional[int] = None
+    duration: float = 0.0
+    detail: Optional[str] = None  # Why a "satisfied" step was not run
 
 class ExecutionResult(BaseModel):
     """Result of command execution"""
@@ -59,7 +78,30 @@ class ExecutionResult(BaseModel):
     commands_executed: List[str]
     output: str
     error: Optional[str] = None
+    command_results: List[CommandResult] = Field(default_factory=list)
+    # Full output, gzip-compressed, when it outgrew the in-memory tail
+    output_file: Optional[str] = None
+    output_lines: int = 0
+    # Known error patterns seen in the streamed output, best first
+    error_patterns: List[str] = Field(default_factory=list)
     timestamp: datetime = Field(default_factory=datetime.now)
+    
+    @property
+    def satisfied(self) -> List[CommandResult]:
+        """Steps skipped because their postcondition already held"""
+        return [r for r in self.command_results if r.status == "satisfied"]
+
+class TrialResult(BaseModel):
+    """Outcome of trying one strategy in a throwaway sandbox"""
+    strategy: str
+    eligible: bool
+    fixed: bool = False
+    reason: Optional[str] = None  # Why it was not tried, or did not fix the command
+    setup_time: float = 0.0       # Seconds to build the sandbox
+    strategy_time: float = 0.0    # Seconds running the strategy's commands
+    recheck_time: float = 0.0     # Seconds re-running the failing command
+    recheck_exit_code: Optional[int] = None
+    recheck_output: str = ""      # Tail of the failing command's output
 
 class AgentState(TypedDict):
     """Shared state passed between agents in the workflow"""
@@ -72,7 +114,11 @@ class AgentState(TypedDict):
     project_context: Optional[Dict[str, any]]
     
     # Analysis
+    pattern_matches: List[PatternMatch]
+    error_fingerprint: Optional[ErrorFingerprint]
+    stack_trace: Optional[ParsedTrace]
     error_analysis: Optional[ErrorAnalysis]
+    dependency_resolution: Optional[Dict[str, any]]
     
     # Research
     documentation_results: List[DocumentationResult]
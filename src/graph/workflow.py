@@ -4,13 +4,15 @@
 # ============================================================================
 
 from langgraph.graph import StateGraph, END
-from typing import Dict
-from .state import AgentState
+from typing import Dict, List, Optional
+from .state import AgentState, ErrorAnalysis
+from ..core.pattern_engine import PatternMatch
 from ..agents.orchestrator import OrchestratorAgent
 from ..agents.context_collector import ContextCollectorAgent
 from ..agents.error_analyzer import ErrorAnalyzerAgent
 from ..agents.doc_search import DocumentationSearchAgent
 from ..agents.solution_architect import SolutionArchitectAgent
+from ..agents.preflight import PreflightAgent
 from ..agents.executor import ExecutorAgent
 
 class TerminalHeroWorkflow:
@@ -23,6 +25,7 @@ class TerminalHeroWorkflow:
         self.error_analyzer = ErrorAnalyzerAgent()
         self.doc_search = DocumentationSearchAgent()
         self.solution_architect = SolutionArchitectAgent()
+        self.preflight = PreflightAgent()
         self.executor = ExecutorAgent()
         
         # Build workflow graph
@@ -40,6 +43,7 @@ class TerminalHeroWorkflow:
         workflow.add_node("analyze_error", self.error_analyzer.process)
         workflow.add_node("search_docs", self.doc_search.process)
         workflow.add_node("generate_solutions", self.solution_architect.process)
+        workflow.add_node("preflight", self.preflight.process)
         workflow.add_node("prepare_execution", self.executor.process)
         
         # Set entry point
@@ -50,7 +54,8 @@ class TerminalHeroWorkflow:
         workflow.add_edge("collect_context", "analyze_error")
         workflow.add_edge("analyze_error", "search_docs")
         workflow.add_edge("search_docs", "generate_solutions")
-        workflow.add_edge("generate_solutions", "prepare_execution")
+        workflow.add_edge("generate_solutions", "preflight")
+        workflow.add_edge("preflight", "prepare_execution")
         
         # Conditional edges from orchestrator
         workflow.add_conditional_edges(
@@ -74,8 +79,14 @@ class TerminalHeroWorkflow:
             return "end"
         return "continue"
     
-    def run(self, user_input: str, raw_error: str) -> AgentState:
-        """Execute the workflow"""
+    def run(
+        self,
+        user_input: str,
+        raw_error: str,
+        pattern_matches: Optional[List[PatternMatch]] = None,
+        error_analysis: Optional[ErrorAnalysis] = None
+    ) -> AgentState:
+        """Execute the workflow, reusing pattern matches or an analysis the caller already has"""
         
         # Initialize state
         initial_state: AgentState = {
@@ -83,7 +94,11 @@ class TerminalHeroWorkflow:
             "raw_error": raw_error,
             "system_info": None,
             "project_context": None,
-            "error_analysis": None,
+            "pattern_matches": pattern_matches or [],
+            "error_fingerprint": None,
+            "stack_trace": None,
+            "error_analysis": error_analysis,
+            "dependency_resolution": None,
             "documentation_results": [],
             "solution_strategies": [],
             "selected_strategy": None,
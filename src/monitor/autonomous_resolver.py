@@ -4,11 +4,12 @@
 # ============================================================================
 
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-import re
+from dataclasses import dataclass, field
 from enum import Enum
 
 from ..graph.state import ErrorAnalysis, SolutionStrategy
+from ..core.error_patterns import ErrorPatterns
+from ..core.pattern_engine import PatternMatch
 
 
 class InterventionLevel(Enum):
@@ -28,6 +29,7 @@ class InterventionDecision:
     confidence: float
     reason: str
     suggested_actions: List[str]
+    matches: List[PatternMatch] = field(default_factory=list)
 
 
 class AutonomousResolver:
@@ -41,61 +43,29 @@ class AutonomousResolver:
         self.success_patterns: Dict[str, float] = {}  # error_type -> success_rate
         self.learned_solutions: Dict[str, SolutionStrategy] = {}  # error_type -> best_solution
         
-        # Common error patterns and auto-fix rules
+        # Auto-fix rules keyed by the resolver type of ErrorPatterns entries
         self.auto_fixable_errors = {
             "command_not_found": {
-                "patterns": [
-                    r"command not found",
-                    r"No such file or directory",
-                    r"not found in",
-                ],
                 "risk_level": "low",
                 "intervention_level": InterventionLevel.AUTO_LOW_RISK,
             },
             "permission_denied": {
-                "patterns": [
-                    r"Permission denied",
-                    r"permission denied",
-                    r"Operation not permitted",
-                ],
                 "risk_level": "medium",
                 "intervention_level": InterventionLevel.SUGGEST,
             },
             "missing_dependency": {
-                "patterns": [
-                    r"ModuleNotFoundError",
-                    r"No module named",
-                    r"cannot find -l",
-                    r"pkg-config",
-                ],
                 "risk_level": "low",
                 "intervention_level": InterventionLevel.SUGGEST,
             },
             "port_already_in_use": {
-                "patterns": [
-                    r"Address already in use",
-                    r"port [0-9]+ is already in use",
-                    r"EADDRINUSE",
-                ],
                 "risk_level": "medium",
                 "intervention_level": InterventionLevel.SUGGEST,
             },
             "disk_space": {
-                "patterns": [
-                    r"No space left on device",
-                    r"disk full",
-                    r"out of space",
-                ],
                 "risk_level": "high",
                 "intervention_level": InterventionLevel.SUGGEST,
             },
             "network_error": {
-                "patterns": [
-                    r"Connection refused",
-                    r"Connection reset",
-                    r"Network unreachable",
-                    r"Temporary failure in name resolution",
-                ],
                 "risk_level": "low",
                 "intervention_level": InterventionLevel.SUGGEST,
             },
@@ -107,8 +77,9 @@ class AutonomousResolver:
         Returns a decision about how to handle the error.
         """
         
-        # Identify error type
-        error_type = self._identify_error_type(error_text)
+        # Identify error type (single scan shared with the analyzer)
+        matches = ErrorPatterns.scan(error_text)
+        error_type = matches[0].resolver_type if matches else None
         
         if error_type not in self.auto_fixable_errors:
             # Unknown error type
@@ -117,7 +88,10 @@ class AutonomousResolver:
                 intervention_level=InterventionLevel.SUGGEST,
                 confidence=0.5,
                 reason=f"Unknown error type: {error_type}",
-                suggested_actions=["Run 'terminal-hero diagnose' for analysis"]
+                suggested_actions=self._get_suggested_actions(
+                    error_type, command, matches[0] if matches else None
+                ),
+                matches=matches
             )
         
         error_config = self.auto_fixable_errors[error_type]
@@ -145,22 +119,16 @@ class AutonomousResolver:
             intervention_level=intervention_level,
             confidence=confidence,
             reason=f"Detected {error_type} error (confidence: {confidence:.0%})",
-            suggested_actions=self._get_suggested_actions(error_type, command)
+            suggested_actions=self._get_suggested_actions(error_type, command, matches[0]),
+            matches=matches
         )
     
-    def _identify_error_type(self, error_text: str) -> Optional[str]:
-        """Identify the type of error from error text"""
-        error_text_lower = error_text.lower()
-        
-        for error_type, config in self.auto_fixable_errors.items():
-            for pattern in config["patterns"]:
-                if re.search(pattern, error_text_lower, re.IGNORECASE):
-                    return error_type
-        
-        return None
-    
-    def _get_suggested_actions(self, error_type: str, command: str) -> List[str]:
-        """Get suggested actions for an error type"""
+    def _get_suggested_actions(self, error_type: str, command: str,
+                               match: Optional[PatternMatch] = None) -> List[str]:
+        """Get suggested actions for an error type, concrete fixes first"""
+        fixes = []
+        if match is not None:
+            fixes = [f"Run: {' && '.join(cmds)}" for cmds in ErrorPatterns.fixes_for(match)]
         
         suggestions: Dict[str, List[str]] = {
             "command_not_found": [
@@ -197,7 +165,7 @@ class AutonomousResolver:
             ],
         }
         
-        return suggestions.get(error_type, ["Run 'terminal-hero diagnose' for detailed analysis"])
+        return fixes + suggestions.get(error_type, ["Run 'terminal-hero diagnose' for detailed analysis"])
     
     def record_outcome(self, error_type: str, success: bool, solution: SolutionStrategy):
         """Record the outcome of an intervention"""
@@ -240,8 +208,12 @@ class AutonomousResolver:
         
         return False
     
-    def get_quick_fix(self, error_type: str) -> Optional[str]:
+    def get_quick_fix(self, error_type: str, match: Optional[PatternMatch] = None) -> Optional[str]:
         """Get a quick fix command for common errors"""
+        if match is not None:
+            fixes = ErrorPatterns.fixes_for(match)
+            if fixes:
+                return " && ".join(fixes[0])
         
         quick_fixes: Dict[str, str] = {
             "permission_denied": "chmod +x",
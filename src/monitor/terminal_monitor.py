@@ -20,6 +20,8 @@ from ..graph.workflow import TerminalHeroWorkflow
 from ..storage.history import CommandHistory
 from ..storage.memory import MemorySystem
 from .autonomous_resolver import AutonomousResolver, InterventionLevel
+from ..core.fingerprint import fingerprint_error
+from ..core.command_safety import CommandValidator
 
 
 @dataclass
@@ -48,16 +50,34 @@ class TerminalMonitor:
         self.history = CommandHistory()
         self.memory = MemorySystem()
         self.resolver = AutonomousResolver()
+        self.validator = CommandValidator()
         self.is_monitoring = False
         self.event_handlers: List[Callable[[CommandEvent], None]] = []
         self.auto_fix_enabled = True
         self.monitor_thread: Optional[threading.Thread] = None
         
+        # Identical failures within this window are reported once
+        self.dedupe_window = 60.0
+        self._recent_fingerprints: Dict[str, float] = {}
+        
+        # Failures waiting for analysis; up to batch_size of them share one
+        # LLM request once the oldest has waited batch_window seconds
+        self.batch_size = 8
+        self.batch_window = 1.0
+        self._pending: List[tuple] = []
+        self._in_flight: List[tuple] = []
+        
+        # On stop, queued failures get this long to be analyzed; the rest are
+        # saved and picked up by the next start
+        self.stop_deadline = 20.0
+        self._stop_at: Optional[float] = None
+        
         # Temp directory for command monitoring
         self.monitor_dir = Path(tempfile.gettempdir()) / "terminal_hero"
         self.monitor_dir.mkdir(exist_ok=True)
         self.command_log = self.monitor_dir / "commands.log"
         self.status_file = self.monitor_dir / "monitor_status.json"
+        self.pending_file = self.monitor_dir / "pending_events.json"
         
         # Load previous status
         self._load_status()
@@ -80,8 +100,13 @@ class TerminalMonitor:
             self.history.add_command(event.command, event.exit_code, event.stdout, event.stderr)
             return
         
-        # Error detected - get resolver's decision
+        # Error detected - skip repeats of a failure we just handled
         error_text = event.stderr or event.stdout
+        if self._is_duplicate(event.command, error_text):
+            self.history.add_command(event.command, event.exit_code, event.stdout, event.stderr)
+            return
+        
+        # Get resolver's decision
         decision = self.resolver.analyze_error(error_text, event.command)
         
         if not decision.should_intervene:
@@ -90,12 +115,9 @@ class TerminalMonitor:
         
         print(f"\n[Terminal Hero] 🔍 {decision.reason}", file=sys.stderr)
         
-        # Try to autonomously fix based on decision
+        # Queue for autonomous analysis and fixing based on decision
         if self.auto_fix_enabled and decision.intervention_level != InterventionLevel.SILENT:
-            try:
-                self._autonomous_fix(event, decision)
-            except Exception as e:
-                print(f"[Terminal Hero] Error during autonomous fix: {e}", file=sys.stderr)
+            self._pending.append((event, decision, time.time()))
         else:
             # Just suggest
             for action in decision.suggested_actions:
@@ -103,22 +125,104 @@ class TerminalMonitor:
         
         self.history.add_command(event.command, event.exit_code, event.stdout, event.stderr)
     
-    def _autonomous_fix(self, event: CommandEvent, decision):
-        """Autonomously analyze and attempt to fix the error"""
-        error_context = f"""
+    def _is_duplicate(self, command: str, error_text: str) -> bool:
+        """Whether the same normalized command and error were seen recently"""
+        key = fingerprint_error(error_text).key(fingerprint_error(command).fingerprint)
+        now = time.time()
+        
+        # Forget expired entries so the map stays small
+        self._recent_fingerprints = {
+            k: t for k, t in self._recent_fingerprints.items()
+            if now - t < self.dedupe_window
+        }
+        if key in self._recent_fingerprints:
+            return True
+        self._recent_fingerprints[key] = now
+        return False
+    
+    def _flush_pending(self, force: bool = False):
+        """Analyze queued failures, batching those that arrived together"""
+        while self._pending and not self._past_stop_deadline() and (
+            force
+            or len(self._pending) >= self.batch_size
+            or time.time() - self._pending[0][2] >= self.batch_window
+        ):
+            batch = self._pending[:self.batch_size]
+            self._pending = self._pending[self.batch_size:]
+            self._in_flight = list(batch)
+            
+            analyses = [None] * len(batch)
+            if len(batch) > 1:
+                print(f"[Terminal Hero] 🤖 Analyzing {len(batch)} queued errors together...", file=sys.stderr)
+                try:
+                    analyses = self.workflow.error_analyzer.analyze_batch(
+                        [self._error_context(event, decision) for event, decision, _ in batch]
+                    )
+                except Exception as e:
+                    print(f"[Terminal Hero] Batch analysis error: {e}", file=sys.stderr)
+            
+            for (event, decision, _), analysis in zip(batch, analyses):
+                if self._past_stop_deadline():
+                    break
+                try:
+                    self._autonomous_fix(event, decision, analysis)
+                except Exception as e:
+                    print(f"[Terminal Hero] Error during autonomous fix: {e}", file=sys.stderr)
+                self._in_flight.pop(0)
+            # Events left unanalyzed at the stop deadline go back to the queue
+            self._pending = self._in_flight + self._pending
+            self._in_flight = []
+    
+    def _past_stop_deadline(self) -> bool:
+        return self._stop_at is not None and time.time() >= self._stop_at
+    
+    def _save_pending(self) -> int:
+        """Write failures not yet analyzed to disk for the next start; returns how many"""
+        events = [event.to_dict() for event, _, _ in self._in_flight + self._pending]
+        if not events:
+            return 0
+        try:
+            with open(self.pending_file, "w") as f:
+                json.dump(events, f)
+        except OSError:
+            return 0
+        return len(events)
+    
+    def _restore_pending(self):
+        """Queue failures saved by the previous stop"""
+        try:
+            with open(self.pending_file) as f:
+                events = [CommandEvent(**data) for data in json.load(f)]
+            self.pending_file.unlink()
+        except (OSError, ValueError, TypeError):
+            return
+        for event in events:
+            decision = self.resolver.analyze_error(event.stderr or event.stdout, event.command)
+            if decision.should_intervene and decision.intervention_level != InterventionLevel.SILENT:
+                self._pending.append((event, decision, time.time()))
+    
+    @staticmethod
+    def _error_context(event: CommandEvent, decision) -> str:
+        """Error description handed to the workflow"""
+        return f"""
 Command: {event.command}
 Exit Code: {event.exit_code}
 Output: {event.stderr or event.stdout}
 Intervention Level: {decision.intervention_level.name}
 Confidence: {decision.confidence:.0%}
 """
-        
-        print(f"[Terminal Hero] 🤖 Autonomously analyzing...", file=sys.stderr)
+    
+    def _autonomous_fix(self, event: CommandEvent, decision, analysis=None):
+        """Autonomously analyze and attempt to fix the error"""
+        if analysis is None:
+            print(f"[Terminal Hero] 🤖 Autonomously analyzing...", file=sys.stderr)
         
         try:
             result = self.workflow.run(
                 user_input=event.command,
-                raw_error=error_context
+                raw_error=self._error_context(event, decision),
+                pattern_matches=decision.matches,
+                error_analysis=analysis
             )
             
             if result.get("error_analysis"):
@@ -126,7 +230,13 @@ Confidence: {decision.confidence:.0%}
                 print(f"[Terminal Hero] Root cause: {analysis.get('root_cause', 'Unknown')}", file=sys.stderr)
             
             if result.get("solution_strategies"):
-                strategies = result["solution_strategies"]
+                # Only candidates whose commands pass the safety rules are offered or run
+                strategies = [
+                    s for s in result["solution_strategies"]
+                    if self.validator.check(s.get("commands", []))[0]
+                ]
+                if len(strategies) < len(result["solution_strategies"]):
+                    print(f"[Terminal Hero] Rejected {len(result['solution_strategies']) - len(strategies)} unsafe fix(es)", file=sys.stderr)
                 if strategies:
                     best_strategy = strategies[0]
                     print(f"[Terminal Hero] 💡 Solution: {best_strategy.get('name', 'Unknown')}", file=sys.stderr)
@@ -314,7 +424,10 @@ fi
             return
         
         self.is_monitoring = True
+        self._stop_at = None
         self._save_status()
+        if self.auto_fix_enabled:
+            self._restore_pending()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
         print("[Terminal Hero] Monitor started")
@@ -322,9 +435,26 @@ fi
     def stop_daemon(self):
         """Stop the monitoring daemon"""
         self.is_monitoring = False
+        self._stop_at = time.time() + self.stop_deadline
         self._save_status()
         if self.monitor_thread:
-            self.monitor_thread.join(timeout=2)
+            try:
+                self.monitor_thread.join(timeout=2)
+                if self.monitor_thread.is_alive():
+                    # Mid-analysis: give queued errors until the deadline
+                    print(
+                        f"[Terminal Hero] Finishing analysis of queued errors "
+                        f"(up to {self.stop_deadline:.0f}s, Ctrl-C to skip)...",
+                        file=sys.stderr
+                    )
+                    self.monitor_thread.join(timeout=max(0.0, self._stop_at - time.time()))
+            except KeyboardInterrupt:
+                pass  # A second interrupt: stop waiting
+            if self.monitor_thread.is_alive():
+                self._stop_at = time.time()  # The thread abandons the queue after its current step
+            saved = self._save_pending()
+            if saved:
+                print(f"[Terminal Hero] Saved {saved} unanalyzed error(s) for the next start", file=sys.stderr)
         print("[Terminal Hero] Monitor stopped")
     
     def _monitor_loop(self):
@@ -348,10 +478,14 @@ fi
                             except json.JSONDecodeError:
                                 pass
                 
+                self._flush_pending()
                 time.sleep(0.5)
             except Exception as e:
                 print(f"Monitor error: {e}", file=sys.stderr)
                 time.sleep(1)
+        
+        # Do not drop failures queued just before stopping
+        self._flush_pending(force=True)
     
     def _save_status(self):
         """Save monitor status to file"""
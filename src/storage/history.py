@@ -5,8 +5,9 @@
 
 import json
 from pathlib import Path
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
+from .output_buffer import read_output
 
 class CommandHistory:
     """Tracks executed commands for undo functionality"""
@@ -35,9 +36,11 @@ class CommandHistory:
         self,
         commands: List[str],
         rollback_commands: List[str],
-        description: str
+        description: str,
+        output_file: Optional[str] = None,
+        output_lines: int = 0
     ):
-        """Add an execution to history"""
+        """Add an execution to history (large output by reference to its spill file)"""
         history = self._load_history()
         
         entry = {
@@ -45,7 +48,9 @@ class CommandHistory:
             "timestamp": datetime.now().isoformat(),
             "description": description,
             "commands": commands,
-            "rollback_commands": rollback_commands
+            "rollback_commands": rollback_commands,
+            "output_file": output_file,
+            "output_lines": output_lines
         }
         
         history.append(entry)
@@ -67,4 +72,11 @@ class CommandHistory:
     def list_recent(self, count: int = 10) -> List[Dict]:
         """List recent executions"""
         history = self._load_history()
-        return history[-count:] if history else []
\ No newline at end of file
+        return history[-count:] if history else []
+    
+    def read_output(self, entry: Dict, start: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+        """Lines of an execution's spilled output, read lazily; empty if none or deleted"""
+        path = entry.get("output_file")
+        if not path or not Path(path).exists():
+            return iter(())
+        return read_output(path, start, limit)
\ No newline at end of file
@@ -4,10 +4,13 @@
 # ============================================================================
 
 import json
+import hashlib
 import sqlite3
+import time
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
+from ..core.fingerprint import fingerprint_error
 
 class MemorySystem:
     """Stores error patterns and solutions for learning"""
@@ -34,6 +37,30 @@ class MemorySystem:
             )
         """)
         
+        # Older databases predate fingerprints
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(error_patterns)")]
+        if "fingerprint" not in columns:
+            cursor.execute("ALTER TABLE error_patterns ADD COLUMN fingerprint TEXT")
+        # ...and recording what labelled the error (ErrorAnalysis.source)
+        if "label_source" not in columns:
+            cursor.execute("ALTER TABLE error_patterns ADD COLUMN label_source TEXT")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_error_patterns_fingerprint
+            ON error_patterns (fingerprint)
+        """)
+        
+        # Generated strategies per error fingerprint and system context
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS strategy_cache (
+                cache_key TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                created REAL NOT NULL,
+                PRIMARY KEY (cache_key, position)
+            )
+        """)
+        
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS solution_success_rate (
                 solution_hash TEXT PRIMARY KEY,
@@ -52,20 +79,25 @@ class MemorySystem:
         error_category: str,
         raw_error: str,
         solution: str,
-        success: bool
+        success: bool,
+        fingerprint: Optional[str] = None,
+        label_source: Optional[str] = None
     ):
         """Record a solution attempt"""
+        if fingerprint is None:
+            fingerprint = fingerprint_error(raw_error).fingerprint
+        
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         # Record pattern
         cursor.execute("""
-            INSERT INTO error_patterns (error_type, error_category, raw_error, solution_used, success)
-            VALUES (?, ?, ?, ?, ?)
-        """, (error_type, error_category, raw_error[:500], solution, success))
+            INSERT INTO error_patterns (error_type, error_category, raw_error, solution_used, success, fingerprint, label_source)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (error_type, error_category, raw_error[:500], solution, success, fingerprint, label_source))
         
         # Update success rate
-        solution_hash = str(hash(solution))
+        solution_hash = self._solution_hash(solution)
         cursor.execute("""
             INSERT INTO solution_success_rate (solution_hash, total_attempts, successful_attempts, last_used)
             VALUES (?, 1, ?, CURRENT_TIMESTAMP)
@@ -105,9 +137,127 @@ class MemorySystem:
             for r in results
         ]
     
+    def get_cases_by_fingerprint(self, fingerprint: str, limit: int = 5) -> List[Dict]:
+        """Get past cases of the same normalized error"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT error_type, solution_used, SUM(success), COUNT(*) as occurrences
+            FROM error_patterns
+            WHERE fingerprint = ?
+            GROUP BY solution_used
+            ORDER BY occurrences DESC
+            LIMIT ?
+        """, (fingerprint, limit))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                "error_type": r[0],
+                "solution": r[1],
+                "successes": r[2],
+                "occurrences": r[3]
+            }
+            for r in results
+        ]
+    
+    def get_labelled_errors(self, after_id: int = 0, limit: int = 5000) -> List[Dict]:
+        """Get recorded errors with their labels, oldest first, for training"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, raw_error, error_type, error_category, label_source, success
+            FROM error_patterns
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, limit))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                "id": r[0],
+                "raw_error": r[1],
+                "error_type": r[2],
+                "error_category": r[3],
+                "label_source": r[4],
+                "success": bool(r[5])
+            }
+            for r in results
+        ]
+    
+    @staticmethod
+    def _solution_hash(solution: str) -> str:
+        """Stable key for a solution (hash() changes between processes)"""
+        return hashlib.sha1(solution.encode()).hexdigest()[:16]
+    
+    def get_solution_stats(self, solution: str, fingerprint: Optional[str] = None) -> Dict[str, int]:
+        """Recorded attempts and successes for a solution, only against `fingerprint`'s error if given"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        if fingerprint is None:
+            cursor.execute("""
+                SELECT total_attempts, successful_attempts
+                FROM solution_success_rate
+                WHERE solution_hash = ?
+            """, (self._solution_hash(solution),))
+        else:
+            cursor.execute("""
+                SELECT COUNT(*), COALESCE(SUM(success), 0)
+                FROM error_patterns
+                WHERE fingerprint = ? AND solution_used = ?
+            """, (fingerprint, solution))
+        
+        result = cursor.fetchone()
+        conn.close()
+        
+        total, successful = result if result else (0, 0)
+        return {"attempts": total, "successes": successful}
+    
+    def cache_strategies(self, cache_key: str, fingerprint: str, strategies: List[Dict]):
+        """Replace the cached strategies for a key"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        now = time.time()
+        cursor.execute("DELETE FROM strategy_cache WHERE cache_key = ?", (cache_key,))
+        cursor.executemany("""
+            INSERT INTO strategy_cache (cache_key, position, fingerprint, strategy, created)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (cache_key, i, fingerprint, json.dumps(strategy), now)
+            for i, strategy in enumerate(strategies)
+        ])
+        
+        conn.commit()
+        conn.close()
+    
+    def get_cached_strategies(self, cache_key: str, max_age: float = 30 * 24 * 3600) -> List[Dict]:
+        """Cached strategies for a key in generation order, empty if missing or stale"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT strategy FROM strategy_cache
+            WHERE cache_key = ? AND created > ?
+            ORDER BY position
+        """, (cache_key, time.time() - max_age))
+        
+        results = cursor.fetchall()
+        conn.close()
+        
+        return [json.loads(r[0]) for r in results]
+    
     def get_solution_confidence(self, solution: str) -> float:
         """Get confidence score for a solution based on history"""
-        solution_hash = str(hash(solution))
+        solution_hash = self._solution_hash(solution)
         
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
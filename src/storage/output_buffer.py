@@ -0,0 +1,120 @@
+# ============================================================================
+# FILE: src/storage/output_buffer.py
+# Bounded in-memory output capture that spills to a compressed file
+# ============================================================================
+
+import gzip
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+DEFAULT_SPILL_DIR = "~/.terminal_hero/output"
+
+
+class OutputBuffer:
+    """
+    Ring of the most recent output lines, capped at `max_bytes`.
+
+    Once the ring first overflows, or a line longer than MAX_LINE_BYTES
+    arrives (and `spill_dir` is set), every line, including those still in
+    the ring, is also written untruncated to a gzip file, so
+    the complete output can be read back later without holding it in
+    memory. Small outputs never touch the disk. Not thread-safe; callers
+    that write from several threads serialize access themselves.
+    """
+
+    # Longest line kept in memory; the spill file has it in full
+    MAX_LINE_BYTES = 4096
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024,
+        spill_dir: Optional[str] = DEFAULT_SPILL_DIR,
+        max_spill_files: int = 50
+    ):
+        self.max_bytes = max_bytes
+        self.spill_dir = Path(spill_dir).expanduser() if spill_dir else None
+        self.max_spill_files = max_spill_files
+        self.lines = 0
+        self.dropped = 0
+        self.spill_path: Optional[Path] = None
+        self._ring = deque()
+        self._ring_bytes = 0
+        self._spill = None
+
+    def append(self, line: str):
+        """Add one line (without its newline)"""
+        self.lines += 1
+        if len(line) > self.MAX_LINE_BYTES and self._spill is None and self.spill_dir is not None:
+            # Spill before truncating: until now the ring holds only whole lines
+            self._open_spill()
+        if self._spill:
+            self._spill.write(line + "\n")
+
+        if len(line) > self.MAX_LINE_BYTES:
+            line = line[:self.MAX_LINE_BYTES] + " [...]"
+        self._ring.append(line)
+        self._ring_bytes += len(line) + 1
+
+        if self._ring_bytes > self.max_bytes:
+            if self._spill is None and self.spill_dir is not None:
+                self._open_spill()
+            while self._ring_bytes > self.max_bytes and len(self._ring) > 1:
+                self._ring_bytes -= len(self._ring.popleft()) + 1
+                self.dropped += 1
+
+    def _open_spill(self):
+        """Start the spill file with everything captured so far"""
+        try:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            self._prune()
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.log.gz"
+            self.spill_path = self.spill_dir / name
+            # Level 1: this is on the path of live command output
+            self._spill = gzip.open(self.spill_path, "wt", compresslevel=1, encoding="utf-8", errors="replace")
+            for line in self._ring:
+                self._spill.write(line + "\n")
+        except OSError:
+            self.spill_dir = None  # Keep capturing the tail only
+            self.spill_path = None
+            self._spill = None
+
+    def _prune(self):
+        """Delete the oldest spill files beyond the retention limit"""
+        files = sorted(self.spill_dir.glob("*.log.gz"))
+        for old in files[:max(0, len(files) - self.max_spill_files + 1)]:
+            try:
+                old.unlink()
+            except OSError:
+                pass
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped > 0
+
+    def tail(self) -> List[str]:
+        return list(self._ring)
+
+    def text(self) -> str:
+        """The retained tail as one string"""
+        return "\n".join(self._ring)
+
+    def close(self) -> Optional[str]:
+        """Finish the spill file; returns its path if output was spilled"""
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+        return str(self.spill_path) if self.spill_path else None
+
+
+def read_output(path: str, start: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+    """Lines of a spill file, decompressed as they are read"""
+    with gzip.open(Path(path).expanduser(), "rt", encoding="utf-8", errors="replace") as f:
+        for number, line in enumerate(f):
+            if number < start:
+                continue
+            if limit is not None and number >= start + limit:
+                break
+            yield line.rstrip("\n")
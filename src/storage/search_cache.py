@@ -0,0 +1,166 @@
+# ============================================================================
+# FILE: src/storage/search_cache.py
+# Persistent TTL/LRU cache for documentation search results
+# ============================================================================
+
+import json
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Environment overrides (see .env.example), in seconds
+TTL_ENV = "TERMINAL_HERO_SEARCH_CACHE_TTL"
+NEGATIVE_TTL_ENV = "TERMINAL_HERO_SEARCH_CACHE_NEGATIVE_TTL"
+
+class SearchCache:
+    """
+    Disk-backed cache of search results keyed by normalized query.
+    Empty results are cached too (negative caching) with a shorter TTL,
+    and the least recently used entries are evicted beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "~/.terminal_hero/search_cache.db",
+        ttl: float = 7 * 24 * 3600,
+        negative_ttl: float = 3600,
+        max_entries: int = 2000
+    ):
+        self.db_path = Path(db_path).expanduser()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._init_db()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "SearchCache":
+        """Cache with TTLs from the environment where set"""
+        for name, key in ((TTL_ENV, "ttl"), (NEGATIVE_TTL_ENV, "negative_ttl")):
+            try:
+                kwargs.setdefault(key, float(os.environ[name]))
+            except (KeyError, ValueError):
+                pass
+        return cls(**kwargs)
+
+    def _init_db(self):
+        """Initialize database schema"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_search_cache_last_access
+            ON search_cache (last_access)
+        """)
+
+        # Lifetime counters for hit-rate reporting
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache_stats (
+                name TEXT PRIMARY KEY,
+                value INTEGER DEFAULT 0
+            )
+        """)
+
+        conn.commit()
+        conn.close()
+
+    @staticmethod
+    def normalize_query(query: str, backend: str = "web", max_results: int = 3) -> str:
+        """Cache key: lowercased, whitespace-collapsed query plus what was asked of whom"""
+        text = " ".join(query.lower().split())
+        text = re.sub(r"[\"'`]", "", text)
+        return f"{backend}|{max_results}|{text}"
+
+    def _count(self, cursor, name: str):
+        cursor.execute("""
+            INSERT INTO search_cache_stats (name, value) VALUES (?, 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1
+        """, (name,))
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Cached results for a key, or None on a miss or expired entry"""
+        now = time.time()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT results, created FROM search_cache WHERE key = ?", (key,))
+        row = cursor.fetchone()
+
+        results = None
+        if row:
+            cached = json.loads(row[0])
+            ttl = self.ttl if cached else self.negative_ttl
+            if now - row[1] < ttl:
+                results = cached
+                cursor.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+            else:
+                cursor.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+
+        if results is None:
+            self._count(cursor, "misses")
+        else:
+            self._count(cursor, "hits" if results else "negative_hits")
+
+        conn.commit()
+        conn.close()
+        return results
+
+    def put(self, key: str, results: List[Dict]):
+        """Store results (an empty list caches the miss) and evict beyond the size limit"""
+        now = time.time()
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO search_cache (key, results, created, last_access)
+            VALUES (?, ?, ?, ?)
+        """, (key, json.dumps(results), now, now))
+
+        # Least recently used entries go first
+        cursor.execute("""
+            DELETE FROM search_cache WHERE key IN (
+                SELECT key FROM search_cache
+                ORDER BY last_access DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+        conn.commit()
+        conn.close()
+
+    def clear(self):
+        """Drop all cached results"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("DELETE FROM search_cache")
+        conn.commit()
+        conn.close()
+
+    def stats(self) -> Dict:
+        """Entry count and lifetime hit rate"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        entries = cursor.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        counters = dict(cursor.execute("SELECT name, value FROM search_cache_stats").fetchall())
+        conn.close()
+
+        hits = counters.get("hits", 0) + counters.get("negative_hits", 0)
+        lookups = hits + counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "hits": counters.get("hits", 0),
+            "negative_hits": counters.get("negative_hits", 0),
+            "misses": counters.get("misses", 0),
+            "hit_rate": hits / lookups if lookups else 0.0
+        }